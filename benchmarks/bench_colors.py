@@ -0,0 +1,76 @@
+"""Benchmark of mass updates of color controls: a panel with many color
+parameters, whose values or translation are all changed at once.
+
+Run from the repository root with:
+    python -m benchmarks.bench_colors
+"""
+
+import os
+import time
+
+import numpy as np
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5 import QtWidgets
+from paramqt import GParameterized, GColor, ControlPanel, set_translation
+
+N_COLORS = 200
+N_REPEAT = 10
+
+
+def make_color_class(n):
+    attributes = {'c%d' % i: GColor('#000000') for i in range(n)}
+    return type('ColorPar', (GParameterized,), attributes)
+
+
+def timed(label, fun):
+    # average over N_REPEAT repetitions, in milliseconds
+    QtWidgets.QApplication.processEvents()
+    t0 = time.perf_counter()
+    for i in range(N_REPEAT):
+        fun(i)
+        QtWidgets.QApplication.processEvents()
+    t = (time.perf_counter() - t0) / N_REPEAT
+    print('%-45s %10.2f ms' % (label, t * 1e3))
+    return t
+
+
+def main():
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+    obj = make_color_class(N_COLORS)()
+    names = [name for name in obj.param if name != 'name']
+    panel = ControlPanel(obj)
+    panel.show()
+    controls = panel.findChildren(QtWidgets.QLineEdit)
+
+    rng = np.random.default_rng(0)
+    palettes = [['#%06x' % x for x in rng.integers(0, 2 ** 24, N_COLORS)]
+                for _ in range(N_REPEAT)]
+    themes = [['#ff0000'] * N_COLORS, ['#0000ff'] * N_COLORS]
+
+    print('%d color controls' % N_COLORS)
+    timed('set all colors to new random colors',
+          lambda i: [setattr(obj, name, color)
+                     for name, color in zip(names, palettes[i])])
+    timed('switch all colors between two themes',
+          lambda i: [setattr(obj, name, color)
+                     for name, color in zip(names, themes[i % 2])])
+    timed('switch translation',
+          lambda i: set_translation(str.upper if i % 2 else None))
+    set_translation(None)
+
+    # reference: display by style sheets, as done previously
+    def set_style_sheets(i):
+        for control, color in zip(controls, palettes[i]):
+            control.setStyleSheet('color:%s; background-color:%s;'
+                                  % ('#000000', color))
+    timed('reference: style sheets on all controls', set_style_sheets)
+
+    panel.close()
+    del app
+
+
+if __name__ == '__main__':
+    main()
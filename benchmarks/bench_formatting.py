@@ -0,0 +1,62 @@
+"""Micro-benchmarks of the formatting of parameter values to text.
+
+Run from the repository root with:
+    python -m benchmarks.bench_formatting
+"""
+
+import os
+import timeit
+
+import numpy as np
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import param as pm
+from paramqt import text_display, text_display_array, set_translation
+
+N_ARRAY = 100000
+
+
+def bench(label, fun, number):
+    # best of 5 repetitions, in microseconds per call
+    t = min(timeit.repeat(fun, number=number, repeat=5)) / number
+    print('%-40s %12.3f us' % (label, t * 1e6))
+    return t
+
+
+def main():
+    integer, number, color = pm.Integer(), pm.Number(), pm.Color()
+
+    print('Scalar formatting (text_display)')
+    bench('integer', lambda: text_display(123, integer), 100000)
+    bench('number, small float', lambda: text_display(0.01234, number),
+          100000)
+    bench('number, float', lambda: text_display(123.456, number), 100000)
+    bench('number, large integer', lambda: text_display(1e9, number),
+          100000)
+    bench('color, named', lambda: text_display('#ff0000', color), 100000)
+    bench('color, unnamed', lambda: text_display('#123456', color), 100000)
+    bench('color, None', lambda: text_display(None, color), 100000)
+    set_translation(str.upper)
+    bench('color, named, translated',
+          lambda: text_display('#ff0000', color), 100000)
+    set_translation(None)
+
+    print('Array formatting (%d values)' % N_ARRAY)
+    rng = np.random.default_rng(0)
+    floats = rng.lognormal(0, 4, N_ARRAY) * rng.choice([-1, 1], N_ARRAY)
+    integers = rng.integers(-10 ** 6, 10 ** 6, N_ARRAY)
+    t_loop = bench('number, loop on text_display',
+                   lambda: [text_display(x, number) for x in floats.tolist()],
+                   1)
+    t_array = bench('number, text_display_array',
+                    lambda: text_display_array(floats, number), 1)
+    print('%-40s %12.1f x' % ('speed-up', t_loop / t_array))
+    bench('integer, loop on text_display',
+          lambda: [text_display(x, integer) for x in integers.tolist()], 1)
+    bench('integer, text_display_array',
+          lambda: text_display_array(integers, integer), 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+"""Shared tools of the benchmarks: headless Qt application, timing and
+memory measurements, collection of results in machine-readable form.
+"""
+
+import os
+import gc
+import sys
+import json
+import time
+import platform
+import tracemalloc
+
+import numpy as np
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5 import QtCore, QtWidgets
+import param as pm
+
+
+def application():
+    """The Qt application, created if necessary (offscreen platform unless
+    QT_QPA_PLATFORM is set)"""
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+def process_events():
+    QtWidgets.QApplication.processEvents()
+
+
+def time_once(fun, *args):
+    """Duration (s) of a single call, including the processing of the Qt
+    events it generated"""
+    process_events()
+    t0 = time.perf_counter()
+    fun(*args)
+    process_events()
+    return time.perf_counter() - t0
+
+
+def time_samples(fun, n):
+    """Durations (s) of n calls fun(i), i = 0..n-1, each timed separately"""
+    process_events()
+    samples = np.empty(n)
+    for i in range(n):
+        t0 = time.perf_counter()
+        fun(i)
+        process_events()
+        samples[i] = time.perf_counter() - t0
+    return samples
+
+
+def rss():
+    """Resident memory size of the process (bytes), None if unknown"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class MemoryMeasure:
+    """Context manager measuring the memory allocated inside its block:
+    Python allocations (traced) and resident memory (which includes Qt
+    allocations, but is less precise)"""
+
+    def __enter__(self):
+        gc.collect()
+        process_events()
+        self.rss0 = rss()
+        tracemalloc.start()
+        self.python = self.rss = None
+        return self
+
+    def __exit__(self, *args):
+        gc.collect()
+        process_events()
+        self.python = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        rss1 = rss()
+        if self.rss0 is not None and rss1 is not None:
+            self.rss = rss1 - self.rss0
+
+
+def make_class(name, parameters):
+    """A GParameterized sub-class with the given {name: parameter}"""
+    from paramqt import GParameterized
+    return type(name, (GParameterized,), dict(parameters))
+
+
+class Results:
+    """Collect benchmark results and write them as JSON"""
+
+    def __init__(self):
+        self.results = []
+
+    def add(self, case, metric, value, unit, **params):
+        self.results.append(dict(case=case, metric=metric, params=params,
+                                 value=float(value), unit=unit))
+        print('%-12s %-60s %12.3f %s'
+              % (case, metric + _params_text(params), value, unit))
+
+    def add_samples(self, case, metric, samples, **params):
+        # median and 99th percentile of durations, in microseconds
+        p50, p99 = np.percentile(samples, [50, 99]) * 1e6
+        self.add(case, metric + ' p50', p50, 'us', **params)
+        self.add(case, metric + ' p99', p99, 'us', **params)
+
+    def metadata(self):
+        return dict(time=time.strftime('%Y-%m-%dT%H:%M:%S'),
+                    python=sys.version.split()[0],
+                    platform=platform.platform(),
+                    qt=QtCore.QT_VERSION_STR,
+                    pyqt=QtCore.PYQT_VERSION_STR,
+                    param=pm.__version__,
+                    qpa=os.environ.get('QT_QPA_PLATFORM'))
+
+    def write(self, filename):
+        with open(filename, 'w') as f:
+            json.dump(dict(metadata=self.metadata(), results=self.results),
+                      f, indent=1)
+
+
+def _params_text(params):
+    if not params:
+        return ''
+    return ' (%s)' % ', '.join('%s=%s' % item for item in params.items())
+
+
+def _key(result):
+    return (result['case'], result['metric'],
+            tuple(sorted(result['params'].items())))
+
+
+def compare(reference_file, results: Results, threshold=0.2):
+    """Print the results which are more than `threshold` (relative) worse
+    than in the reference file, return their number"""
+    with open(reference_file) as f:
+        data = json.load(f)
+    reference = {_key(r): r for r in data['results']}
+    metadata = results.metadata()
+    different = [key for key in ['platform', 'python', 'qt', 'pyqt', 'param',
+                                 'qpa']
+                 if data.get('metadata', {}).get(key) != metadata[key]]
+    if different:
+        print('WARNING reference results were measured with a different %s'
+              % ', '.join(different))
+    n_worse = 0
+    for result in results.results:
+        ref = reference.get(_key(result))
+        if ref is None or ref['value'] <= 0:
+            continue
+        ratio = result['value'] / ref['value']
+        if ratio > 1 + threshold:
+            n_worse += 1
+            print('REGRESSION %-12s %-60s %10.3f -> %10.3f %s (x%.2f)'
+                  % (result['case'],
+                     result['metric'] + _params_text(result['params']),
+                     ref['value'], result['value'], result['unit'], ratio))
+    return n_worse
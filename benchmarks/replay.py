@@ -0,0 +1,93 @@
+"""Replay a generated stream of changes (see benchmarks/workload.py) against
+a ControlPanel and/or a ControlMenu, and report build time and latencies.
+
+Run from the repository root with:
+    python -m benchmarks.replay [--target panel|menu|lazy-menu ...]
+                                [--parameters 2000] [--depth 3]
+                                [--branching 3] [--changes 5000]
+                                [--seed 0] [--output results.json]
+"""
+
+import sys
+import argparse
+
+import numpy as np
+
+from .common import application, process_events, time_once, Results
+from .workload import WorkloadShape, make_workload, change_stream, \
+    apply_change
+
+from PyQt5 import QtWidgets
+import paramqt as pq
+
+TARGETS = ['panel', 'menu', 'lazy-menu']
+
+
+def _build(target, obj):
+    # return the top-level widget showing obj
+    if target == 'panel':
+        scroll = QtWidgets.QScrollArea()
+        scroll.setWidgetResizable(True)
+        scroll.setWidget(pq.ControlPanel(obj))
+        scroll.show()
+        return scroll
+    else:
+        window = QtWidgets.QMainWindow()
+        window.menu = pq.ControlMenu(window, 'Workload', obj,
+                                     lazy=(target == 'lazy-menu'))
+        window.show()
+        return window
+
+
+def replay(target, shape: WorkloadShape, n_changes, seed, results: Results):
+    obj = make_workload(shape, seed=seed)
+    params = dict(target=target, parameters=shape.n_parameters,
+                  seed=seed)
+
+    widget = [None]
+
+    def build():
+        widget[0] = _build(target, obj)
+    results.add('replay', 'build', time_once(build) * 1e3, 'ms', **params)
+
+    changes = list(change_stream(obj, n_changes, seed=seed))
+    samples = {kind: [] for kind in ['set', 'drag', 'objects']}
+    process_events()
+    for change in changes:
+        samples[change[0]].append(time_once(apply_change, change))
+    for kind, durations in samples.items():
+        if durations:
+            results.add_samples('replay', kind, np.array(durations),
+                                **params)
+    results.add('replay', 'total', sum(map(sum, samples.values())) * 1e3,
+                'ms', changes=len(changes), **params)
+    widget[0].close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='replay of a generated '
+                                                 'workload')
+    parser.add_argument('--target', nargs='+', default=TARGETS,
+                        choices=TARGETS)
+    parser.add_argument('--parameters', type=int, default=2000)
+    parser.add_argument('--depth', type=int, default=3)
+    parser.add_argument('--branching', type=int, default=3)
+    parser.add_argument('--changes', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', '-o', help='JSON file for the results')
+    args = parser.parse_args(argv)
+
+    app = application()
+    shape = WorkloadShape(n_parameters=args.parameters, depth=args.depth,
+                          branching=args.branching)
+    results = Results()
+    for target in args.target:
+        replay(target, shape, args.changes, args.seed, results)
+    if args.output:
+        results.write(args.output)
+    del app
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,239 @@
+"""Benchmark suite of paramqt, running headless (offscreen Qt platform).
+
+Cases:
+- build: time to build a ControlPanel vs. number of parameters
+- update: latency of a value update, for each control type
+- translation: time to switch the translation function
+- selector: time to change the list of objects of selectors
+- fold: time to fold/unfold a section of a panel
+- memory: memory per control
+
+Run from the repository root with:
+    python -m benchmarks.suite [--quick] [--output results.json]
+                               [--compare reference.json] [case ...]
+The exit code is 1 if --compare found regressions. Timings depend on the
+machine: save reference results locally (e.g. to benchmarks/baseline.json,
+which is not versioned) and compare later runs on the same machine.
+"""
+
+import sys
+import argparse
+
+import numpy as np
+
+from .common import application, process_events, time_once, time_samples, \
+    MemoryMeasure, make_class, Results, compare
+
+from PyQt5 import QtWidgets
+import paramqt as pq
+
+N_OBJECTS = 100
+
+
+# PARAMETERS OF THE DIFFERENT CONTROL TYPES
+
+def _objects(n):
+    return ['item %d' % i for i in range(n)]
+
+
+# {control type: (parameter factory, list of values to cycle through)}
+CONTROL_TYPES = {
+    'Slider': (lambda: pq.GNumber(0., bounds=(0, 1)),
+               list(np.linspace(0, 1, 11))),
+    'Slider-log': (lambda: pq.GNumber(1., bounds=(1e-3, 1e3), mode='log'),
+                   list(np.logspace(-3, 3, 11))),
+    'LineEdit-number': (lambda: pq.GNumber(0., style='edit'),
+                        [0.5, 1.5, 1e6, -3.25]),
+    'LineEdit-integer': (lambda: pq.GInteger(0), [1, 2, 1000, -5]),
+    'LineEdit-string': (lambda: pq.GString(''), ['a', 'bc', 'hello world']),
+    'LineEdit-list': (lambda: pq.GList([0.] * 10, class_=float),
+                      [[float(i)] * 10 for i in range(4)]),
+    'CheckBox': (lambda: pq.GBoolean(False), [True, False]),
+    'ToggleButton': (lambda: pq.GBoolean(False, style='button'),
+                     [True, False]),
+    'PopupMenu': (lambda: pq.GObjectSelector('item 0',
+                                             objects=_objects(N_OBJECTS)),
+                  _objects(N_OBJECTS)),
+    'CyclingButton': (lambda: pq.GObjectSelector('item 0', objects=_objects(5),
+                                                 style='button'),
+                      _objects(5)),
+    'ButtonGroup': (lambda: pq.GObjectSelector('item 0', objects=_objects(5),
+                                               style='button-group'),
+                    _objects(5)),
+    'ColorButton': (lambda: pq.GColor('#000000'),
+                    ['#ff0000', '#00ff00', '#123456', '#000000']),
+    'ArrayControl': (lambda: pq.GArray(np.zeros(100)),
+                     [np.full(100, float(i)) for i in range(4)]),
+}
+
+
+def _mixed_class(n):
+    # class with n parameters cycling through the control types
+    types = list(CONTROL_TYPES.values())
+    return make_class('Mixed%d' % n, {'p%d' % i: types[i % len(types)][0]()
+                                      for i in range(n)})
+
+
+def _nested_object(n_sections, n_per_section):
+    # object with nested sections of n_per_section sliders each
+    section_cls = make_class('Section', {
+        'x%d' % i: pq.GNumber(0., bounds=(0, 1))
+        for i in range(n_per_section)})
+    obj = make_class('Nested', {})()
+    for i in range(n_sections):
+        setattr(obj, 'section%d' % i, section_cls())
+    return obj
+
+
+# BENCHMARK CASES
+
+def bench_build(results, quick):
+    sizes = [10, 100] if quick else [10, 100, 1000]
+    for n in sizes:
+        obj = _mixed_class(n)()
+
+        def build():
+            panel = pq.ControlPanel(obj)
+            panel.show()
+            build.panel = panel
+        t = time_once(build)
+        build.panel.close()
+        results.add('build', 'panel build', t * 1e3, 'ms', n=n)
+        results.add('build', 'panel build per parameter', t / n * 1e6, 'us',
+                    n=n)
+
+
+def bench_update(results, quick):
+    n = 100 if quick else 1000
+    for name, (factory, values) in CONTROL_TYPES.items():
+        obj = make_class('Update', {'x': factory()})()
+        control = pq.parameter_control(obj, 'x')
+        control.show()
+        samples = time_samples(
+            lambda i: setattr(obj, 'x', values[(i + 1) % len(values)]), n)
+        control.close()
+        results.add_samples('update', 'update', samples, control=name)
+
+
+def bench_translation(results, quick):
+    n = 100 if quick else 500
+    panel = pq.ControlPanel(_mixed_class(n)())
+    panel.show()
+    samples = time_samples(
+        lambda i: pq.set_translation(None if i % 2 else str.upper), 10)
+    pq.set_translation(None)
+    panel.close()
+    results.add('translation', 'translation switch',
+                np.median(samples) * 1e3, 'ms', n=n)
+
+
+def bench_selector(results, quick):
+    n = 20 if quick else 100
+    lists = [_objects(N_OBJECTS), _objects(N_OBJECTS // 2),
+             _objects(N_OBJECTS) + ['extra']]
+    for style, control_name in [(None, 'PopupMenu'),
+                                ('button', 'CyclingButton'),
+                                ('button-group', 'ButtonGroup')]:
+        obj = make_class('Selector', {
+            'x': pq.GObjectSelector('item 0', objects=_objects(N_OBJECTS),
+                                    style=style)})()
+        control = pq.parameter_control(obj, 'x')
+        control.show()
+
+        def churn(i):
+            obj.param['x'].objects = lists[i % len(lists)]
+        samples = time_samples(churn, n)
+        control.close()
+        results.add_samples('selector', 'objects change', samples,
+                            control=control_name, objects=N_OBJECTS)
+
+    # menu version
+    window = QtWidgets.QMainWindow()
+    obj = make_class('Selector', {
+        'x': pq.GObjectSelector('item 0', objects=_objects(N_OBJECTS))})()
+    menu = pq.ControlMenu(window, 'menu', obj)
+    window.show()
+
+    def churn_and_show(i):
+        obj.param['x'].objects = lists[i % len(lists)]
+        for entry in menu.entries:
+            entry.aboutToShow.emit()
+    samples = time_samples(churn_and_show, n)
+    window.close()
+    results.add_samples('selector', 'objects change and menu display',
+                        samples, control='SelectMenu', objects=N_OBJECTS)
+
+
+def bench_fold(results, quick):
+    n_per_section = 20 if quick else 100
+    panel = pq.ControlPanel(_nested_object(5, n_per_section))
+    panel.show()
+    section = panel.current_section
+    samples = time_samples(lambda i: section.toggle_fold(), 20)
+    panel.close()
+    results.add_samples('fold', 'fold toggle', samples,
+                        controls=n_per_section)
+
+
+def bench_memory(results, quick):
+    n = 100 if quick else 500
+    for name in ['Slider', 'LineEdit-number', 'CheckBox', 'PopupMenu',
+                 'ColorButton']:
+        factory = CONTROL_TYPES[name][0]
+        obj = make_class('Memory', {'p%d' % i: factory()
+                                    for i in range(n)})()
+        with MemoryMeasure() as memory:
+            panel = pq.ControlPanel(obj)
+            panel.show()
+        results.add('memory', 'python memory per control',
+                    memory.python / n / 1024, 'KiB', control=name)
+        if memory.rss is not None:
+            results.add('memory', 'resident memory per control',
+                        memory.rss / n / 1024, 'KiB', control=name)
+        panel.close()
+        panel.deleteLater()
+        process_events()
+
+
+CASES = {
+    'build': bench_build,
+    'update': bench_update,
+    'translation': bench_translation,
+    'selector': bench_selector,
+    'fold': bench_fold,
+    'memory': bench_memory,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='paramqt benchmarks')
+    parser.add_argument('cases', nargs='*',
+                        help='cases to run among %s (default: all)'
+                             % ', '.join(CASES))
+    parser.add_argument('--quick', action='store_true',
+                        help='smaller sizes, for a fast check')
+    parser.add_argument('--output', '-o', help='JSON file for the results')
+    parser.add_argument('--compare', help='JSON file of reference results')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='relative slowdown reported as a regression')
+    args = parser.parse_args(argv)
+    unknown = [case for case in args.cases if case not in CASES]
+    if unknown:
+        parser.error('unknown case(s): %s' % ', '.join(unknown))
+
+    app = application()
+    results = Results()
+    for case in args.cases or CASES:
+        CASES[case](results, args.quick)
+
+    if args.output:
+        results.write(args.output)
+    if args.compare:
+        if compare(args.compare, results, args.threshold):
+            return 1
+    del app
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,237 @@
+"""Seeded generator of large parameter trees and of streams of changes.
+
+make_workload builds a tree of nested GParameterized sections with a given
+number of parameters (GInteger, GNumber, GObjectSelector, GListSelector,
+GColor, plus GBoolean switches), some of which are made visible or enabled
+by chains of dependencies. change_stream produces a realistic sequence of
+changes for such a tree: a few parameters are changed much more often
+than the others, numeric parameters are dragged (bursts of small changes),
+and the objects lists of selectors change from time to time.
+
+The same seed always gives the same tree and the same changes. See
+benchmarks/replay.py for replaying changes against ControlPanel and
+ControlMenu.
+"""
+
+import numpy as np
+
+import param as pm
+import paramqt as pq
+
+# relative frequencies of the parameter kinds
+KINDS = {'integer': 2, 'number': 4, 'selector': 2, 'list-selector': 1,
+         'color': 1}
+
+# relative frequencies of the change kinds
+CHANGES = {'set': 6, 'drag': 3, 'objects': 1}
+
+_SELECTOR_TYPES = (pq.GObjectSelector, pq.GListSelector)
+
+
+class WorkloadShape:
+    """Size and shape of a generated parameter tree:
+    - n_parameters: total number of parameters
+    - depth, branching: nesting levels below the root, and number of nested
+      sections of each section
+    - dependency_fraction: fraction of parameters depending on a switch
+    - chain_length: maximal length of the chains of switches (each switch
+      visible only if the previous one is on)
+    - folded_fraction: fraction of sections that start folded
+    - max_objects: maximal number of objects of selectors"""
+
+    def __init__(self, n_parameters=1000, depth=3, branching=3,
+                 dependency_fraction=0.2, chain_length=3,
+                 folded_fraction=0.3, max_objects=30):
+        self.n_parameters = n_parameters
+        self.depth = depth
+        self.branching = branching
+        self.dependency_fraction = dependency_fraction
+        self.chain_length = chain_length
+        self.folded_fraction = folded_fraction
+        self.max_objects = max_objects
+
+
+def _objects(n):
+    return ['option %d' % i for i in range(n)]
+
+
+def _make_parameter(kind, rng, shape: WorkloadShape, **kwargs):
+    if kind == 'integer':
+        low = int(rng.integers(-100, 100))
+        high = low + int(rng.choice([10, 100, 10000]))
+        style = 'edit' if rng.random() < .3 else None
+        return pq.GInteger(low, bounds=(low, high), style=style, **kwargs)
+    elif kind == 'number':
+        if rng.random() < .3:
+            return pq.GNumber(1., bounds=(1e-3, 1e3), mode='log', **kwargs)
+        elif rng.random() < .3:
+            return pq.GNumber(0., style='edit', **kwargs)
+        else:
+            return pq.GNumber(0., bounds=(-1, 1), **kwargs)
+    elif kind == 'selector':
+        objects = _objects(int(rng.integers(3, shape.max_objects + 1)))
+        if len(objects) < 6 and rng.random() < .5:
+            style = 'button'
+        elif len(objects) < 10 and rng.random() < .3:
+            style = 'button-group'
+        else:
+            style = None
+        return pq.GObjectSelector(objects[0], objects=objects, style=style,
+                                  **kwargs)
+    elif kind == 'list-selector':
+        objects = _objects(int(rng.integers(3, 8)))
+        return pq.GListSelector([objects[0]], objects=objects, **kwargs)
+    elif kind == 'color':
+        return pq.GColor('#%06x' % rng.integers(0, 2 ** 24), **kwargs)
+    else:
+        raise ValueError('unknown parameter kind: %s' % kind)
+
+
+def _make_section_class(name, n_parameters, rng, shape: WorkloadShape):
+    # parameters of one section, with dependency chains on switches
+    kinds = list(KINDS)
+    weights = np.array(list(KINDS.values()), float)
+    parameters = {}
+    n_dependent = int(round(n_parameters * shape.dependency_fraction))
+    switches = []
+    if n_dependent:
+        n_switches = int(rng.integers(1, shape.chain_length + 1))
+        for i in range(n_switches):
+            # each switch is visible only if the previous one is on
+            visible = switches[-1] if switches else True
+            switches.append('switch%d' % i)
+            parameters[switches[-1]] = pq.GBoolean(bool(rng.random() < .7),
+                                                   visible=visible)
+    for i in range(n_parameters):
+        kind = kinds[rng.choice(len(kinds), p=weights / weights.sum())]
+        kwargs = {}
+        if i < n_dependent:
+            switch = switches[int(rng.integers(len(switches)))]
+            kwargs['visible' if rng.random() < .5 else 'enabled'] = switch
+        parameters['%s%d' % (kind.replace('-', '_'), i)] = _make_parameter(
+            kind, rng, shape, **kwargs)
+    parameters['start_folded'] = bool(rng.random() < shape.folded_fraction)
+    parameters['label'] = name
+    return type(name, (pq.GParameterized,), parameters)
+
+
+def make_workload(shape: WorkloadShape = None, seed=0, **kwargs):
+    """Generate a tree of nested GParameterized instances (keyword arguments
+    are passed to WorkloadShape if shape is not given)"""
+    if shape is None:
+        shape = WorkloadShape(**kwargs)
+    rng = np.random.default_rng(seed)
+
+    # tree of sections: (path, level), breadth first
+    sections = [('Section', 0)]
+    for path, level in sections:
+        if level < shape.depth:
+            sections += [('%s_%d' % (path, i), level + 1)
+                         for i in range(shape.branching)]
+
+    # distribute the parameters among the sections
+    counts = rng.multinomial(shape.n_parameters,
+                             rng.dirichlet(np.ones(len(sections))))
+
+    # create the instances and nest them
+    instances = {}
+    for (path, level), n in zip(sections, counts):
+        cls = _make_section_class(path, int(n), rng, shape)
+        instances[path] = cls()
+        if level > 0:
+            parent, index = path.rsplit('_', 1)
+            setattr(instances[parent], 'sub%s' % index, instances[path])
+    return instances['Section']
+
+
+def _leaves(obj):
+    # (object, parameter name, parameter) of all parameters of the tree
+    return [(o, name, o.param[name])
+            for o, names in pq.list_all_parameters(obj, out='Parameterized')
+            for name in names]
+
+
+def change_stream(obj, n_changes=1000, seed=0, hot_exponent=1.2,
+                  drag_length=20):
+    """Generate n_changes changes of the parameters of the tree obj, as
+    (kind, object, name, value) tuples: kind 'set' or 'drag' (set the
+    value), or 'objects' (set the objects list of a selector). Parameter
+    popularity follows a Zipf law of exponent hot_exponent. The changes
+    are generated for the current state of the tree and remain valid only
+    if they are all applied in order, see apply_change."""
+    rng = np.random.default_rng(seed)
+    leaves = _leaves(obj)
+    state = {(id(o), name): getattr(o, name) for o, name, _ in leaves}
+    objects = {(id(o), name): list(p.objects) for o, name, p in leaves
+               if isinstance(p, _SELECTOR_TYPES)}
+
+    popularity = 1 / np.arange(1, len(leaves) + 1) ** hot_exponent
+    popularity = popularity[rng.permutation(len(leaves))]
+    popularity /= popularity.sum()
+    change_kinds = list(CHANGES)
+    change_weights = np.array(list(CHANGES.values()), float)
+    change_weights /= change_weights.sum()
+
+    n = 0
+    while n < n_changes:
+        o, name, p = leaves[rng.choice(len(leaves), p=popularity)]
+        key = (id(o), name)
+        kind = change_kinds[rng.choice(len(change_kinds), p=change_weights)]
+        if kind == 'drag' and isinstance(p, pm.Number) \
+                and p.bounds is not None and p.bounds[0] is not None:
+            # many small steps in the same direction
+            low, high = p.bounds
+            start = state[key]
+            end = low + (high - low) * rng.random()
+            steps = min(drag_length, n_changes - n)
+            for value in np.linspace(start, end, steps + 1)[1:]:
+                value = int(round(value)) if isinstance(p, pm.Integer) \
+                    else float(value)
+                state[key] = value
+                yield 'drag', o, name, value
+            n += steps
+            continue
+        elif kind == 'objects' and key in objects:
+            # new objects list, still containing the current value(s)
+            pool = _objects(max(len(objects[key]) + 5, 8))
+            new = [x for x in pool if rng.random() < .6]
+            current = state[key]
+            for x in (current if isinstance(current, list) else [current]):
+                if x not in new:
+                    new.append(x)
+            objects[key] = new
+            yield 'objects', o, name, new
+        else:
+            value = _random_value(p, rng, objects.get(key))
+            state[key] = value
+            yield 'set', o, name, value
+        n += 1
+
+
+def _random_value(p, rng, objects):
+    if isinstance(p, pq.GBoolean):
+        return bool(rng.random() < .5)
+    elif isinstance(p, (pq.GInteger, pq.GNumber)):
+        if p.bounds is None or p.bounds[0] is None:
+            value = rng.normal() * 10
+        else:
+            low, high = p.bounds
+            value = low + (high - low) * rng.random()
+        return int(round(value)) if isinstance(p, pq.GInteger) \
+            else float(value)
+    elif isinstance(p, pq.GListSelector):
+        return [x for x in objects if rng.random() < .5]
+    elif isinstance(p, pq.GObjectSelector):
+        return objects[int(rng.integers(len(objects)))]
+    elif isinstance(p, pq.GColor):
+        return '#%06x' % rng.integers(0, 2 ** 24)
+    else:
+        raise ValueError('no random value for %s' % type(p).__name__)
+
+
+def apply_change(change):
+    kind, obj, name, value = change
+    if kind == 'objects':
+        obj.param[name].objects = value
+    else:
+        setattr(obj, name, value)
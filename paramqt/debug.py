@@ -0,0 +1,441 @@
+import os
+import json
+import time
+import weakref
+from collections import deque
+import numpy as np
+from PyQt5 import QtCore, QtWidgets, sip
+from . import paramqt as _pq
+
+
+# maximal number of durations memorized for each (phase, parameter,
+# callback): percentiles are computed on the latest ones
+PROFILER_SAMPLES = 1000
+
+# delay (ms) between two refreshes of the profiler panel
+PROFILER_REFRESH = 1000
+
+# maximal number of events memorized by the tracer (oldest events are
+# dropped)
+TRACE_SIZE = 100000
+
+
+def _parameter_name(obj, name):
+    cls = obj if isinstance(obj, type) else type(obj)
+    return '%s.%s' % (cls.__name__, name)
+
+
+def _callback_name(callback):
+    if callback is None:
+        return ''
+    try:
+        return callback.__qualname__
+    except AttributeError:
+        return repr(callback)
+
+
+class WatcherProfiler:
+    """Instrument collecting the durations of parameter changes, grouped by
+    phase ('set', 'watcher' or 'display'), parameter and callback.
+    Use start() and stop(), or a with statement, to enable it."""
+
+    def __init__(self, max_samples=PROFILER_SAMPLES):
+        self.max_samples = max_samples
+        self.reset()
+
+    def reset(self):
+        # {(phase, parameter, callback): [count, max, deque of durations]}
+        self._stats = {}
+
+    def start(self):
+        _pq.add_instrument(self)
+
+    def stop(self):
+        _pq.remove_instrument(self)
+
+    @property
+    def running(self):
+        return self in _pq._instruments
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def record(self, phase, obj, name, callback, start, end):
+        duration = (end - start) * 1e-9
+        key = (phase, _parameter_name(obj, name), _callback_name(callback))
+        try:
+            stat = self._stats[key]
+        except KeyError:
+            stat = self._stats[key] = [0, 0., deque(maxlen=self.max_samples)]
+        stat[0] += 1
+        stat[1] = max(stat[1], duration)
+        stat[2].append(duration)
+
+    def statistics(self):
+        """List of dictionaries with keys phase, parameter, callback, count,
+        p50, p99 and max (durations in seconds), slowest entries first"""
+        stats = []
+        for (phase, parameter, callback), (count, dmax, samples) \
+                in self._stats.items():
+            p50, p99 = np.percentile(samples, [50, 99])
+            stats.append(dict(phase=phase, parameter=parameter,
+                              callback=callback, count=count,
+                              p50=p50, p99=p99, max=dmax))
+        stats.sort(key=lambda stat: stat['p99'], reverse=True)
+        return stats
+
+    def report(self):
+        """Statistics as a text table (durations in milliseconds)"""
+        lines = ['%-8s %-30s %-40s %7s %9s %9s %9s'
+                 % ('phase', 'parameter', 'callback', 'count',
+                    'p50', 'p99', 'max')]
+        for stat in self.statistics():
+            lines.append('%-8s %-30s %-40s %7d %9.3f %9.3f %9.3f'
+                         % (stat['phase'], stat['parameter'],
+                            stat['callback'], stat['count'],
+                            1e3 * stat['p50'], 1e3 * stat['p99'],
+                            1e3 * stat['max']))
+        return '\n'.join(lines)
+
+
+class ProfilerPanel(QtWidgets.QWidget):
+    """Window showing the statistics of a WatcherProfiler, refreshed every
+    PROFILER_REFRESH milliseconds while visible"""
+
+    COLUMNS = ['phase', 'parameter', 'callback', 'count', 'p50', 'p99', 'max']
+
+    def __init__(self, profiler: WatcherProfiler = None, parent=None):
+        super(ProfilerPanel, self).__init__(parent=parent)
+        self.setWindowTitle('Profiler')
+        self.profiler = profiler if profiler is not None else WatcherProfiler()
+
+        self._table = QtWidgets.QTableWidget(0, len(self.COLUMNS))
+        self._table.setHorizontalHeaderLabels(
+            [c if c in ['phase', 'parameter', 'callback', 'count']
+             else c + ' (ms)' for c in self.COLUMNS])
+        self._table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self._enable = QtWidgets.QCheckBox('Enabled')
+        self._enable.setChecked(self.profiler.running)
+        self._enable.toggled.connect(self._set_enabled)
+        reset = QtWidgets.QPushButton('Reset')
+        reset.clicked.connect(self._reset)
+
+        buttons = QtWidgets.QHBoxLayout()
+        buttons.addWidget(self._enable)
+        buttons.addStretch()
+        buttons.addWidget(reset)
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addLayout(buttons)
+        layout.addWidget(self._table)
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(PROFILER_REFRESH)
+        self._timer.timeout.connect(self.refresh)
+
+    def _set_enabled(self, value):
+        if value:
+            self.profiler.start()
+        else:
+            self.profiler.stop()
+
+    def _reset(self):
+        self.profiler.reset()
+        self.refresh()
+
+    def refresh(self):
+        stats = self.profiler.statistics()
+        self._table.setRowCount(len(stats))
+        for i, stat in enumerate(stats):
+            for j, column in enumerate(self.COLUMNS):
+                value = stat[column]
+                if isinstance(value, float):
+                    value = '%.3f' % (1e3 * value)
+                self._table.setItem(i, j, QtWidgets.QTableWidgetItem(
+                    str(value)))
+
+    def showEvent(self, ev):
+        self.refresh()
+        self._timer.start()
+        super(ProfilerPanel, self).showEvent(ev)
+
+    def hideEvent(self, ev):
+        self._timer.stop()
+        super(ProfilerPanel, self).hideEvent(ev)
+
+
+# Qt events recorded by the tracer
+_TRACED_EVENTS = {
+    QtCore.QEvent.MouseButtonPress: 'input',
+    QtCore.QEvent.MouseButtonRelease: 'input',
+    QtCore.QEvent.MouseButtonDblClick: 'input',
+    QtCore.QEvent.MouseMove: 'input',
+    QtCore.QEvent.Wheel: 'input',
+    QtCore.QEvent.KeyPress: 'input',
+    QtCore.QEvent.KeyRelease: 'input',
+    QtCore.QEvent.Paint: 'paint',
+}
+_EVENT_NAMES = {value: name for name, value in vars(QtCore.QEvent).items()
+                if isinstance(value, QtCore.QEvent.Type)}
+
+
+class Tracer(QtCore.QObject):
+    """Instrument recording the timeline of parameter changes: spans of the
+    edits in controls, of value setting, of watchers and of display
+    updates, and instants of Qt input and paint events. Events are kept in
+    a ring buffer of TRACE_SIZE events, with nanosecond timestamps, and can
+    be saved in Chrome trace format (loadable in chrome://tracing or
+    Perfetto). Use start() and stop(), or add_actions() to control it from
+    a ControlMenu."""
+
+    def __init__(self, size=TRACE_SIZE, parent=None):
+        super(Tracer, self).__init__(parent)
+        # events: (category, name, start, end or None for instants)
+        self.events = deque(maxlen=size)
+
+    def start(self):
+        _pq.add_instrument(self)
+        QtWidgets.QApplication.instance().installEventFilter(self)
+
+    def stop(self):
+        _pq.remove_instrument(self)
+        QtWidgets.QApplication.instance().removeEventFilter(self)
+
+    @property
+    def running(self):
+        return self in _pq._instruments
+
+    def clear(self):
+        self.events.clear()
+
+    def record(self, phase, obj, name, callback, start, end):
+        label = _parameter_name(obj, name)
+        if callback is not None:
+            label += ' ' + _callback_name(callback)
+        self.events.append((phase, label, start, end))
+
+    def eventFilter(self, obj, event):
+        category = _TRACED_EVENTS.get(event.type())
+        if category is not None:
+            self.events.append((category, '%s %s' % (
+                _EVENT_NAMES.get(event.type(), event.type()),
+                obj.metaObject().className()), time.perf_counter_ns(), None))
+        return False
+
+    def chrome_trace(self):
+        """Events in Chrome trace format (timestamps in microseconds, from
+        the first event)"""
+        if not self.events:
+            return dict(traceEvents=[])
+        pid = os.getpid()
+        t0 = min(event[2] for event in self.events)
+        trace_events = []
+        for category, name, start, end in self.events:
+            event = dict(name=name, cat=category, pid=pid, tid=0,
+                         ts=(start - t0) / 1e3)
+            if end is None:
+                event.update(ph='i', s='t')
+            else:
+                event.update(ph='X', dur=(end - start) / 1e3)
+            trace_events.append(event)
+        return dict(traceEvents=trace_events, displayTimeUnit='ns')
+
+    def save(self, filename):
+        with open(filename, 'w') as f:
+            json.dump(self.chrome_trace(), f)
+
+    def add_actions(self, menu: _pq.ControlMenu):
+        """Add to the menu an action to start/stop tracing and an action to
+        save the trace"""
+        menu.add_action('Trace parameter changes', self._set_running,
+                        checkable=True)
+        menu.add_action('Save trace', self._save_dialog, dots=True)
+
+    def _set_running(self, value):
+        if value:
+            self.clear()
+            self.start()
+        else:
+            self.stop()
+
+    def _save_dialog(self):
+        filename, _ = QtWidgets.QFileDialog.getSaveFileName(
+            None, _pq.translate('Save trace'), 'trace.json',
+            'Chrome trace (*.json)')
+        if filename:
+            self.save(filename)
+
+
+# ACCOUNTING OF UI OBJECTS
+
+# rough memory estimates (bytes) of the objects counted by accounting(),
+# icons being estimated from their pixel size
+MEMORY_ESTIMATES = {'widget': 6144, 'action': 1024, 'watcher': 512,
+                    'translation': 512}
+
+# delay (ms) between two refreshes of the accounting panel
+ACCOUNTING_REFRESH = 1000
+
+
+def _panel_objects(panel):
+    # Qt objects and other objects (sections) making the panel or menu
+    qobjects = {}
+    others = []
+
+    def add(obj):
+        qobjects[id(obj)] = obj
+        for child in obj.findChildren(QtCore.QObject):
+            qobjects[id(child)] = child
+
+    if isinstance(panel, _pq.ControlMenu):
+        add(panel)
+        for entry in panel.entries:
+            if isinstance(entry, _pq.ControlMenu):
+                sub_qobjects, sub_others = _panel_objects(entry)
+                qobjects.update((id(obj), obj) for obj in sub_qobjects)
+                others += sub_others
+            else:
+                add(entry)
+                control = getattr(entry, 'control', None)
+                if isinstance(control, QtCore.QObject):
+                    add(control)
+    else:
+        add(panel)
+        others += getattr(panel, 'sections', [])
+    return list(qobjects.values()), others
+
+
+def _icon_memory(icon):
+    sizes = icon.availableSizes()
+    return max([4 * size.width() * size.height() for size in sizes] or [0])
+
+
+def _count_watchers(obj):
+    # all param watchers of the object and of its parameters
+    n = 0
+    if isinstance(obj, type):
+        parameters = obj.param.objects(False)
+    else:
+        parameters = obj.param.objects('existing')
+        # (public in recent param versions, private before)
+        instance_watchers = getattr(obj.param, 'watchers', None)
+        if instance_watchers is None:
+            instance_watchers = getattr(obj, '_param_watchers', {})
+        n += sum(len(watchers) for what in instance_watchers.values()
+                 for watchers in what.values())
+    n += sum(len(watchers) for p in parameters.values()
+             for watchers in p.watchers.values())
+    return n
+
+
+def accounting(panel):
+    """Count the objects held by a ControlPanel or a ControlMenu (including
+    its sub-menus): Qt widgets and actions, parameter controls, param
+    watchers of the controls and of the controlled objects, TranslationProne
+    registrations and distinct icons; and estimate their memory (bytes)"""
+    qobjects, others = _panel_objects(panel)
+    controls = [obj for obj in qobjects
+                if isinstance(obj, _pq._ParameterControlBase)]
+    icons = {}
+    for obj in qobjects:
+        if isinstance(obj, (QtWidgets.QAction, QtWidgets.QAbstractButton)):
+            icon = obj.icon()
+            if not icon.isNull():
+                icons[icon.cacheKey()] = icon
+    observed = {id(control.obj): control.obj for control in controls}
+
+    counts = dict(
+        widgets=sum(isinstance(obj, QtWidgets.QWidget) for obj in qobjects),
+        actions=sum(isinstance(obj, QtWidgets.QAction) for obj in qobjects),
+        controls=len(controls),
+        watchers=sum(len(control._watchers) for control in controls),
+        object_watchers=sum(_count_watchers(obj)
+                            for obj in observed.values()),
+        translation=sum(isinstance(obj, _pq.TranslationProne)
+                        for obj in qobjects + others),
+        icons=len(icons),
+    )
+    counts['memory'] = (
+        sum(MEMORY_ESTIMATES[key] * counts[key + 's']
+            for key in ['widget', 'action', 'watcher'])
+        + MEMORY_ESTIMATES['translation'] * counts['translation']
+        + sum(_icon_memory(icon) for icon in icons.values()))
+    return counts
+
+
+def global_accounting():
+    """Application-wide counts: Qt widgets, TranslationProne registrations,
+    and icons in the caches of paramqt"""
+    return dict(
+        widgets=len(QtWidgets.QApplication.allWidgets()),
+        translation=len(_pq._InternalPar.param['translation']
+                        .watchers.get('value', [])),
+        cached_icons=(len(_pq._icons)
+                      + _pq._color_icon.cache_info().currsize),
+    )
+
+
+class AccountingPanel(QtWidgets.QWidget):
+    """Window showing the accounting of the watched panels and menus,
+    refreshed every ACCOUNTING_REFRESH milliseconds while visible. Panels
+    are only weakly referenced: deleted panels disappear from the list."""
+
+    COLUMNS = ['panel', 'widgets', 'actions', 'controls', 'watchers',
+               'object_watchers', 'translation', 'icons', 'memory']
+
+    def __init__(self, panels=(), parent=None):
+        super(AccountingPanel, self).__init__(parent=parent)
+        self.setWindowTitle('Accounting')
+        self._panels = []  # [weakref]
+
+        self._global = QtWidgets.QLabel()
+        self._table = QtWidgets.QTableWidget(0, len(self.COLUMNS))
+        self._table.setHorizontalHeaderLabels(
+            [c.replace('_', ' ') + (' (KiB)' if c == 'memory' else '')
+             for c in self.COLUMNS])
+        self._table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addWidget(self._global)
+        layout.addWidget(self._table)
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(ACCOUNTING_REFRESH)
+        self._timer.timeout.connect(self.refresh)
+
+        for panel in panels:
+            self.watch(panel)
+
+    def watch(self, panel):
+        self._panels.append(weakref.ref(panel))
+
+    def _live_panels(self):
+        self._panels = [ref for ref in self._panels
+                        if ref() is not None and not sip.isdeleted(ref())]
+        return [ref() for ref in self._panels]
+
+    def refresh(self):
+        self._global.setText(', '.join(
+            '%s: %d' % (key.replace('_', ' '), value)
+            for key, value in global_accounting().items()))
+        panels = self._live_panels()
+        self._table.setRowCount(len(panels))
+        for i, panel in enumerate(panels):
+            counts = accounting(panel)
+            counts['panel'] = (getattr(panel, '_title', None)
+                               or panel.objectName() or type(panel).__name__)
+            counts['memory'] = '%.1f' % (counts['memory'] / 1024)
+            for j, column in enumerate(self.COLUMNS):
+                self._table.setItem(i, j, QtWidgets.QTableWidgetItem(
+                    str(counts[column])))
+
+    def showEvent(self, ev):
+        self.refresh()
+        self._timer.start()
+        super(AccountingPanel, self).showEvent(ev)
+
+    def hideEvent(self, ev):
+        self._timer.stop()
+        super(AccountingPanel, self).hideEvent(ev)
@@ -0,0 +1,128 @@
+import time
+from collections import deque
+from PyQt5 import QtCore, QtWidgets, QtGui
+from . import paramqt as _pq
+from .state import _equal
+
+# maximal number of undo steps
+HISTORY_SIZE = 1000
+
+# successive changes of the same parameter within this delay (s) are merged
+# in one undo step (as well as all changes during a slider drag)
+MERGE_INTERVAL = 1.
+
+
+class History(QtCore.QObject):
+    """Undo/redo history of the parameter changes made from controls.
+
+    Each undo step is a list of deltas (object, name, old value, new value),
+    the number of steps is bounded by `size` (oldest steps are dropped).
+    Changes of the same parameter during a slider drag or within
+    `merge_interval` seconds are merged in one step. Undo and redo set the
+    values at once (see paramqt.set_values).
+
+    The history records changes once start() has been called; actions()
+    returns Undo and Redo actions with the standard shortcuts."""
+
+    changed = QtCore.pyqtSignal()
+
+    def __init__(self, size=HISTORY_SIZE, merge_interval=MERGE_INTERVAL,
+                 parent=None):
+        super(History, self).__init__(parent)
+        self.merge_interval = merge_interval
+        self._undo = deque(maxlen=size)  # type: deque[list]
+        self._redo = []  # type: [list]
+        self._last_key = None
+        self._last_time = 0.
+
+    def start(self):
+        _pq.add_change_listener(self._record)
+
+    def stop(self):
+        _pq.remove_change_listener(self._record)
+
+    def clear(self):
+        self._undo.clear()
+        self._redo = []
+        self._last_key = None
+        self.changed.emit()
+
+    @property
+    def can_undo(self):
+        return bool(self._undo)
+
+    @property
+    def can_redo(self):
+        return bool(self._redo)
+
+    def _record(self, control, old, new):
+        if old is new:
+            # nothing to undo (e.g. array modified in place)
+            return
+        key = (id(control.obj), control.name)
+        now = time.monotonic()
+        dragging = (isinstance(control, QtWidgets.QAbstractSlider)
+                    and control.isSliderDown())
+        if (self._undo and key == self._last_key
+                and (dragging or now - self._last_time < self.merge_interval)):
+            # merge with the last step: keep its old value
+            step = self._undo[-1]
+            step[-1][3] = new
+            if _equal(step[-1][2], new):
+                # back to the initial value: nothing to undo anymore
+                self._undo.pop()
+                self._last_key = None
+        else:
+            self._undo.append([[control.obj, control.name, old, new]])
+            self._last_key = key
+        self._last_time = now
+        self._redo = []
+        self.changed.emit()
+
+    def _apply(self, changes):
+        # (called from actions: errors are reported, not raised, and the step
+        # stays where it is)
+        try:
+            _pq.set_values(changes)
+        except Exception as e:
+            _pq._error_message(_pq.translate('Could not apply the change:'),
+                               str(e), error=e, key=(id(self), type(e)))
+            return False
+        return True
+
+    def undo(self):
+        if not self._undo:
+            return
+        step = self._undo[-1]
+        if not self._apply([(obj, name, old)
+                            for obj, name, old, new in reversed(step)]):
+            return
+        self._redo.append(self._undo.pop())
+        self._last_key = None
+        self.changed.emit()
+
+    def redo(self):
+        if not self._redo:
+            return
+        step = self._redo[-1]
+        if not self._apply([(obj, name, new)
+                            for obj, name, old, new in step]):
+            return
+        self._undo.append(self._redo.pop())
+        self._last_key = None
+        self.changed.emit()
+
+    def actions(self, window):
+        """Undo and redo actions (with standard shortcuts), enabled only when
+        there is something to undo or redo"""
+        undo = _pq.MenuItem('Undo', window, self.undo)
+        undo.setShortcut(QtGui.QKeySequence.Undo)
+        redo = _pq.MenuItem('Redo', window, self.redo)
+        redo.setShortcut(QtGui.QKeySequence.Redo)
+
+        def update():
+            undo.setEnabled(self.can_undo)
+            redo.setEnabled(self.can_redo)
+        self.changed.connect(update)
+        update()
+        return undo, redo
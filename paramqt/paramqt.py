@@ -2,9 +2,13 @@
 # - new slot 'visible' (was added below manually for each class but this is
 #   not very nice)
 # - public method for '_batch_call_watchers'
+# - unwatch for watchers of other attributes than 'value' (see _unwatch)
 
 import time
 import inspect
+import functools
+import weakref
+import contextlib
 import traceback
 import math
 import re
@@ -19,10 +23,17 @@ import param as pm
 # TOOLS
 
 
-def _error_message(*args):
-    """Error message display"""
+def _error_message(*args, error: Exception = None, key=None):
+    """Error message display, through the current error sink (see
+    set_error_sink)"""
     msg = '\n'.join([x if isinstance(x, str) else repr(x) for x in args])
-    QtWidgets.QMessageBox(QtWidgets.QMessageBox.Critical, 'Error', msg).exec()
+    _error_sink.report(msg, error, key)
+
+
+def _unwatch(parameters: pm.parameterized.Parameters, watcher):
+    """Remove a watcher, whichever attribute it watches (param's unwatch
+    handles correctly only watchers of parameter values)"""
+    parameters._watch('remove', watcher, what=watcher.what)
 
 
 class InvalidCaseError(Exception):
@@ -48,33 +59,147 @@ def list_all_parameters(x: Union[pm.Parameterized,
       parameter names) tupples
     - If out flag is 'Parameterized', returns a list of (Parameterized
       instance, list of parameter names) tupples
-    - If out flag is 'Parameter', returns a list of Param instances."""
+    - If out flag is 'Parameter', returns a list of Param instances.
+    See also iter_all_parameters, and ParameterIndex for repeated calls on
+    the same object."""
+    return list(iter_all_parameters(x, out))
 
+
+def iter_all_parameters(x: Union[pm.Parameterized,
+                                 pm.parameterized.ParameterizedMetaclass],
+                        out='Parameter'):
+    """Iterate over the same items as list_all_parameters, without building
+    intermediate lists"""
     assert out in ['Parameter', 'Parameters', 'Parameterized']
-    names = []
-    params = []
-
-    # Current-level parameters
-    for name in x.param:
-        if name == 'name':
-            # not interested in 'name' parameter
-            continue
-        if out == 'Parameter':
-            params.append(x.param[name])
+    if out == 'Parameter':
+        # current-level parameters first
+        for name in x.param:
+            if name != 'name':
+                yield x.param[name]
+        for _, value in _nested_objects(x):
+            yield from iter_all_parameters(value, out)
+        return
+    for x, names in _iter_objects(x):
+        if out == 'Parameters':
+            yield x.param, names
         else:
-            names.append(name)
+            yield x, names
+
 
-    # Nested Parameterized objects
+def _nested_objects(x):
+    # (attribute name, value) of the nested Parameterized objects of x
     for name, value in x.__dict__.items():
-        if (isinstance(value, pm.parameterized.ParameterizedMetaclass)
-                or isinstance(value, GParameterized)):
-            params += list_all_parameters(value, out)
+        if isinstance(value, _NESTED_TYPES):
+            yield name, value
+
+
+def _iter_objects(x, path=None):
+    # (object, parameter names) of x and of its nested objects, nested
+    # objects first; (object, parameter names, dotted path of the object)
+    # if a path is given
+    for attribute, value in _nested_objects(x):
+        yield from _iter_objects(
+            value, None if path is None else path + (attribute,))
+    # not interested in 'name' parameter
+    names = [name for name in x.param if name != 'name']
+    if path is None:
+        yield x, names
+    else:
+        yield x, names, '.'.join(path)
+
+
+# Generation of the structure of the trees of nested objects: incremented
+# each time a nested GParameterized object is set or replaced (see
+# GParameterized.__setattr__), to invalidate the ParameterIndex instances.
+_structure_generation = 0
+
+
+class ParameterIndex:
+    """Index of the parameters of a Parameterized object and of its nested
+    objects, by dotted path (e.g. 'shape.edge.width' for the parameter width
+    of obj.shape.edge). The index is built on first use, and built again
+    when a nested object has been set or replaced on a GParameterized
+    instance since (changes of nested objects of classes are not detected,
+    call invalidate() in that case). Use parameter_index to get the index
+    of an object, shared by all its users."""
+
+    def __init__(self, obj: Union[pm.Parameterized,
+                                  pm.parameterized.ParameterizedMetaclass]):
+        self.obj = obj
+        self._generation = None
+        self._objects = []  # type: [(pm.Parameterized, [str])]
+        self._paths = {}  # type: {str: (pm.Parameterized, str)}
+
+    def invalidate(self):
+        self._generation = None
+
+    def _update(self):
+        if self._generation == _structure_generation:
+            return
+        self._generation = _structure_generation
+        self._objects = []
+        self._paths = {}
+        for x, names, path in _iter_objects(self.obj, ()):
+            self._objects.append((x, names))
+            prefix = path + '.' if path else ''
+            for name in names:
+                self._paths[prefix + name] = (x, name)
+
+    def __len__(self):
+        self._update()
+        return len(self._paths)
+
+    def __contains__(self, path):
+        self._update()
+        return path in self._paths
+
+    def __getitem__(self, path) -> (pm.Parameterized, str):
+        """(object, parameter name) of the parameter at path"""
+        self._update()
+        return self._paths[path]
+
+    def parameter(self, path) -> pm.Parameter:
+        x, name = self[path]
+        return x.param[name]
+
+    def get_value(self, path):
+        x, name = self[path]
+        return getattr(x, name)
+
+    def set_value(self, path, value):
+        x, name = self[path]
+        setattr(x, name, value)
+
+    def paths(self):
+        """Iterate over the dotted paths of all parameters"""
+        self._update()
+        return iter(self._paths)
+
+    def items(self):
+        """Iterate over (dotted path, object, parameter name) of all
+        parameters"""
+        self._update()
+        return ((path, x, name) for path, (x, name) in self._paths.items())
 
-    if out == 'Parameters':
-        params.append((x.param, names))
-    elif out == 'Parameterized':
-        params.append((x, names))
-    return params
+    def objects(self):
+        """Iterate over (object, parameter names), in the same order as
+        list_all_parameters(obj, out='Parameterized')"""
+        self._update()
+        return iter(self._objects)
+
+
+# indexes of objects, see parameter_index
+_parameter_indexes = weakref.WeakKeyDictionary()
+
+
+def parameter_index(obj: Union[pm.Parameterized,
+                               pm.parameterized.ParameterizedMetaclass]) \
+        -> ParameterIndex:
+    """The (cached) ParameterIndex of obj"""
+    index = _parameter_indexes.get(obj)
+    if index is None:
+        index = _parameter_indexes[obj] = ParameterIndex(obj)
+    return index
 
 
 _QtColors = {QtGui.QColor(color_name).name(): color_name
@@ -89,45 +214,129 @@ def q_color_from_hex(str):
     return QtGui.QColor.fromRgb(rgb)
 
 
-def text_display(value, param: pm.Parameter):
-    '''Format value to text'''
-
-    if isinstance(param, pm.Integer):
+def _format_number(value):
+    # display a reasonable number of decimals
+    if value is None:
         return str(value)
-    elif isinstance(param, pm.Number):
-        # display a reasonable number of decimals
-        a = math.fabs(value)
-        if isinstance(value, int):
-            fmt = '{}'
-        elif a % 1 == 0:
-            # integer
-            if value < 1e7:
-                fmt = '{:.0f}.'
-            else:
-                fmt = '{:.3g}'
+    a = math.fabs(value)
+    if isinstance(value, int):
+        fmt = '{}'
+    elif a % 1 == 0:
+        # integer
+        if value < 1e7:
+            fmt = '{:.0f}.'
         else:
-            # float
-            if a < 1:
-                fmt = '{:.3g}'
-            elif a < 1e3:
-                fmt = '{:.4g}'
-            elif a < 1e4:
-                fmt = '{:.4g}.'
-            else:
-                fmt = '{:.3g}'
-        return fmt.format(value)
-    elif isinstance(param, pm.Color):
-        if value is None:
-            return '(' + translate('none') + ')'
-        if value[0] != '#':
-            value = '#' + value
-        q_color_name = translate(_QtColors.get(value, None))
-        if q_color_name:
-            return "%s (%s)" % (q_color_name, value)
+            fmt = '{:.3g}'
+    else:
+        # float
+        if a < 1:
+            fmt = '{:.3g}'
+        elif a < 1e3:
+            fmt = '{:.4g}'
+        elif a < 1e4:
+            fmt = '{:.4g}.'
         else:
-            return value
+            fmt = '{:.3g}'
+    return fmt.format(value)
+
+
+def _format_number_array(values):
+    # same formats as _format_number, each applied on a group of values
+    a = np.abs(values)
+    with np.errstate(invalid='ignore'):
+        # (NaN and infinite values are not whole)
+        whole = (a % 1 == 0)
+    small = (values < 1e7)
+    out = np.empty(values.shape, dtype=object)
+    for mask, fmt in [(whole & small, '%.0f.'),
+                      (whole & ~small, '%.3g'),
+                      (~whole & (a < 1), '%.3g'),
+                      (~whole & (a >= 1) & (a < 1e3), '%.4g'),
+                      (~whole & (a >= 1e3) & (a < 1e4), '%.4g.'),
+                      (~whole & ~(a < 1e4), '%.3g')]:
+        if mask.any():
+            out[mask] = [fmt % x for x in values[mask].tolist()]
+    return out
+
+
+# maximal number of colors whose texts and icons are memorized
+COLOR_CACHE_SIZE = 1024
+
+
+# color texts depend on the translation: they are memorized until the
+# translation changes
+@functools.lru_cache(maxsize=COLOR_CACHE_SIZE)
+def _format_color(value):
+    if value is None:
+        return '(' + translate('none') + ')'
+    hex_value = value if value[0] == '#' else '#' + value
+    q_color_name = translate(_QtColors.get(hex_value, None))
+    if q_color_name:
+        return "%s (%s)" % (q_color_name, hex_value)
     else:
+        return hex_value
+
+
+def array_summary(value):
+    '''Short description of an array: shape, data type and statistics'''
+    if value is None:
         return str(value)
+    shape = ' x '.join(str(n) for n in value.shape) or translate('scalar')
+    text = '%s %s' % (shape, value.dtype)
+    if value.size and value.dtype.kind in 'biuf':
+        # (reductions do not copy the array)
+        stats = [(translate('min'), value.min()),
+                 (translate('max'), value.max()),
+                 (translate('mean'), value.mean())]
+        text += ''.join(', %s %s' % (name, _format_number(float(x)))
+                        for name, x in stats)
+    return text
+
+
+_formatters = {}  # type: {type: Callable}
+
+
+def formatter(param: pm.Parameter) -> Callable:
+    '''Formatting function for the values of a parameter; it is selected
+    only once for each parameter class'''
+    param_cls = type(param)
+    try:
+        return _formatters[param_cls]
+    except KeyError:
+        pass
+    if issubclass(param_cls, pm.Integer):
+        fmt = str
+    elif issubclass(param_cls, pm.Number):
+        fmt = _format_number
+    elif issubclass(param_cls, pm.Color):
+        fmt = _format_color
+    elif issubclass(param_cls, pm.Array):
+        fmt = array_summary
+    else:
+        fmt = str
+    _formatters[param_cls] = fmt
+    return fmt
+
+
+def text_display(value, param: pm.Parameter):
+    '''Format value to text'''
+    return formatter(param)(value)
+
+
+def text_display_array(values, param: pm.Parameter):
+    '''Format an array of values to an array of texts (e.g. for table
+    views)'''
+    values = np.asarray(values)
+    fmt = formatter(param)
+    flat = values.ravel()
+    if fmt is _format_number and values.dtype.kind == 'f':
+        return _format_number_array(flat).reshape(values.shape)
+    out = np.empty(flat.shape, dtype=object)
+    if fmt in (str, _format_number) and values.dtype.kind in 'iu':
+        out[:] = [str(x) for x in flat.tolist()]
+    else:
+        out[:] = [fmt(x) for x in flat.tolist()]
+    return out.reshape(values.shape)
 
 
 def example_valid_value(param: pm.Parameter):
@@ -156,6 +365,8 @@ def example_valid_value(param: pm.Parameter):
         except IndexError:
             raise Exception('Cannot create a valid value for selector '
                             'parameter with empty list of objects')
+    elif isinstance(param, pm.Array):
+        return np.zeros(0)
     else:
         raise Exception('Case not handled yet: example value for parameter '
                         'of type %s' % type(param))
@@ -165,6 +376,28 @@ def example_valid_value(param: pm.Parameter):
 
 GRAPHIC_BUTTON_SIZE = QtCore.QSize(64, 64)
 
+# delay (ms) after which widgets that are created on demand (e.g. popup
+# menus) are released when they are not used
+RELEASE_DELAY = 30000
+
+# maximal number of items in a menu, longer lists of values are split into
+# several sub-menus
+MENU_PAGE_SIZE = 40
+
+# lists with more items are only summarized in text fields, showing
+# LIST_SUMMARY_ITEMS items at their start and at their end
+LIST_DISPLAY_MAX = 1000
+LIST_SUMMARY_ITEMS = 5
+
+# number of rows made available at once in array table editors
+ARRAY_PAGE_SIZE = 1000
+
+# minimal delay (ms) between two refreshes of the error panel
+ERROR_PANEL_INTERVAL = 500
+
+# length of the substrings indexed for searching entries of control panels
+SEARCH_NGRAM = 3
+
 
 class _GraphicParameter(pm.Parameter):
     """A subclass Parameters with additional attributes, which for the
@@ -374,6 +607,14 @@ class GList(_GraphicParameter, pm.List):
         self.visible, self.enabled = visible, enabled
         super(GList, self).__init__(*args, **kwargs)
 
+    def __set__(self, obj, val):
+        # compare long lists quickly before calling watchers (see
+        # _list_changed), only for the objects having GList parameters
+        parameters = (self.owner if obj is None else obj).param
+        if '_changed' not in parameters.__dict__:
+            parameters._changed = _list_changed
+        super(GList, self).__set__(obj, val)
+
 
 class GColor(_GraphicParameter, pm.Color):
     __slots__ = ['visible', 'enabled']
@@ -386,6 +627,26 @@ class GColor(_GraphicParameter, pm.Color):
             self.allow_None = kwargs['allow_None']
 
 
+class GArray(_GraphicParameter, pm.Array):
+    __slots__ = ['visible', 'enabled']
+
+    def __init__(self, *args, visible=True, enabled=True, **kwargs):
+        self.visible, self.enabled = visible, enabled
+        super(GArray, self).__init__(*args, **kwargs)
+        self._update_instantiate()
+
+    def _update_instantiate(self):
+        # each instance gets its own copy of the default array (edits are
+        # made in place), except for memory-mapped arrays which are shared
+        # with their file and must not be loaded in memory
+        self.instantiate = not isinstance(self.default, np.memmap)
+
+    def __set__(self, obj, val):
+        super(GArray, self).__set__(obj, val)
+        if obj is None:
+            self._update_instantiate()
+
+
 # sub-class pm.Parameterized to update the visible and enabled attributes
 # of the object parameters at the end of object's initialization
 class GParameterized(pm.Parameterized):
@@ -401,6 +662,25 @@ class GParameterized(pm.Parameterized):
             if isinstance(param, _GraphicParameter):
                 param.check_dependencies()
 
+    def __setattr__(self, name, value):
+        # setting or replacing a nested object changes the structure of the
+        # trees containing self (see ParameterIndex)
+        if isinstance(value, _NESTED_TYPES) \
+                or isinstance(self.__dict__.get(name), _NESTED_TYPES):
+            global _structure_generation
+            _structure_generation += 1
+        super(GParameterized, self).__setattr__(name, value)
+
+    def __delattr__(self, name):
+        if isinstance(self.__dict__.get(name), _NESTED_TYPES):
+            global _structure_generation
+            _structure_generation += 1
+        super(GParameterized, self).__delattr__(name)
+
+
+# types of the nested objects listed by list_all_parameters
+_NESTED_TYPES = (pm.parameterized.ParameterizedMetaclass, GParameterized)
+
 
 # HANDLING TRANSLATION AND TRANSLATION CHANGES
 
@@ -415,6 +695,11 @@ class _InternalPar(pm.Parameterized):
     tooltip_translation = pm.Parameter(default=None)
 
 
+# texts memorized for a given translation must be computed again
+_InternalPar.param.watch(lambda _: _format_color.cache_clear(),
+                         'translation')
+
+
 def set_translation(translation: Callable[[str], str],
                     tooltip_translation: Callable[[str], str]=None):
     if tooltip_translation is not None:
@@ -455,8 +740,8 @@ class TranslationProne:
 
     def __init__(self, *args, **kwargs):
         super(TranslationProne, self).__init__(*args, **kwargs)
-        _InternalPar.param.watch(lambda _: self._update_text(),
-                                 'translation')
+        self._translation_watcher = _InternalPar.param.watch(
+            lambda _: self._update_text(), 'translation')
         try:
             self._update_text()
         except AttributeError:
@@ -469,6 +754,11 @@ class TranslationProne:
         '''Must be overwritten in sub-classes'''
         pass
 
+    def release_watchers(self):
+        """Stop following translation changes, to be called before the
+        object is discarded"""
+        _unwatch(_InternalPar.param, self._translation_watcher)
+
 
 class Label(TranslationProne, QtWidgets.QLabel):
 
@@ -519,6 +809,288 @@ def set_error_handler(set_error_handler: Callable[[Exception], bool],
         _reset_error_handler = reset_error_handler
 
 
+# REPORTING ERRORS
+
+class ErrorSink:
+    """Destination of the error messages of controls, see set_error_sink.
+    `key` identifies errors of the same kind (e.g. same parameter and same
+    error type), it is None when there is no such information."""
+
+    def report(self, message: str, error: Exception = None, key=None):
+        raise NotImplementedError
+
+
+class ModalErrorSink(ErrorSink):
+    """Print the traceback and show the message in a modal dialog (default
+    error sink)"""
+
+    def report(self, message: str, error: Exception = None, key=None):
+        if error is not None:
+            traceback.print_exception(type(error), error,
+                                      error.__traceback__)
+        QtWidgets.QMessageBox(QtWidgets.QMessageBox.Critical, 'Error',
+                              message).exec()
+
+
+class ErrorPanel(ErrorSink, TranslationProne, QtWidgets.QWidget):
+    """Non-modal window listing error messages. Errors with the same key
+    are shown only once with their number of occurrences, tracebacks are
+    shown in tooltips, and the list is refreshed at most every
+    ERROR_PANEL_INTERVAL milliseconds."""
+
+    def __init__(self, parent=None):
+        super(ErrorPanel, self).__init__(parent=parent)
+        self.setWindowFlags(Qt.Tool)
+        self.setAttribute(Qt.WA_ShowWithoutActivating)
+
+        # errors: {key: [message, traceback, count, list item]}
+        self._errors = {}
+        self._outdated = []
+
+        self._list = QtWidgets.QListWidget()
+        self._clear_button = QtWidgets.QPushButton()
+        self._clear_button.clicked.connect(self.clear)
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addWidget(self._list)
+        layout.addWidget(self._clear_button)
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(ERROR_PANEL_INTERVAL)
+        self._timer.timeout.connect(self._flush)
+
+        self._update_text()
+
+    def _update_text(self):
+        self.setWindowTitle(translate('Errors'))
+        self._clear_button.setText(translate('Clear'))
+
+    def report(self, message: str, error: Exception = None, key=None):
+        if key is None:
+            key = message
+        tb = (''.join(traceback.format_exception(
+                  type(error), error, error.__traceback__))
+              if error is not None else None)
+        try:
+            entry = self._errors[key]
+            entry[0], entry[1] = message, tb
+            entry[2] += 1
+        except KeyError:
+            entry = [message, tb, 1, None]
+            self._errors[key] = entry
+        self._outdated.append(entry)
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def _flush(self):
+        for entry in self._outdated:
+            message, tb, count, item = entry
+            if item is None:
+                item = entry[3] = QtWidgets.QListWidgetItem(self._list)
+            item.setText(message if count == 1
+                         else '%s (x%d)' % (message, count))
+            item.setToolTip(tb)
+        self._outdated = []
+        if self._errors:
+            self.show()
+
+    def clear(self):
+        """Remove all errors from the list"""
+        self._timer.stop()
+        self._errors = {}
+        self._outdated = []
+        self._list.clear()
+
+
+_error_sink = ModalErrorSink()  # type: ErrorSink
+
+
+def set_error_sink(sink: ErrorSink):
+    """Set the destination of error messages, e.g. an ErrorPanel instead of
+    modal dialogs"""
+    global _error_sink
+    _error_sink = sink
+
+
+def get_error_sink() -> ErrorSink:
+    return _error_sink
+
+
+# INSTRUMENTATION
+
+# Instruments receive the timings of the phases of parameter changes made
+# from controls: 'edit' (whole change made by a control), 'set'
+# (setting the value), 'watcher' (each watcher call) and 'display'
+# (refreshing the display of a control). They must implement a method
+# record(phase, obj, name, callback, start, end), with start and end from
+# time.perf_counter_ns(). See paramqt.debug.WatcherProfiler and Tracer.
+_instruments = []
+
+
+def add_instrument(instrument):
+    if instrument not in _instruments:
+        _instruments.append(instrument)
+
+
+def remove_instrument(instrument):
+    if instrument in _instruments:
+        _instruments.remove(instrument)
+
+
+def _record(phase, obj, name, callback, start):
+    end = time.perf_counter_ns()
+    for instrument in _instruments:
+        instrument.record(phase, obj, name, callback, start, end)
+
+
+@contextlib.contextmanager
+def _timed_span(phase, obj, name, callback):
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        _record(phase, obj, name, callback, start)
+
+
+_no_span = contextlib.nullcontext()
+
+
+def _span(phase, obj, name, callback=None):
+    """Context manager recording the duration of its block for instruments,
+    if any"""
+    if _instruments:
+        return _timed_span(phase, obj, name, callback)
+    else:
+        return _no_span
+
+
+def _timed_watcher(obj, fn):
+    # watcher function recording the duration of each call, even if failing
+    def timed(*events, **values):
+        name = events[0].name if events else next(iter(values), '')
+        with _timed_span('watcher', obj, name, fn):
+            return fn(*events, **values)
+    return timed
+
+
+def _batch_call_watchers_instrumented(parameters: pm.parameterized.Parameters):
+    """Same as parameters._batch_call_watchers(), but timing each watcher:
+    the queued watchers are replaced by copies with a timed function, which
+    param runs as usual"""
+    self_or_cls = parameters.self_or_cls
+    queue = self_or_cls.param._watchers
+    queue[:] = [watcher._replace(fn=_timed_watcher(self_or_cls, watcher.fn))
+                for watcher in queue]
+    parameters._batch_call_watchers()
+
+
+# CHANGE LISTENERS
+
+# Functions called as listener(control, old value, new value) each time a
+# parameter value has been changed from a control (see
+# paramqt.history.History)
+_change_listeners = []
+
+
+def add_change_listener(listener: Callable):
+    if listener not in _change_listeners:
+        _change_listeners.append(listener)
+
+
+def remove_change_listener(listener: Callable):
+    if listener in _change_listeners:
+        _change_listeners.remove(listener)
+
+
+# BATCHED DISPLAY UPDATES
+
+# controls whose display must be updated at the end of batch_display:
+# {id(control): (control, set of 'value'/'enabled'/'visible')}
+_display_batch = None
+
+
+@contextlib.contextmanager
+def batch_display():
+    """Delay the display updates of all controls until the end of the
+    block, where each control is updated once. The layouts containing the
+    controls are disabled while controls are shown or hidden, so that they
+    are recomputed only once (and not after each control)."""
+    global _display_batch
+    if _display_batch is not None:
+        # nested call
+        yield
+        return
+    _display_batch = {}
+    try:
+        yield
+    finally:
+        batch, _display_batch = _display_batch, None
+        _flush_display_batch(batch)
+
+
+@contextlib.contextmanager
+def _discard_events_on_error(obj):
+    """Same as param.discard_events(obj), but only if the block fails. The
+    queues of events and watchers are copied (param 1.9 appends to them in
+    place, so that param.discard_events would keep the new events)"""
+    events, watchers = list(obj.param._events), list(obj.param._watchers)
+    try:
+        yield
+    except BaseException:
+        obj.param._events, obj.param._watchers = events, watchers
+        raise
+
+
+def set_values(changes):
+    """Set several parameter values, given as a list of (object, name,
+    value), at once: the watchers of all objects are run after all values
+    have been set, and the display of controls is updated at the end (see
+    batch_display). If a value is invalid, nothing is changed (no value set
+    and no event left queued) and the ValueError is raised."""
+    objects = {}
+    for obj, name, value in changes:
+        objects[id(obj)] = obj
+    with batch_display():
+        with contextlib.ExitStack() as stack:
+            for obj in objects.values():
+                stack.enter_context(pm.batch_watch(obj, run=False))
+                stack.enter_context(_discard_events_on_error(obj))
+            previous = []
+            try:
+                for obj, name, value in changes:
+                    old_value = getattr(obj, name)
+                    setattr(obj, name, value)
+                    previous.append((obj, name, old_value))
+            except ValueError:
+                # restore the values already set (their events are dropped)
+                for obj, name, old_value in reversed(previous):
+                    setattr(obj, name, old_value)
+                raise
+        for obj in objects.values():
+            obj.param._batch_call_watchers()
+
+
+def _flush_display_batch(batch):
+    layouts = {}
+    for control, _ in batch.values():
+        if isinstance(control, QtWidgets.QWidget) \
+                and control.parentWidget() is not None:
+            layout = control.parentWidget().layout()
+            if layout is not None and layout.isEnabled():
+                layouts[id(layout)] = layout
+    for layout in layouts.values():
+        layout.setEnabled(False)
+    try:
+        for control, whats in batch.values():
+            for what in ['value', 'enabled', 'visible']:
+                if what in whats:
+                    control.update_display(what)
+    finally:
+        for layout in layouts.values():
+            layout.setEnabled(True)
+            layout.update()
+
+
 # ABSTRACT CLASSES FOR CONTROL OF ONE PARAMETER
 
 class _ParameterControlBase(TranslationProne):
@@ -539,11 +1111,18 @@ class _ParameterControlBase(TranslationProne):
         self.param = obj.param[name]  # type: pm.Parameter
         self._param_base_cls = _get_param_base_class(self.param)
 
-        # Watch parameter changes
+        # Value display can be deferred while the control is not visible
+        # (e.g. in a closed menu), see defer_display
+        self._display_deferred = False
+        self._display_outdated = False
+
+        # Watch parameter changes (watchers are memorized so that they can
+        # be removed by release_watchers)
+        self._watchers = []
         if not self.param.constant:
-            obj.param.watch(self.update_display, name)
-            obj.param.watch(self.update_display, name, what='enabled')
-            obj.param.watch(self.update_display, name, what='visible')
+            self._watch(self.update_display)
+            self._watch(self.update_display, what='enabled')
+            self._watch(self.update_display, what='visible')
 
         # Create label: stored as an attribute (note that this must occur
         # after _init_control, i.e. after super-class __init__() of the
@@ -568,6 +1147,17 @@ class _ParameterControlBase(TranslationProne):
         for what in ['value', 'enabled', 'visible']:
             self.update_display(what, init=True)
 
+    def _watch(self, fn, what='value'):
+        self._watchers.append(self.obj.param.watch(fn, self.name, what=what))
+
+    def release_watchers(self):
+        """Stop following parameter and translation changes, to be called
+        before the control is discarded"""
+        for watcher in self._watchers:
+            _unwatch(self.obj.param, watcher)
+        self._watchers = []
+        super(_ParameterControlBase, self).release_watchers()
+
     @property
     def t_label(self):
         # Do not use automatic name formatting of param
@@ -588,12 +1178,23 @@ class _ParameterControlBase(TranslationProne):
         return value
 
     def set_parameter_value(self, value):
+        # (the whole change is recorded as an edit by instruments, whichever
+        # control made it)
+        with _span('edit', self.obj, self.name, type(self)):
+            self._set_parameter_value(value)
+
+    def _set_parameter_value(self, value):
         # This method will handle errors due to invalid value but not due to
         # failing watchers
 
         # Memorize previous value in case we need to switch back
         prev_value = self.parameter_value()
 
+        # Time the different phases if instruments are installed
+        instrumented = bool(_instruments)
+        if instrumented:
+            start = time.perf_counter_ns()
+
         # Attempt to set the value, do not run the watchers yet (otherwise
         # we would not know whether a ValueError is caused by an invalid
         # value or by a watcher failing)
@@ -602,39 +1203,41 @@ class _ParameterControlBase(TranslationProne):
                 setattr(self.obj, self.name, value)
         except ValueError as err:
             # invalid value, parameter was not changed
-            print(repr(err))
-            traceback.print_tb(err.__traceback__)
             _error_message(
                 translate("Cannot set parameter '%s':" % self.name),
-                str(err)
+                str(err),
+                error=err, key=(id(self.obj), self.name, type(err))
             )
             # restore display for the original value
             self._update_value_display()
             return
+        if instrumented:
+            _record('set', self.obj, self.name, None, start)
 
         # Call the watchers, handle errors
         try:
-            self.obj.param._batch_call_watchers()
+            if instrumented:
+                _batch_call_watchers_instrumented(self.obj.param)
+            else:
+                self.obj.param._batch_call_watchers()
         except Exception as err:
             # error will be considered handled if returned value is True
             # or None (no returned value)
             error_handled = (_set_error_handler(err) != False)
             if not error_handled:
-                print(repr(err))
-                traceback.print_tb(err.__traceback__)
                 try:
                     setattr(self.obj, self.name, prev_value)
                     _error_message(
                         translate("Setting parameter '%s' failed with "
                                        "error:") % self.name,
                         err,
-                        translate("Previous value was restored.")
+                        translate("Previous value was restored."),
+                        error=err, key=(id(self.obj), self.name, type(err))
                     )
+                    return
                 except Exception as err2:
                     error_handled = (_reset_error_handler(err2) != False)
                     if not error_handled:
-                        print(repr(err2))
-                        traceback.print_tb(err2.__traceback__)
                         _error_message(
                             translate(
                                 "Setting parameter '%s' failed with "
@@ -643,8 +1246,16 @@ class _ParameterControlBase(TranslationProne):
                             translate(
                                 "Restoring previous value also failed "
                                 "with error:"),
-                            err2
+                            err2,
+                            error=err2,
+                            key=(id(self.obj), self.name, type(err),
+                                 type(err2))
                         )
+                    return
+
+        # The value was changed: notify change listeners
+        for listener in _change_listeners:
+            listener(self, prev_value, value)
 
     def _init_control(self):
         pass
@@ -654,12 +1265,19 @@ class _ParameterControlBase(TranslationProne):
         if isinstance(what, pm.parameterized.Event):
             event = what
             what = event.what
+        if _display_batch is not None and not init:
+            _display_batch.setdefault(id(self), (self, set()))[1].add(what)
+            return
         if what == 'value':
+            if self._display_deferred and not init:
+                self._display_outdated = True
+                return
             # at init, if value is None and there is a checkbox label, put the
             # default value in the control widget
             if init and self._label_display and self.parameter_value() is None:
                 self._display_value(example_valid_value(self.param))
-            self._update_value_display()
+            with _span('display', self.obj, self.name, type(self)):
+                self._update_value_display()
         elif what == 'enabled':
             self.set_enabled(self.param.enabled)
         elif what == 'visible':
@@ -674,6 +1292,14 @@ class _ParameterControlBase(TranslationProne):
         else:
             print("event of type '%s' not handled yet" % what)
 
+    def defer_display(self, deferred: bool):
+        """While display is deferred, value changes only mark the display
+        as outdated; it is updated when display is not deferred anymore"""
+        self._display_deferred = deferred
+        if not deferred and self._display_outdated:
+            self._display_outdated = False
+            self._update_value_display()
+
     def _update_value_display(self, _=None):
         value = self.parameter_value()
         if self.param.allow_None and self._label_display:
@@ -757,15 +1383,15 @@ class _SelectorControlBase(_ParameterControlBase):
 
     def _init_control(self):
         # Add watcher on objects
-        self.obj.param.watch(self._update_objects_list, self.name,
-                             what='names')
-        self.obj.param.watch(self._update_value_display, self.name,
-                             what='objects')
+        self._watch(self._update_objects_list, what='names')
+        self._watch(self._update_objects_list, what='objects')
 
     def _update_objects_list(self, _=None):
-        # will be reimplemented in child classes, unless in fact there is
-        # nothing to do (as is the case with CyclingButton)
-        pass
+        # will be reimplemented in child classes to update their display;
+        # names and tooltips of values will be computed again when needed
+        for attribute in ['_objects_to_names', '_objects_to_tooltips']:
+            if hasattr(self, attribute):
+                delattr(self, attribute)
 
     def _populate_object_name_dict(self):
         # populate the objects to names and tooltips dictionary
@@ -849,6 +1475,7 @@ class ConstantDisplay(_ParameterControlBase, QtWidgets.QLabel):
 class PopupMenu(_SelectorControlBase, QtWidgets.QComboBox):
 
     def _init_control(self):
+        super(PopupMenu, self)._init_control()
         # (allow control shrinking!)
         self.minimumSizeHint = lambda: QtCore.QSize(0, 0)
         self._make_combo_items()
@@ -896,12 +1523,25 @@ class CyclingButton(_SelectorControlBase, QtWidgets.QPushButton):
         # timed mechanism to switch between different options when
         # clicking the button fast enough, but switch back to OFF
         # when clicking after a delay
+        super(CyclingButton, self)._init_control()
         if self._control_has_None():
             self.setCheckable(True)
             self.toggled.connect(self._value_edited)
         else:
             self.clicked.connect(self._value_edited)
         self._last_click_time = 0
+        # (timer owned by the button, so that it does not fire after the
+        # button has been deleted)
+        self._checked = False
+        self._checked_timer = QtCore.QTimer(self)
+        self._checked_timer.setSingleShot(True)
+        self._checked_timer.setInterval(100)
+        self._checked_timer.timeout.connect(
+            lambda: self.setChecked(self._checked))
+
+    def _update_objects_list(self, _=None):
+        super(CyclingButton, self)._update_objects_list(_)
+        self._update_value_display()
 
     def _update_text(self):
         super(CyclingButton, self)._update_text()
@@ -925,8 +1565,8 @@ class CyclingButton(_SelectorControlBase, QtWidgets.QPushButton):
             prev_value_idx = self.all_values().index(prev_value)
         except ValueError:
             # can happen because list of objects was changed but
-            # param.ObjectSelector did not verify at that time that value
-            # was still valid
+            # param.ObjectSelector did not verify at that time that
+            # value was still valid
             prev_value_idx = -1
         if (self._control_has_None() and prev_value is not None
                 and (time.time() - self._last_click_time) > 2):
@@ -946,8 +1586,8 @@ class CyclingButton(_SelectorControlBase, QtWidgets.QPushButton):
         self.setText(button_txt)
         # set checked state after a tiny delay, to make sure this
         # happens after the automatic toggling of the toggle button
-        QtCore.QTimer.singleShot(
-            100, lambda: self.setChecked(bool(value)))
+        self._checked = bool(value)
+        self._checked_timer.start()
 
     def _button_text(self, value):
         value_txt = translate(value) if value is not None else '-'
@@ -965,6 +1605,19 @@ def icon_path(name):
     return "images/icons/%s.png" % name
 
 
+_icons = {}  # type: {str: QtGui.QIcon}
+
+
+def cached_icon(name):
+    # type: (str) -> QtGui.QIcon
+    """Icon loaded only once and shared between all the controls using it"""
+    try:
+        return _icons[name]
+    except KeyError:
+        icon = _icons[name] = QtGui.QIcon(icon_path(name))
+        return icon
+
+
 def create_on_off_icons(name):
     icon_name = icon_path(name)
     on_pixmap = QtGui.QPixmap(icon_name)
@@ -983,6 +1636,9 @@ def create_on_off_icons(name):
 
 class ButtonGroup(_SelectorControlBase, QtWidgets.QWidget):
     def _init_control(self):
+        super(ButtonGroup, self)._init_control()
+        self._buttons = []   # type: [QtWidgets.QPushButton]
+
         # Set if the button group accepts multiple elements
         self._multi = self.param.user.get('multivalues', False)
 
@@ -1004,8 +1660,19 @@ class ButtonGroup(_SelectorControlBase, QtWidgets.QWidget):
 
     def _update_buttons(self):
         # this is a container widget, and as such, it needs to be populated
-        layout = _FlowLayout()
-        self._buttons = []   # type: [QtWidgets.QPushButton]
+        # (with new buttons when the list of objects changes)
+        layout = self.layout()
+        if layout is None:
+            layout = _FlowLayout()
+            self.setLayout(layout)
+        # (lay out the buttons once at the end, rather than each time one
+        # of them is shown)
+        layout.setEnabled(False)
+        for button in self._buttons:
+            layout.removeWidget(button)
+            button.deleteLater()
+        self._buttons = []
+        self._current_idx = None
 
         # Generate two sets of icons
         if self._graphic:
@@ -1034,13 +1701,14 @@ class ButtonGroup(_SelectorControlBase, QtWidgets.QWidget):
 
             button.clicked.connect(make_signal(i, value))
             layout.addWidget(button)
+            if self.isVisible():
+                button.show()
             self._buttons.append(button)
 
         # Update the button's texts
         self._update_button_texts()
-
-        # Update the control's layout
-        self.setLayout(layout)
+        layout.setEnabled(True)
+        layout.invalidate()
 
     def _update_button_texts(self):
         for button, value in zip(self._buttons, self.param.objects):
@@ -1142,14 +1810,38 @@ class ButtonGroup(_SelectorControlBase, QtWidgets.QWidget):
 
     def _check_button(self, i, checked):
         self._buttons[i].setChecked(checked)
-        self._buttons[i].setIcon(self._on_icons[i] if checked else self._off_icons[i])
+        if self._graphic:
+            self._buttons[i].setIcon(self._on_icons[i] if checked
+                                     else self._off_icons[i])
+
+
+class _Popup(QtWidgets.QWidget):
+    """Popup window that emits a signal when it gets hidden"""
+    hidden = QtCore.pyqtSignal()
+
+    def hideEvent(self, ev):
+        super(_Popup, self).hideEvent(ev)
+        self.hidden.emit()
 
 
 class ButtonMenu(_SelectorControlBase, QtWidgets.QPushButton):
     def _init_control(self):
         super(ButtonMenu, self)._init_control()
+        # The popup menu is created only when it is shown for the first
+        # time, and released when it has not been used for a while
+        self._menu = None  # type: _Popup
+        self._menu_sizes = {}  # type: {int: QtCore.QSize}
+        self._release_timer = QtCore.QTimer(self)
+        self._release_timer.setSingleShot(True)
+        self._release_timer.setInterval(RELEASE_DELAY)
+        self._release_timer.timeout.connect(self._release_menu)
+
+        self.clicked.connect(self._show_menu)
+        self.setCheckable(self._control_has_None())
+
+    def _create_menu(self):
         # Create the menu that will be used for it
-        self._menu = QtWidgets.QWidget()
+        self._menu = _Popup()
 
         # update the buttons
         self._update_buttons()
@@ -1157,18 +1849,25 @@ class ButtonMenu(_SelectorControlBase, QtWidgets.QPushButton):
         # set the characteristics of the popup menu
         self._menu.setWindowFlags(Qt.Popup)
         self._menu.setWindowModality(Qt.WindowModal)
-        self._menu.hide()
-        self.clicked.connect(self._show_menu)
-        self.setCheckable(self._control_has_None())
+        self._menu.hidden.connect(self._release_timer.start)
+
+    def _release_menu(self):
+        if self._menu is None or self._menu.isVisible():
+            return
+        self._menu.deleteLater()
+        self._menu = None
+        self._buttons = []
+        self._menu_sizes = {}
 
     def _update_buttons(self):
         layout = _FlowLayout()
         self._buttons = []  # type: [QtWidgets.QPushButton]
+        self._menu_sizes = {}
 
         for value in self.all_values():
             # add the button
             button = QtWidgets.QPushButton()
-            button.setIcon(QtGui.QIcon(icon_path(self.name + '/' + str(value))))
+            button.setIcon(cached_icon(self.name + '/' + str(value)))
             button.setIconSize(GRAPHIC_BUTTON_SIZE)
             self._buttons.append(button)
             layout.addWidget(button)
@@ -1183,6 +1882,8 @@ class ButtonMenu(_SelectorControlBase, QtWidgets.QPushButton):
         self._menu.setLayout(layout)
 
     def _update_button_texts(self):
+        if self._menu is None:
+            return
         for button, value in zip(self._buttons, self.all_values()):
             name = self.value_name(value)
             tooltip = self.value_tooltip(value)
@@ -1197,6 +1898,9 @@ class ButtonMenu(_SelectorControlBase, QtWidgets.QPushButton):
                 button.setToolTip(t_name + '\n' + t_tooltip)
 
     def _show_menu(self):
+        self._release_timer.stop()
+        if self._menu is None:
+            self._create_menu()
         self._ensure_checked_state()
         self._adjust_menu_size()
 
@@ -1216,14 +1920,22 @@ class ButtonMenu(_SelectorControlBase, QtWidgets.QPushButton):
         self.set_parameter_value(value)
 
     def _adjust_menu_size(self):
-        # first, set the width to the maximum size
+        # first, set the width to the maximum size (layout computations
+        # are memorized for each width)
         width = self.parent().width()
-        layout = self._menu.layout()  # type: _FlowLayout
-        self._menu.setFixedSize(layout.sizeParams(width))
+        try:
+            size = self._menu_sizes[width]
+        except KeyError:
+            layout = self._menu.layout()  # type: _FlowLayout
+            size = self._menu_sizes[width] = layout.sizeParams(width)
+        self._menu.setFixedSize(size)
 
     def _update_objects_list(self, _=None):
         super(ButtonMenu, self)._update_objects_list(_)
-        self._update_buttons()
+        # buttons will be re-created next time the menu is shown
+        if self._menu is not None:
+            self._menu.hide()
+            self._release_menu()
         self._update_value_display()
 
     def _update_text(self):
@@ -1244,7 +1956,7 @@ class ButtonMenu(_SelectorControlBase, QtWidgets.QPushButton):
         else:
             self.setToolTip(t_label + '-')
 
-        self.setIcon(QtGui.QIcon(icon_path(self.name + '/' + str(value))))
+        self.setIcon(cached_icon(self.name + '/' + str(value)))
         self.setIconSize(GRAPHIC_BUTTON_SIZE)
         self.setSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
         self._ensure_checked_state()
@@ -1338,6 +2050,242 @@ class CheckBox(_ParameterControlBase, QtWidgets.QCheckBox):
             self.setText(self.t_label)
 
 
+# make the number of slider steps divisible by a large number of integers to
+# minimize the chances of rounding errors on float values
+SLIDER_STEPS = 6300  # 6300 = 2^2 * 3^2 * 5^2 * 7
+# maximal number of slider steps with adaptive resolution
+MAX_SLIDER_STEPS = 100 * SLIDER_STEPS
+
+
+class SliderMapping:
+    """Conversion between parameter values and slider positions in
+    [0, n_steps], for given bounds and slider mode (see Slider). The mode is
+    resolved once at creation, so that conversions are fast. to_control
+    and from_control also accept NumPy arrays, for example to compute tick
+    positions or lookup tables.
+    The number of steps is set by `resolution`: an integer, None for the
+    default SLIDER_STEPS, or 'adaptive' to choose it from the bounds, mode
+    and type of the parameter."""
+
+    _mode_pattern = re.compile(
+        r'(linear|log|left|right|middle|ext|tan) *(\d*\.?\d*)')
+
+    def __init__(self, bounds, mode: str = None, integer: bool = False,
+                 resolution: Union[int, str] = None):
+        b, B = bounds  # type: float
+        # values at the ends of the slider
+        self._ends = (b, B)
+        if b is not None and math.isinf(b):
+            b = None
+        if B is not None and math.isinf(B):
+            B = None
+
+        # determine mode
+        if b is None or B is None:
+            # at least one bound is infinite
+            if mode is not None and 'tan' not in mode:
+                raise ValueError("Slider mode must be 'tan' when at least one "
+                                 "bound is infinite")
+            mode = 'tan'
+        elif mode is None:
+            if (b == -B) or (b >= 0 and b + B == 2):
+                # interval is centered on 0 or on 1, be more fine-grained in
+                # the middle
+                mode = 'middle'
+            elif b > 0 and B >= 50 * b:
+                # logarithmic scale
+                mode = 'log'
+            else:
+                mode = 'linear'
+        elif mode == 'log' and b <= 0:
+            raise ValueError("Slider mode can't be 'log' if lower bound "
+                             "isn't positive")
+        mode, strength = self._mode_pattern.search(mode).groups()
+        strength = float(strength) if strength else 1.
+
+        # initial linear mapping between slider and some interval
+        if mode == 'linear':
+            map_control = (b, B)
+            aff_value = None
+        elif mode == 'log':
+            map_control = (math.log(b), math.log(B))
+            aff_value = None
+        elif mode == 'left':
+            map_control = (0, 1)
+            aff_value = (b, B - b)
+        elif mode == 'right':
+            map_control = (1, 0)
+            aff_value = (B, b - B)
+        elif mode in ['middle', 'ext']:
+            map_control = (-1, 1)
+            aff_value = ((b + B) / 2, (B - b) / 2)
+        elif mode == 'tan':
+            if b is None and B is None:
+                map_control = (-1, 1)
+                aff_value = None
+            elif b is None:
+                map_control = (-1, 0)
+                aff_value = (B, 1)
+            elif B is None:
+                map_control = (0, 1)
+                aff_value = (b, 1)
+            else:
+                map_control = (math.atan(b), math.atan(B))
+                aff_value = None
+        else:
+            raise InvalidCaseError
+
+        self.bounds = (b, B)
+        self.mode = mode
+        self.strength = strength
+        self.integer = integer
+        self._map_control = map_control
+        self._aff_value = aff_value
+
+        # number of slider steps
+        if resolution is None:
+            self.n_steps = SLIDER_STEPS
+        elif resolution == 'adaptive':
+            self.n_steps = self._adaptive_steps()
+        elif isinstance(resolution, int) and resolution > 0:
+            self.n_steps = resolution
+        else:
+            raise ValueError("Slider resolution must be a positive integer "
+                             "or 'adaptive'")
+
+    def _adaptive_steps(self):
+        b, B = self.bounds
+        if self.integer and self.mode == 'linear' \
+                and B - b <= MAX_SLIDER_STEPS:
+            # one step per integer value
+            return max(int(B - b), 1)
+
+        # more steps when the mapping is strongly non-linear, i.e. on
+        # logarithmic scales extending over several decades, or with a
+        # large strength
+        if self.mode == 'log':
+            factor = max(math.ceil(math.log10(B / b)), 1)
+        elif self.mode in ['left', 'right', 'middle', 'ext']:
+            factor = math.ceil(1 + self.strength)
+        else:
+            factor = 1
+        n_steps = SLIDER_STEPS * factor
+
+        # integer values are not evenly spaced on the slider in these modes:
+        # use enough steps for the largest gap between values to be at most
+        # 1, so that all values can be reached
+        if self.integer:
+            if self.mode == 'log':
+                n_steps = max(n_steps, math.ceil(B * math.log(B / b)))
+            elif self.mode in ['left', 'right', 'middle', 'ext']:
+                n_steps = max(n_steps,
+                              math.ceil((B - b) * (1 + self.strength)))
+        return min(n_steps, MAX_SLIDER_STEPS)
+
+    def from_control(self, x):
+        """Parameter value for slider position x. The ends of the slider give
+        exactly the bounds, also when they are infinite (-inf or inf, where
+        Slider used to give None)"""
+        if isinstance(x, np.ndarray):
+            return self._from_control_array(x)
+
+        # avoid rounding error when we are on the bounds
+        if x == 0:
+            return self._ends[0]
+        elif x == self.n_steps:
+            return self._ends[1]
+        b, B = self.bounds
+        mode, strength = self.mode, self.strength
+        map_control, aff_value = self._map_control, self._aff_value
+        # map [0 n_steps] onto [0 1]
+        x = x / self.n_steps
+        # map [0 1] onto map_control
+        x = map_control[0] + (map_control[1] - map_control[0]) * x
+        # perform nonlinear operation
+        if mode == 'log':
+            x = math.exp(x)
+        elif mode in ['left', 'right', 'middle', 'ext']:
+            x = math.copysign(math.pow(abs(x), (1 + strength)), x)
+        elif mode == 'tan':
+            x = math.tan(math.pi / 2 * x) * strength
+        # final affinity to map result onto [b B]
+        if aff_value:
+            x = aff_value[0] + aff_value[1] * x
+        # final corrections
+        if self.integer:
+            x = round(x)
+        if b is not None and x < b:
+            x = b
+        elif B is not None and x > B:
+            x = B
+        return x
+
+    def to_control(self, x):
+        """Slider position for parameter value x"""
+        if isinstance(x, np.ndarray):
+            return self._to_control_array(x)
+
+        mode, strength = self.mode, self.strength
+        map_control, aff_value = self._map_control, self._aff_value
+        # initial affinity from [b B]
+        if aff_value:
+            x = (x - aff_value[0]) / aff_value[1]
+        # perform nonlinear operation
+        if mode == 'log':
+            x = math.log(x)
+        elif mode in ['left', 'right', 'middle', 'ext']:
+            x = math.copysign(math.pow(abs(x), 1 / (1 + strength)), x)
+        elif mode == 'tan':
+            x = math.atan(x / strength) / (math.pi / 2)
+        # map map_control onto [0 1]
+        x = (x - map_control[0]) / (map_control[1] - map_control[0])
+        # map [0 1] onto [0 n_steps]
+        return round(self.n_steps * x)
+
+    def _from_control_array(self, x):
+        b, B = self.bounds
+        mode, strength = self.mode, self.strength
+        map_control, aff_value = self._map_control, self._aff_value
+        y = x / self.n_steps
+        y = map_control[0] + (map_control[1] - map_control[0]) * y
+        if mode == 'log':
+            y = np.exp(y)
+        elif mode in ['left', 'right', 'middle', 'ext']:
+            y = np.copysign(np.power(np.abs(y), (1 + strength)), y)
+        elif mode == 'tan':
+            y = np.tan(np.pi / 2 * y) * strength
+        if aff_value:
+            y = aff_value[0] + aff_value[1] * y
+        if self.integer:
+            y = np.round(y)
+        if b is not None:
+            y = np.maximum(y, b)
+        if B is not None:
+            y = np.minimum(y, B)
+        # exact values on the bounds
+        y = np.where(x == 0, self._ends[0], y)
+        y = np.where(x == self.n_steps, self._ends[1], y)
+        if self.integer and np.isfinite(y).all():
+            # (infinite bounds at the ends cannot be integers)
+            y = y.astype(int)
+        return y
+
+    def _to_control_array(self, x):
+        mode, strength = self.mode, self.strength
+        map_control, aff_value = self._map_control, self._aff_value
+        x = np.asarray(x, dtype=float)
+        if aff_value:
+            x = (x - aff_value[0]) / aff_value[1]
+        if mode == 'log':
+            x = np.log(x)
+        elif mode in ['left', 'right', 'middle', 'ext']:
+            x = np.copysign(np.power(np.abs(x), 1 / (1 + strength)), x)
+        elif mode == 'tan':
+            x = np.arctan(x / strength) / (np.pi / 2)
+        x = (x - map_control[0]) / (map_control[1] - map_control[0])
+        return np.rint(self.n_steps * x).astype(int)
+
+
 class Slider(_ParameterControlBase, QtWidgets.QSlider):
     """Slider offers a fast-interacting control for an integer or float
     parameter. Its control of the parameter can be non linear, for example
@@ -1355,12 +2303,16 @@ class Slider(_ParameterControlBase, QtWidgets.QSlider):
     - tan X     use tangente function when one or both sides is infinite,
                 value X controls the slope near zero if both sides are
                 infinite, or near the finite side otherwise
-    If `mode` is not set, it is automatically inferred from the bounds."""
+    If `mode` is not set, it is automatically inferred from the bounds.
+    The number of slider steps can be set with the `resolution` user
+    attribute: an integer, or 'adaptive' to choose it from the bounds, the
+    mode and the parameter type (integer parameters with a small range then
+    get one step per value in linear mode, and enough steps for all values
+    to be reachable in the other modes); default is SLIDER_STEPS."""
 
     def _init_control(self):
         # Add watcher on bounds
-        self.obj.param.watch(self._update_value_display, self.name,
-                             what='bounds')
+        self._watch(self._update_bounds, what='bounds')
 
         # check that bounds are defined
         bounds = self.param.bounds
@@ -1370,10 +2322,7 @@ class Slider(_ParameterControlBase, QtWidgets.QSlider):
         if self._control_has_None():
             raise ValueError('slider control not available when '
                              'allowing None')
-        # make (maximum-minimum) divisible by a large number of integers to
-        # minimize the chances of rounding errors on float values
-        self.setMinimum(0)
-        self.setMaximum(6300)  # 6300 = 2^2 * 3^2 * 5^2 * 7
+        self._update_mapping()
         self.setOrientation(Qt.Horizontal)
         self.valueChanged.connect(self._value_edited)
         self._slider_callback_enabled = True
@@ -1421,120 +2370,27 @@ class Slider(_ParameterControlBase, QtWidgets.QSlider):
                 value = min(value, bounds[1])
             self.set_parameter_value(value)
 
-    def _slider_conversion(self, x, from_control: bool):
-        bounds = self.param.bounds
-        b, B = bounds  # type: float
-        if b is not None and math.isinf(b):
-            b = None
-        if B is not None and math.isinf(B):
-            B = None
-
-        # determine mode
-        mode = self.param.user.get('mode', None)
-        if b is None or B is None:
-            # at least one bound is infinite
-            if mode is not None and 'tan' not in mode:
-                raise ValueError("Slider mode must be 'tan' when at least one "
-                                 "bound is infinite")
-            mode = 'tan'
-        elif mode is None:
-            if (b == -B) or (b >= 0 and b + B == 2):
-                # interval is centered on 0 or on 1, be more fine-grained in
-                # the middle
-                mode = 'middle'
-            elif b > 0 and B >= 50 * b:
-                # logarithmic scale
-                mode = 'log'
-            else:
-                mode = 'linear'
-        elif mode == 'log' and b <= 0:
-            raise ValueError("Slider mode can't be 'log' if lower bound "
-                             "isn't positive")
-        pattern = '(linear|log|left|right|middle|ext|tan) *(\d*\.?\d*)'
-        mode, strength = re.search(pattern, mode).groups()
-        strength = float(strength) if strength else 1.
-
-        # initial linear mapping between slider and some interval
-        if mode == 'linear':
-            map_control = (b, B)
-            aff_value = None
-        elif mode == 'log':
-            map_control = (math.log(b), math.log(B))
-            aff_value = None
-        elif mode == 'left':
-            map_control = (0, 1)
-            aff_value = (b, B - b)
-        elif mode == 'right':
-            map_control = (1, 0)
-            aff_value = (B, b - B)
-        elif mode in ['middle', 'ext']:
-            map_control = (-1, 1)
-            aff_value = ((b + B) / 2, (B - b) / 2)
-        elif mode == 'tan':
-            if b is None and B is None:
-                map_control = (-1, 1)
-                aff_value = None
-            elif b is None:
-                map_control = (-1, 0)
-                aff_value = (B, 1)
-            elif B is None:
-                map_control = (0, 1)
-                aff_value = (b, 1)
-            else:
-                map_control = (math.atan(b), math.atan(B))
-                aff_value = None
-        else:
-            raise InvalidCaseError
-
-        # perform conversion
-        m, M = self.minimum(), self.maximum()
-        if from_control:
-            # avoid rounding error when we are on the bounds
-            if x == m:
-                return b
-            elif x == M:
-                return B
-            # map [m M] onto [0 1]
-            x = (x - m) / (M - m)
-            # map [0 1] onto map_control
-            x = map_control[0] + (map_control[1] - map_control[0]) * x
-            # perform nonlinear operation
-            if mode == 'log':
-                x = math.exp(x)
-            elif mode in ['left', 'right', 'middle', 'ext']:
-                x = math.copysign(math.pow(abs(x), (1 + strength)), x)
-            elif mode == 'tan':
-                x = math.tan(math.pi / 2 * x) * strength
-            # final affinity to map result onto [b B]
-            if aff_value:
-                x = aff_value[0] + aff_value[1] * x
-            # final corrections
-            if self._param_base_cls == pm.Integer:
-                x = round(x)
-            if b is not None and x < b:
-                x = b
-            elif B is not None and x > B:
-                x = B
-        else:
-            # initial affinity from [b B]
-            if aff_value:
-                x = (x - aff_value[0]) / aff_value[1]
-            # perform nonlinear operation
-            if mode == 'log':
-                x = math.log(x)
-            elif mode in ['left', 'right', 'middle', 'ext']:
-                x = math.copysign(math.pow(abs(x), 1 / (1 + strength)), x)
-            elif mode == 'tan':
-                x = math.atan(x / strength) / (math.pi / 2)
-            # map map_control onto [0 1]
-            x = (x - map_control[0]) / (map_control[1] - map_control[0])
-            # map [0 1] onto [m M]
-            x = round(m + (M - m) * x)
+    def _update_mapping(self):
+        # conversion between parameter values and slider positions
+        self._mapping = SliderMapping(
+            self.param.bounds, self.param.user.get('mode', None),
+            integer=(self._param_base_cls == pm.Integer),
+            resolution=self.param.user.get('resolution', None))
+        # (do not let a change of range trigger a new value)
+        n_steps = self._mapping.n_steps
+        self._slider_callback_enabled = False
+        self.setRange(0, n_steps)
+        self._slider_callback_enabled = True
+        # keep keyboard and page steps proportional to the range
+        self.setSingleStep(max(round(n_steps / SLIDER_STEPS), 1))
+        self.setPageStep(max(round(10 * n_steps / SLIDER_STEPS), 1))
 
-        return x
+    def _update_bounds(self, _=None):
+        self._update_mapping()
+        self._update_value_display()
 
     def _value_from_control(self):
-        return self._slider_conversion(self.value(), from_control=True)
+        return self._mapping.from_control(self.value())
 
     def _value_edited(self):
         if not self._slider_callback_enabled:
@@ -1544,18 +2400,19 @@ class Slider(_ParameterControlBase, QtWidgets.QSlider):
         if value != prev_value:
             self.set_parameter_value(value)
         elif self._param_base_cls == pm.Integer:
-            # value is unchanged, but slider position changed and we would
-            # like to round it back to the integer marking
+            # value is unchanged, but slider position changed and we
+            # would like to round it back to the integer marking
             self._display_value(prev_value)
 
     def _display_value(self, value):
-        x = self._slider_conversion(value, from_control=False)
+        x = self._mapping.to_control(value)
 
         # update slider display, but prevent its rounding effect to trigger
         # a new value change
-        self._slider_callback_enabled = False
-        self.setValue(x)
-        self._slider_callback_enabled = True
+        if x != self.value():
+            self._slider_callback_enabled = False
+            self.setValue(x)
+            self._slider_callback_enabled = True
 
         # update value display
         if self._label_display:
@@ -1569,6 +2426,19 @@ class Slider(_ParameterControlBase, QtWidgets.QSlider):
             self._display_value(self.parameter_value())
 
 
+def _color_palette(value):
+    # palette for displaying a color, based on the current palette of the
+    # application: use color for the background, and make foreground color
+    # black or white depending on its luminance
+    rgb = int(value.lstrip('#'), 16)
+    luminance = ((rgb >> 16) + ((rgb >> 8) & 0xff) + (rgb & 0xff)) / 3
+    foreground = Qt.black if luminance > 128 else Qt.white
+    palette = QtGui.QPalette()
+    palette.setColor(QtGui.QPalette.Base, q_color_from_hex(value))
+    palette.setColor(QtGui.QPalette.Text, QtGui.QColor(foreground))
+    return palette
+
+
 class ColorButton(_ColorControlBase, QtWidgets.QLineEdit):
 
     def _init_control(self):
@@ -1576,6 +2446,8 @@ class ColorButton(_ColorControlBase, QtWidgets.QLineEdit):
             raise ValueError('color control not available when alllowing None')
         self.setReadOnly(True)
         self.mousePressEvent = self._choose_color
+        # color currently displayed in the background
+        self._background = None
 
     def _display_value(self, value):
         # value is a 6-char string specifying a 24-bit value in hex
@@ -1585,15 +2457,11 @@ class ColorButton(_ColorControlBase, QtWidgets.QLineEdit):
         # and in any case hex code
         self.setText(text_display(value, self.param))
 
-        # use color for the control background, and make
-        # foreground color black or white depending on its luminance
-        luminance = np.mean([int(x) for x in bytes.fromhex(value[1:])])
-        if luminance > 128:
-            foreground = '#000000'
-        else:
-            foreground = '#ffffff'
-        self.setStyleSheet("color:%s; background-color:%s;"
-                           % (foreground, value))
+        # use color for the control background (a palette is much faster
+        # to apply than a style sheet)
+        if value != self._background:
+            self.setPalette(_color_palette(value))
+            self._background = value
 
     def _update_text(self):
         _ParameterControlBase._update_text(self)
@@ -1608,10 +2476,35 @@ class ColorButton(_ColorControlBase, QtWidgets.QLineEdit):
         if value:
             self._display_value(self.parameter_value())
         else:
-            self.setStyleSheet('')
+            self.setPalette(QtGui.QPalette())
+            self._background = None
         super(ColorButton, self).setEnabled(value)
 
 
+def _long_lists_equal(list1, list2):
+    # param compares lists item by item in Python, which takes a significant
+    # time for long lists; compare numeric lists with NumPy instead
+    if len(list1) != len(list2):
+        return False
+    array1, array2 = np.asarray(list1), np.asarray(list2)
+    if array1.dtype.kind in 'biuf' and array2.dtype.kind in 'biuf':
+        return bool(np.array_equal(array1, array2))
+    return pm.parameterized.Comparator.compare_iterator(list1, list2)
+
+
+def _list_changed(event):
+    """Whether the value of a parameter has changed, as decided by param
+    before calling watchers, but comparing long lists of GList parameters
+    with _long_lists_equal (installed by GList on the objects having such
+    parameters)"""
+    old, new = event.old, event.new
+    if type(new) is list and type(old) is list \
+            and len(new) > LIST_DISPLAY_MAX \
+            and isinstance(event.cls.param[event.name], GList):
+        return not _long_lists_equal(old, new)
+    return pm.parameterized.Parameters._changed(event)
+
+
 class LineEdit(_ParameterControlBase, QtWidgets.QLineEdit):
 
     def _init_control(self):
@@ -1623,32 +2516,43 @@ class LineEdit(_ParameterControlBase, QtWidgets.QLineEdit):
         self.textChanged.connect(
             lambda: setattr(self, '_text_changed', True))
 
+        # Long lists are only summarized in the control, and edited in a
+        # separate editor
+        self._summary = False
+
     def _value_from_control(self):
-        if self._control_has_None() and self.text().lower() == 'None':
+        return self._value_from_text(self.text())
+
+    def _value_from_text(self, text):
+        if self._control_has_None() and text.lower() == 'None':
             return None
         elif self._param_base_cls == pm.String:
-            return self.text()
+            return text
         elif self._param_base_cls == pm.Integer:
-            return int(self.text())
+            return int(text)
         elif self._param_base_cls == pm.Number:
-            return float(self.text())
+            return float(text)
         elif self._param_base_cls == pm.List:
-            items = self.text().split()
+            items = text.split()
             typ = self.param.class_
             # print('list:', items)
-            return [typ(x) for x in items]
+            # (map is much faster than a list comprehension on long lists)
+            return list(map(typ, items))
         else:
             raise InvalidCaseError
 
     def _value_edited(self, _=None):
         # Was the text really changed?
-        if not self._text_changed:
+        if not self._text_changed or self._summary:
             return
         else:
             self._text_changed = False
 
+        self._set_value_from_text(self.text())
+
+    def _set_value_from_text(self, text):
         try:
-            value = self._value_from_control()
+            value = self._value_from_text(text)
             self.set_parameter_value(value)
 
         except ValueError:
@@ -1659,10 +2563,12 @@ class LineEdit(_ParameterControlBase, QtWidgets.QLineEdit):
             if self._control_has_None():
                 expected += translate('or') + '"None"'
             _error_message(
-                translate('Invalid Value, %s expected') % expected)
+                translate('Invalid Value, %s expected') % expected,
+                key=(id(self.obj), self.name, ValueError))
             self._update_value_display()
 
     def _display_value(self, value):
+        summary = False
         if value is None:
             self.setText('None')
         elif self._param_base_cls == pm.String:
@@ -1670,7 +2576,168 @@ class LineEdit(_ParameterControlBase, QtWidgets.QLineEdit):
         elif self._param_base_cls in [pm.Integer, pm.Number]:
             self.setText(str(value))
         elif self._param_base_cls == pm.List:
-            self.setText(' '.join([str(x) for x in value]))
+            summary = (len(value) > LIST_DISPLAY_MAX)
+            if summary:
+                self.setText(self._list_summary(value))
+            else:
+                self.setText(' '.join(map(str, value)))
+        if summary != self._summary:
+            self._summary = summary
+            self.setReadOnly(summary)
+            self.setToolTip(translate('Click to edit the full list')
+                            if summary else self.t_tooltip)
+        # text was set by program, not edited
+        self._text_changed = False
+
+    def _list_summary(self, value):
+        n = LIST_SUMMARY_ITEMS
+        return (' '.join(map(str, value[:n])) + ' ... '
+                + ' '.join(map(str, value[-n:]))
+                + '  (%d %s)' % (len(value), translate('values')))
+
+    def mousePressEvent(self, ev):
+        if self._summary:
+            self.edit_full_list()
+        else:
+            super(LineEdit, self).mousePressEvent(ev)
+
+    def edit_full_list(self):
+        """Edit the full list value in a separate text editor"""
+        dialog = QtWidgets.QDialog(self)
+        dialog.setWindowTitle(self.t_label)
+        # one item per line
+        editor = QtWidgets.QPlainTextEdit(
+            '\n'.join(map(str, self.parameter_value())))
+        buttons = QtWidgets.QDialogButtonBox(
+            QtWidgets.QDialogButtonBox.Ok | QtWidgets.QDialogButtonBox.Cancel)
+        buttons.accepted.connect(dialog.accept)
+        buttons.rejected.connect(dialog.reject)
+        layout = QtWidgets.QVBoxLayout(dialog)
+        layout.addWidget(editor)
+        layout.addWidget(buttons)
+        if dialog.exec() == QtWidgets.QDialog.Accepted:
+            self._set_value_from_text(editor.toPlainText())
+
+
+class _ArrayModel(QtCore.QAbstractTableModel):
+    """Table model that reads and writes array items directly in the array,
+    without ever copying it; rows are made available by pages of
+    ARRAY_PAGE_SIZE rows when the view scrolls. Arrays with more than 2
+    dimensions are displayed with one row per index along the first
+    dimension."""
+
+    def __init__(self, array: np.ndarray, edited: Callable = None, **kwargs):
+        super(_ArrayModel, self).__init__(**kwargs)
+        self.array = array
+        self._edited = edited
+        shape = array.shape
+        if array.ndim == 0:
+            self._n_rows, self._n_cols = 1, 1
+        elif array.ndim == 1:
+            self._n_rows, self._n_cols = shape[0], 1
+        else:
+            self._n_rows, self._n_cols = shape[0], int(np.prod(shape[1:]))
+        self._n_fetched = min(self._n_rows, ARRAY_PAGE_SIZE)
+
+    def _item_index(self, row, col):
+        if self.array.ndim == 0:
+            return ()
+        elif self.array.ndim == 1:
+            return (row,)
+        elif self.array.ndim == 2:
+            return (row, col)
+        else:
+            return (row,) + np.unravel_index(col, self.array.shape[1:])
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else self._n_fetched
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else self._n_cols
+
+    def canFetchMore(self, parent):
+        return not parent.isValid() and self._n_fetched < self._n_rows
+
+    def fetchMore(self, parent):
+        n = min(self._n_rows - self._n_fetched, ARRAY_PAGE_SIZE)
+        self.beginInsertRows(QtCore.QModelIndex(), self._n_fetched,
+                             self._n_fetched + n - 1)
+        self._n_fetched += n
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            item = self.array[self._item_index(index.row(), index.column())]
+            return str(item)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal and self.array.ndim > 2:
+            idx = np.unravel_index(section, self.array.shape[1:])
+            return ','.join(str(i) for i in idx)
+        return str(section)
+
+    def flags(self, index):
+        flags = super(_ArrayModel, self).flags(index)
+        if self.array.flags.writeable:
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.EditRole:
+            return False
+        try:
+            self.array[self._item_index(index.row(), index.column())] = value
+        except (ValueError, TypeError):
+            return False
+        if isinstance(self.array, np.memmap):
+            # write the edit to the file
+            self.array.flush()
+        self.dataChanged.emit(index, index)
+        if self._edited is not None:
+            self._edited()
+        return True
+
+
+class ArrayControl(_ParameterControlBase, QtWidgets.QPushButton):
+    """Display of an array parameter summary (shape, data type, statistics);
+    clicking it opens a table editor. Edits are written in place in the
+    array (and in the file for memory-mapped arrays)."""
+
+    def _init_control(self):
+        self._editor = None  # type: QtWidgets.QTableView
+        self.clicked.connect(self.show_editor)
+
+    def _display_value(self, value):
+        self.setText(array_summary(value))
+        # display the new array in the editor
+        if self._editor is not None and self._editor.model().array is not value:
+            self._set_editor_model(value)
+
+    def _update_text(self):
+        super(ArrayControl, self)._update_text()
+        self._update_value_display()
+
+    def _set_editor_model(self, value):
+        model = _ArrayModel(value, edited=self._array_edited,
+                            parent=self._editor)
+        self._editor.setModel(model)
+
+    def show_editor(self, _=None):
+        value = self.parameter_value()
+        if value is None:
+            return
+        if self._editor is None:
+            self._editor = QtWidgets.QTableView()
+            self._set_editor_model(value)
+        self._editor.setWindowTitle(self.t_label)
+        self._editor.show()
+        self._editor.raise_()
+
+    def _array_edited(self):
+        # the array was modified in place, notify watchers
+        self.set_parameter_value(self.parameter_value())
 
 
 def parameter_control(obj: pm.Parameterized, name: str, style=None, **kwargs):
@@ -1731,6 +2798,8 @@ def parameter_control(obj: pm.Parameterized, name: str, style=None, **kwargs):
             control_cls = ColorButton
         elif param_base_cls in [pm.List, pm.String, pm.Color]:
             control_cls = LineEdit
+        elif param_base_cls == pm.Array:
+            control_cls = ArrayControl
         else:
             raise Exception('No control for parameter of type',
                             param_base_cls)
@@ -1787,41 +2856,110 @@ class ToggleMenuItem(_ParameterControlBase, QtWidgets.QAction):
 
 
 class SelectMenu(_SelectorControlBase, QtWidgets.QMenu):
+    """Sub-menu for selecting a value among a list of possible values. Menu
+    items are created only when the menu is about to be shown, and long
+    lists of values are split into pages of MENU_PAGE_SIZE items."""
 
     def __init__(self, window, *args, **kwargs):
         super(SelectMenu, self).__init__(*args, parent=window, **kwargs)
 
         # Add watcher on objects
-        self.obj.param.watch(self._update_objects_list, self.name,
-                             what='names')
-        self.obj.param.watch(self._update_value_display, self.name,
-                             what='objects')
+        self._watch(self._update_objects_list, what='names')
+        self._watch(self._update_objects_list, what='objects')
 
     def _init_control(self):
+        # Menu items will be created when the menu (or one of its pages)
+        # is about to be shown; created items are indexed by value
+        self._actions = {}  # type: {object: QtWidgets.QAction}
+        self._checked_action = None  # type: QtWidgets.QAction
+        self._current_value = None
+        self._pages = []  # type: [QtWidgets.QMenu]
+        self._populated = False
+        self.aboutToShow.connect(self._populate)
+
+    def _populate(self):
+        if self._populated:
+            return
+        self._populated = True
+
+        items = list(zip(self.all_value_names(), self.all_values(),
+                         self.all_value_tooltips()))
+        if len(items) <= MENU_PAGE_SIZE:
+            self._add_items(self, items)
+            return
+
+        # Split long lists into pages
+        for start in range(0, len(items), MENU_PAGE_SIZE):
+            page_items = items[start:start + MENU_PAGE_SIZE]
+            page = QtWidgets.QMenu(translate(page_items[0][0]) + ' - '
+                                   + translate(page_items[-1][0]), self)
+
+            def populate_page(page=page, page_items=page_items):
+                # (early binding, see _add_items below)
+                if not page.actions():
+                    self._add_items(page, page_items)
+
+            page.aboutToShow.connect(populate_page)
+            self.addMenu(page)
+            self._pages.append(page)
+
+    def _add_items(self, menu, items):
         # Create one menu item per possible value
-        for label, value, tooltip in zip(self.all_value_names(),
-                                         self.all_values(),
-                                         self.all_value_tooltips()):
+        for label, value, tooltip in items:
             def callback(checked, val=value):
                 # defining an argument with default value is needed to force
                 # early binding, otherwise all callback would use the last
                 # value in the values list
                 # see https://stackoverflow.com/questions/3431676/creating-functions-in-a-loop
-                if checked and self.parameter_value() != val:
+                if self.parameter_value() != val:
                     self.set_parameter_value(val)
+                else:
+                    # clicking the checked item should not uncheck it
+                    self._display_value(val)
 
-            action = MenuItem(label, self.parent(), callback, checkable=True,
-                              tooltip=tooltip)
+            action = QtWidgets.QAction(translate(label), menu)
+            action.setCheckable(True)
+            action.setToolTip(translate(tooltip))
             action.setData(value)
-            self.addAction(action)
+            action.triggered.connect(callback)
+            menu.addAction(action)
+            self._actions[value] = action
+            if value == self._current_value:
+                action.setChecked(True)
+                self._checked_action = action
+
+    def _clear(self):
+        # Remove menu items, they will be re-created next time the menu is
+        # shown
+        self.clear()
+        for page in self._pages:
+            page.deleteLater()
+        self._pages = []
+        self._actions = {}
+        self._checked_action = None
+        self._populated = False
+
+    def _update_objects_list(self, _=None):
+        super(SelectMenu, self)._update_objects_list(_)
+        self._clear()
+        self._update_value_display()
 
     def _display_value(self, value):
-        for action in self.actions():
-            action.setChecked(action.data() == value)
+        self._current_value = value
+        action = self._actions.get(value, None)
+        if self._checked_action is not None \
+                and self._checked_action is not action:
+            self._checked_action.setChecked(False)
+        if action is not None:
+            action.setChecked(True)
+        self._checked_action = action
 
     def _update_text(self):
         self.setTitle(self.t_label)
         self.setToolTip(self.t_tooltip)
+        # translate menu items when they will be re-created
+        if getattr(self, '_populated', False):
+            self._clear()
 
     def set_visible(self, value):
         # the menu itself is not a graphical element, it is its containing
@@ -1837,6 +2975,8 @@ class SelectMenu(_SelectorControlBase, QtWidgets.QMenu):
 class ControlMenuItem(_ParameterControlBase, QtWidgets.QAction):
     """
     A menu item which, when clicked, will raise a proper control to edit the parameter.
+    The control is created when the menu item is first clicked, and released
+    once it has been hidden for RELEASE_DELAY milliseconds.
     """
 
     def __init__(self, window, *args, **kwargs):
@@ -1846,17 +2986,38 @@ class ControlMenuItem(_ParameterControlBase, QtWidgets.QAction):
         # callback
         self.triggered.connect(self._raise_control)
 
-        # ... and create a panel control which will be shown only when the
-        # menu item will be clicked
-        self.control = parameter_control(self.obj, self.name)
-        self.control.set_visible = lambda val: None  # set_visible should
-        # have no effect on this control, whose visibility will be
-        # controlled rather by self (i.e. the ContromMenuItem object)
-        self.control.hide()
+        # the panel control will be created only when the menu item is
+        # clicked
+        self.control = None
+        self._release_timer = QtCore.QTimer(self)
+        self._release_timer.setSingleShot(True)
+        self._release_timer.setInterval(RELEASE_DELAY)
+        self._release_timer.timeout.connect(self._release_control)
 
     def _raise_control(self):
+        self._release_timer.stop()
+        if self.control is None:
+            self.control = parameter_control(self.obj, self.name)
+            self.control.set_visible = lambda val: None  # set_visible should
+            # have no effect on this control, whose visibility will be
+            # controlled rather by self (i.e. the ContromMenuItem object)
+            self.control.installEventFilter(self)
         self.control.show()
 
+    def eventFilter(self, obj, event):
+        # start the release countdown when the control gets hidden
+        if obj is self.control and event.type() == QtCore.QEvent.Hide:
+            self._release_timer.start()
+        return False
+
+    def _release_control(self):
+        if self.control is None or self.control.isVisible():
+            return
+        self.control.removeEventFilter(self)
+        self.control.release_watchers()
+        self.control.deleteLater()
+        self.control = None
+
     def _display_value(self, value):
         self.setText(translate(self.param.label) + translate(': ')
                      + text_display(value, self.param))
@@ -1866,11 +3027,26 @@ class ControlMenuItem(_ParameterControlBase, QtWidgets.QAction):
         self.setToolTip(translate(self.param.doc))
 
 
+@functools.lru_cache(maxsize=COLOR_CACHE_SIZE)
+def _color_icon(value):
+    # small square of the given color (icons are memorized for the last
+    # COLOR_CACHE_SIZE colors)
+    if value is None:
+        return QtGui.QIcon()
+    pixmap = QtGui.QPixmap(16, 16)
+    pixmap.fill(q_color_from_hex(value))
+    return QtGui.QIcon(pixmap)
+
+
 class ColorMenuItem(ControlMenuItem, _ColorControlBase, QtWidgets.QAction):
 
     def _init_control(self):
         self.triggered.connect(self._choose_color)
 
+    def _display_value(self, value):
+        super(ColorMenuItem, self)._display_value(value)
+        self.setIcon(_color_icon(value))
+
 
 def menu_control(window, obj: pm.Parameterized, name: str, **kwargs):
     param = obj.param[name]
@@ -1924,8 +3100,13 @@ class _PanelBase(TranslationProne):
                 label = (value.label
                          or type(value).__name__.replace('ParamQt.', ''))
                 unfolded = not value.start_folded
-                self.add_section(label, tooltip=value.doc, unfolded=unfolded)
-                self.auto_fill(value)
+                self._add_nested(value, label, tooltip=value.doc,
+                                 unfolded=unfolded)
+
+    def _add_nested(self, obj, label, tooltip=None, unfolded=True):
+        # Add a section for a nested Parameterized object
+        self.add_section(label, tooltip=tooltip, unfolded=unfolded)
+        self.auto_fill(obj)
 
     def add_section(self, name='', obj=None, names=None,
                     tooltip=None, unfolded=True):
@@ -1973,6 +3154,13 @@ class _Section(TranslationProne):
         self.grid = grid
         self.unfolded = unfolded
 
+        # titles of the section and of the sections containing it
+        self.path = [title] if title is not None else []
+
+        # a search filter is applied: matching entries are shown even if
+        # the section is folded
+        self.filtered = False
+
         # List of widgets (memorize objects to keep them alive)
         self.controls = []
         self.buttons = []
@@ -2048,7 +3236,6 @@ class _Section(TranslationProne):
 
     def add_action(self, label, action, **kwargs):
         button = _SectionButton(label, action, parent_section=self, **kwargs)
-        button.setVisible(self.unfolded)
         row = self.grid.rowCount()
         self.grid.addWidget(button, row, 1, 1, 2)
         self.buttons.append(button)
@@ -2062,7 +3249,7 @@ class _Section(TranslationProne):
         for control in self.controls:
             control.update_actual_visible()
         for button in self.buttons:
-            button.setVisible(self.unfolded)
+            button.update_actual_visible()
 
     def set_enabled(self, value):
         for control in self.controls:
@@ -2074,7 +3261,8 @@ class _Section(TranslationProne):
 
     def update_header_visible(self):
         if self.button is not None:
-            value = any([control.visible for control in self.controls])
+            value = any([control.visible and control.matched
+                         for control in self.controls])
             self.button.setVisible(value)
             self.title.setVisible(value)
 
@@ -2082,6 +3270,36 @@ class _Section(TranslationProne):
         for control in self.controls:
             control.entry._update_value_display()
 
+    def search_texts(self):
+        # (element, lower-case text to search) of the controls and buttons
+        path = ' '.join(translate(title) for title in self.path)
+        for control in self.controls:
+            entry = control.control
+            yield control, ' '.join([entry.t_label, entry.name,
+                                     entry.t_tooltip or '', path]).lower()
+        for button in self.buttons:
+            yield button, ' '.join([translate(button._label),
+                                    translate(button._tooltip) or '',
+                                    path]).lower()
+
+    def apply_filter(self, matches):
+        # show only the elements in matches (all elements if matches is
+        # None); update only the elements whose visibility changes, and
+        # return whether there were any
+        filtered = matches is not None
+        changed_filter = (filtered != self.filtered) and not self.unfolded
+        self.filtered = filtered
+        changed = False
+        for element in self.controls + self.buttons:
+            matched = not filtered or element in matches
+            if matched != element.matched or changed_filter:
+                element.matched = matched
+                element.update_actual_visible()
+                changed = True
+        if changed:
+            self.update_header_visible()
+        return changed
+
 
 class _SectionElement:
     """A section element has its visibility controlled both by the section
@@ -2092,6 +3310,8 @@ class _SectionElement:
         super(_SectionElement, self).__init__(*args, **kwargs)
         self.parent_section = parent_section
         self.visible, self.enabled = visible, enabled
+        # matches the search filter of the panel
+        self.matched = True
         # hide the control if section is folded, but do not show it
         # explicitly if section is unfolded, as this could show it
         # prematurately
@@ -2104,7 +3324,9 @@ class _SectionElement:
         self.parent_section.update_header_visible()
 
     def update_actual_visible(self):
-        actual_visible = self.visible and self.parent_section.unfolded
+        section = self.parent_section
+        actual_visible = (self.visible and self.matched
+                          and (section.unfolded or section.filtered))
         self._set_actual_visible(actual_visible)
 
     def _set_actual_visible(self, actual_visible):
@@ -2133,10 +3355,6 @@ class _SectionControl(_SectionElement):
         _SectionElement.__init__(self, parent_section=parent_section,
                                  visible=self.control.param.visible)
 
-    def update_actual_visible(self):
-        value = self.visible and self.parent_section.unfolded
-        self._set_actual_visible(value)
-
 
 class Button(TranslationProne, QtWidgets.QPushButton):
 
@@ -2194,7 +3412,7 @@ class GraphicButton(TranslationProne, QtWidgets.QPushButton):
 class _SectionButton(_SectionElement, Button):
 
     def _set_actual_visible(self, actual_visible):
-        Button.setVisible(actual_visible)
+        Button.setVisible(self, actual_visible)
 
 
 class _FoldingLabel(QtWidgets.QLabel):
@@ -2230,15 +3448,71 @@ class _FoldingLabel(QtWidgets.QLabel):
         self.toggle_fold.emit()
 
 
+class _SearchIndex:
+    """Index of the SEARCH_NGRAM-long substrings of a list of texts, for
+    finding the texts which contain given words"""
+
+    def __init__(self, texts):
+        self.texts = texts
+        self.ngrams = {}  # type: {str: set}
+        n = SEARCH_NGRAM
+        for i, text in enumerate(texts):
+            for start in range(len(text) - n + 1):
+                self.ngrams.setdefault(text[start:start + n], set()).add(i)
+
+    def search(self, query):
+        """Indices of the texts containing all the words of query (which
+        must be lower-case)"""
+        n = SEARCH_NGRAM
+        result = None  # type: set
+        for word in query.split():
+            if len(word) >= n:
+                # texts containing all the n-grams of the word (smallest
+                # sets first), then check that they contain the word itself
+                postings = sorted((self.ngrams.get(word[start:start + n],
+                                                   set())
+                                   for start in range(len(word) - n + 1)),
+                                  key=len)
+                candidates = postings[0].intersection(*postings[1:])
+                if result is not None:
+                    candidates &= result
+            else:
+                candidates = (range(len(self.texts)) if result is None
+                              else result)
+            result = {i for i in candidates if word in self.texts[i]}
+            if not result:
+                break
+        return result
+
+
 class ControlPanel(_PanelBase, QtWidgets.QWidget):
+    """Panel of controls, organized in sections. With search=True, a search
+    field on top shows only the entries whose label, name, documentation or
+    section titles contain all the words typed (see set_filter)."""
 
-    def __init__(self, obj: pm.Parameterized = None, **kwargs):
+    def __init__(self, obj: pm.Parameterized = None, search=False,
+                 **kwargs):
         super(ControlPanel, self).__init__(**kwargs)
 
         # 2-columns grid layout + a vertical spacer that maintains the grid
         # on top
         v_layout = QtWidgets.QVBoxLayout()
         self.setLayout(v_layout)
+
+        # Search field, index of the entries (built when first needed, and
+        # again after entries are added or the translation changes) and
+        # current filter
+        self.search_field = None  # type: QtWidgets.QLineEdit
+        self._search_index = None  # type: _SearchIndex
+        self._search_elements = []  # type: [_SectionElement]
+        self._filter = ''
+        if search:
+            self.search_field = QtWidgets.QLineEdit()
+            self.search_field.setClearButtonEnabled(True)
+            self.search_field.textChanged.connect(self.set_filter)
+            v_layout.addWidget(self.search_field)
+            self._update_text()
+
         self.grid = QtWidgets.QGridLayout()
         v_layout.addLayout(self.grid)
         spacer = QtWidgets.QWidget()
@@ -2246,6 +3520,10 @@ class ControlPanel(_PanelBase, QtWidgets.QWidget):
 
         # List of widgets: organized by sections (first section has no label)
         self.current_section = _Section(self.grid)
+        self.sections = [self.current_section]
+
+        # titles of the nested objects being added (see _add_nested)
+        self._nesting = []  # type: [str]
 
         # Then init the parameter control, this might fill the widget if a
         # Paramterized object input is provided
@@ -2253,51 +3531,190 @@ class ControlPanel(_PanelBase, QtWidgets.QWidget):
         if obj is not None:
             self.auto_fill(obj)
 
+    def _update_text(self):
+        self._search_index = None
+        if getattr(self, 'search_field', None) is not None:
+            self.search_field.setPlaceholderText(translate('Search'))
+            if self._filter:
+                self.set_filter(self._filter)
+
+    def _add_nested(self, obj, label, tooltip=None, unfolded=True):
+        # Sections of nested objects are not nested themselves, memorize
+        # the titles of the containing sections for searching
+        self.add_section(label, tooltip=tooltip, unfolded=unfolded)
+        self._nesting.append(label)
+        try:
+            self.auto_fill(obj)
+        finally:
+            self._nesting.pop()
+
     def _add_section(self, name, tooltip=None, unfolded=True):
         # Create new section
-        return _Section(self.grid, name, tooltip=tooltip, unfolded=unfolded)
+        section = _Section(self.grid, name, tooltip=tooltip, unfolded=unfolded)
+        section.path = self._nesting + section.path
+        self.sections.append(section)
+        self._search_index = None
+        self._filter_section(section)
+        return section
 
     def _add_entry(self, obj: pm.Parameterized, name: str):
         # Add entry(ies) to the current section
-        return self.current_section.add_entry(obj, name)
+        self._search_index = None
+        entry = self.current_section.add_entry(obj, name)
+        self._filter_section(self.current_section)
+        return entry
 
     def add_action(self, label, action, **kwargs):
-        return self.current_section.add_action(label, action, **kwargs)
+        self._search_index = None
+        button = self.current_section.add_action(label, action, **kwargs)
+        self._filter_section(self.current_section)
+        return button
+
+    def _filter_section(self, section):
+        # apply the current filter to the entries of a section (after
+        # entries were added to it)
+        words = self._filter.lower().split()
+        if words:
+            section.apply_filter({element for element, text
+                                  in section.search_texts()
+                                  if all(word in text for word in words)})
+
+    def set_filter(self, text):
+        """Show only the entries containing all the words of text (in their
+        label, name, documentation or section titles), or all entries if
+        text is empty. Only the entries whose visibility changes are
+        updated, with the layout disabled meanwhile."""
+        self._filter = text
+        query = text.lower()
+        matches = None
+        if query.strip():
+            if self._search_index is None:
+                elements = [(element, text) for section in self.sections
+                            for element, text in section.search_texts()]
+                self._search_elements = [x[0] for x in elements]
+                self._search_index = _SearchIndex([x[1] for x in elements])
+            matches = {self._search_elements[i]
+                       for i in self._search_index.search(query)}
+
+        # (showing a widget activates the layout of its parent at once)
+        layout = self.layout()
+        layout.setEnabled(False)
+        changed = False
+        try:
+            for section in self.sections:
+                changed |= section.apply_filter(matches)
+        finally:
+            layout.setEnabled(True)
+            if changed:
+                layout.update()
 
 
 # MENU FOR CONTROLLING MULTIPLE PARAMETERS
 
 class ControlMenu(_PanelBase, QtWidgets.QMenu):
+    """Menu for controlling parameters. In lazy mode, entries are created
+    only when the menu is shown for the first time (calls to auto_fill,
+    add_section, add_entry and add_action are queued until then), and the
+    display of entries is not updated while the menu is closed.
+    Nested objects which start folded are shown in lazy sub-menus (inserted
+    in `parent_menu` rather than in the window's menu bar), other nested
+    objects in sections of the menu itself."""
 
     def __init__(self, window, title,
-                 obj: pm.Parameterized = None, **kwargs):
+                 obj: pm.Parameterized = None, lazy=False,
+                 parent_menu: QtWidgets.QMenu = None, tooltip=None,
+                 **kwargs):
         super(ControlMenu, self).__init__(title='', parent=window, **kwargs)
 
         # Set translated title
         self._title = title
+        self._tooltip = tooltip
         self._update_text()
 
-        # Add immediately the menu to the window
+        # Add immediately the menu to the window, or to its parent menu
         self._window = window
-        window.menuBar().addMenu(self)
+        if parent_menu is None:
+            window.menuBar().addMenu(self)
+        else:
+            parent_menu.addMenu(self)
 
         # List of entries
         self.entries = []
 
+        # Lazy mode: queue of calls to execute when menu will be shown
+        self._pending = [] if lazy else None
+        if lazy:
+            self.aboutToShow.connect(self._menu_shown)
+            self.aboutToHide.connect(self._menu_hidden)
+
         # Auto-fill if an object is provided
         if obj is not None:
             if title is None:
                 RuntimeError('Please provide a menu title')
             self.auto_fill(obj)
 
+    def _menu_shown(self):
+        if self._pending is not None:
+            pending, self._pending = self._pending, None
+            for method, args, kwargs in pending:
+                method(*args, **kwargs)
+        for entry in self.entries:
+            if isinstance(entry, _ParameterControlBase):
+                entry.defer_display(False)
+
+    def _menu_hidden(self):
+        for entry in self.entries:
+            if isinstance(entry, _ParameterControlBase):
+                entry.defer_display(True)
+
+    def auto_fill(self, obj):
+        if self._pending is not None:
+            self._pending.append((self.auto_fill, (obj,), {}))
+        else:
+            super(ControlMenu, self).auto_fill(obj)
+
+    def add_entry(self, *args, **kwargs):
+        if self._pending is not None:
+            self._pending.append((self.add_entry, args, kwargs))
+        else:
+            super(ControlMenu, self).add_entry(*args, **kwargs)
+
     def _update_text(self):
         self.setTitle(translate(self._title))
+        if self._tooltip is not None:
+            self.menuAction().setToolTip(translate(self._tooltip))
+
+    def _add_nested(self, obj, label, tooltip=None, unfolded=True):
+        if unfolded:
+            super(ControlMenu, self)._add_nested(obj, label, tooltip=tooltip)
+        else:
+            # folded section: sub-menu, filled when first shown
+            self.setToolTipsVisible(True)
+            submenu = ControlMenu(self._window, label, obj, lazy=True,
+                                  parent_menu=self, tooltip=tooltip)
+            self.entries.append(submenu)
 
     def _add_section(self, label, tooltip=None, unfolded=True):
-        # Add section. Note that there is currently no implementation for
-        # folding/unfolding.
-        self.addSeparator()
-        return self.addSection(translate(label))
+        # Add section. Note that folded nested objects are shown in
+        # sub-menus rather than in sections (see _add_nested).
+        # (same actions as created by addSeparator and addSection)
+        separator = QtWidgets.QAction(self)
+        separator.setSeparator(True)
+        section = QtWidgets.QAction(translate(label), self)
+        section.setSeparator(True)
+        self._insert_action(separator, entry=False)
+        self._insert_action(section, entry=False)
+        return section
+
+    def _insert_action(self, action, entry=True):
+        # Add an action to the menu (and to its entries), in lazy mode only
+        # when the menu is shown
+        if self._pending is not None:
+            self._pending.append((self._insert_action, (action, entry), {}))
+            return
+        if entry:
+            self.entries.append(action)
+        self.addAction(action)
 
     def _add_entry(self, obj: pm.Parameterized, name: str, **kwargs):
         entry = menu_control(self._window, obj, name,
@@ -2309,10 +3726,11 @@ class ControlMenu(_PanelBase, QtWidgets.QMenu):
             self.addAction(entry)
 
     def add_action(self, label, callback, **kwargs):
+        # (the action is created at once, also in lazy mode)
         action = MenuItem(label, self._window, callback,
                           **kwargs)
-        self.entries.append(action)
-        self.addAction(action)
+        self._insert_action(action)
+        return action
 
 
 # DEMO
@@ -0,0 +1,292 @@
+import os
+import json
+import mmap
+import time
+import struct
+import param as pm
+from PyQt5 import QtWidgets
+from . import paramqt as _pq
+from .state import snapshot, restore, _tree, _fingerprint
+
+# Preset files hold many named snapshots (see paramqt.state) in a single
+# file: a fixed-size header, the snapshot blobs, then a JSON index giving
+# the name, position, size and tree fingerprint of each snapshot. The header
+# points to the current index. Saving a preset appends its blob and a new
+# index at the end of the file and only then updates the header, so that an
+# interrupted write leaves the previous presets intact. Blobs and indexes
+# which are not used anymore are dropped when the file is compacted.
+
+PRESET_MAGIC = b'PQP\x01'
+
+# magic, offset and size of the index
+_HEADER = struct.Struct('<4sQQ')
+
+# the file is compacted when more than this fraction of it is unused
+COMPACT_RATIO = 0.5
+
+
+class PresetStore:
+    """Library of named presets of parameter trees, stored in a single file.
+
+    The file is memory-mapped: opening it only reads its index, and loading
+    a preset only reads its blob. Presets can be listed, searched, applied
+    (only the parameters whose value differs are set, all at once, see
+    paramqt.state.restore) and saved."""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._file = None
+        self._map = None  # type: mmap.mmap
+        self._index = {}  # type: {str: dict}
+        self._end = _HEADER.size  # end of the used part of the file
+        self._index_size = 0
+        self._unused = 0  # size of blobs and indexes not used anymore
+        if os.path.exists(filename):
+            self._open()
+
+    def _open(self):
+        self._file = open(self.filename, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+            magic, offset, size = _HEADER.unpack_from(self._map)
+        except (ValueError, struct.error):
+            self.close()
+            raise ValueError("'%s' is not a preset file" % self.filename)
+        if magic != PRESET_MAGIC:
+            self.close()
+            raise ValueError("'%s' is not a preset file" % self.filename)
+        try:
+            index = json.loads(self._map[offset:offset + size].decode())
+            self._index = {entry['name']: entry
+                           for entry in index['presets']}
+            self._unused = index['unused']
+        except (ValueError, KeyError, TypeError):
+            self.close()
+            raise ValueError("'%s' has a corrupt index" % self.filename)
+        self._end = offset + size
+        self._index_size = size
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, name):
+        return name in self._index
+
+    # Listing
+
+    def names(self, obj: pm.Parameterized = None):
+        """Sorted names of the presets, only those saved from trees with the
+        same structure as obj if obj is given"""
+        if obj is None:
+            return sorted(self._index)
+        fingerprint = _fingerprint(_tree(obj))
+        return sorted(name for name, entry in self._index.items()
+                      if entry['fingerprint'] == fingerprint)
+
+    def search(self, text, obj: pm.Parameterized = None):
+        """Names of the presets containing all the words of text (case
+        insensitive), see names() for obj"""
+        words = text.lower().split()
+        return [name for name in self.names(obj)
+                if all(word in name.lower() for word in words)]
+
+    def info(self, name):
+        """Size (bytes) and time of saving of a preset"""
+        entry = self._index[name]
+        return dict(size=entry['size'], time=entry['time'])
+
+    # Reading and applying
+
+    def load(self, name):
+        """Snapshot of a preset (see paramqt.state)"""
+        entry = self._index[name]
+        offset = entry['offset']
+        return self._map[offset:offset + entry['size']]
+
+    def apply(self, name, obj: pm.Parameterized):
+        """Set the parameters of obj to the values of a preset, returns the
+        number of parameters changed"""
+        return restore(obj, self.load(name))
+
+    # Writing
+
+    def save(self, name, obj: pm.Parameterized):
+        """Save the values of the parameters of obj as a preset (replacing
+        the preset of the same name, if any)"""
+        blob = snapshot(obj)
+        entry = dict(name=name, size=len(blob), time=time.time(),
+                     fingerprint=_fingerprint(_tree(obj)))
+        self._write({name: (entry, blob)}, [])
+
+    def remove(self, name):
+        if name not in self._index:
+            raise KeyError(name)
+        self._write({}, [name])
+
+    def compact(self):
+        """Rewrite the file without its unused parts"""
+        presets = {name: (dict(entry), self.load(name))
+                   for name, entry in self._index.items()}
+        tmp = self.filename + '.tmp'
+        self.close()
+        self._index = {}
+        self._end = _HEADER.size
+        self._index_size = 0
+        self._unused = 0
+        try:
+            with open(tmp, 'wb') as f:
+                self._write_file(f, presets, [])
+            os.replace(tmp, self.filename)
+        except BaseException:
+            # keep the file as it was
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            self._open()
+            raise
+        self._open()
+
+    def _write(self, presets, removed):
+        exists = os.path.exists(self.filename)
+        self.close()
+        try:
+            with open(self.filename, 'r+b' if exists else 'wb') as f:
+                self._write_file(f, presets, removed)
+        except BaseException:
+            # the header was not updated: the previous presets are intact
+            if exists:
+                self._open()
+            elif os.path.exists(self.filename):
+                os.remove(self.filename)
+            raise
+        self._open()
+        if self._unused > COMPACT_RATIO * self._end:
+            self.compact()
+
+    def _write_file(self, f, presets, removed):
+        # append the blobs and the new index after the used part of the
+        # file, then point the header to the new index
+        index = dict(self._index)
+        unused = self._unused + self._index_size
+        for name in removed:
+            unused += index.pop(name)['size']
+        f.seek(self._end)
+        for name, (entry, blob) in presets.items():
+            if name in index:
+                unused += index[name]['size']
+            entry['offset'] = f.tell()
+            f.write(blob)
+            index[name] = entry
+        offset = f.tell()
+        data = json.dumps(dict(presets=list(index.values()),
+                               unused=unused)).encode()
+        f.write(data)
+        f.truncate()
+        f.flush()
+        os.fsync(f.fileno())
+        f.seek(0)
+        f.write(_HEADER.pack(PRESET_MAGIC, offset, len(data)))
+
+
+class PresetMenu(_pq.TranslationProne, QtWidgets.QMenu):
+    """Sub-menu of a ControlMenu for applying to obj the presets of a store
+    (only those saved from trees with the same structure), and for saving
+    the current values as a new preset. Items are created each time the
+    menu is shown; when there are more than MENU_PAGE_SIZE presets, a search
+    field filters them."""
+
+    def __init__(self, menu: _pq.ControlMenu, store: PresetStore,
+                 obj: pm.Parameterized, title='Presets'):
+        self._title = title
+        super(PresetMenu, self).__init__(parent=menu)
+        self.store = store
+        self.obj = obj
+        self._search = None  # type: QtWidgets.QLineEdit
+        self._items = []  # type: [QtWidgets.QAction]
+        self.aboutToShow.connect(self._populate)
+
+        # in a lazy menu, wait for the entries queued before this one
+        if menu._pending is not None:
+            menu._pending.append((menu.addMenu, (self,), {}))
+        else:
+            menu.addMenu(self)
+
+    def _update_text(self):
+        self.setTitle(_pq.translate(self._title))
+
+    def _populate(self):
+        self.clear()
+        self._search = None
+        self.addAction(_pq.translate('Save preset') + '...',
+                       self._save_dialog)
+        self.addSeparator()
+        names = self.store.names(self.obj)
+        if len(names) > _pq.MENU_PAGE_SIZE:
+            self._search = QtWidgets.QLineEdit()
+            self._search.setPlaceholderText(_pq.translate('Search'))
+            self._search.textChanged.connect(self._filter)
+            action = QtWidgets.QWidgetAction(self)
+            action.setDefaultWidget(self._search)
+            self.addAction(action)
+        self._items = []
+        self._add_items(names)
+
+    def _filter(self, text):
+        for action in self._items:
+            self.removeAction(action)
+            action.deleteLater()
+        self._items = []
+        self._add_items(self.store.search(text, self.obj))
+
+    def _add_items(self, names):
+        # show at most MENU_PAGE_SIZE presets, the search field giving
+        # access to the others
+        for name in names[:_pq.MENU_PAGE_SIZE]:
+            action = QtWidgets.QAction(name, self)
+            action.triggered.connect(
+                lambda checked, name=name: self.apply(name))
+            self.addAction(action)
+            self._items.append(action)
+        if len(names) > _pq.MENU_PAGE_SIZE:
+            action = QtWidgets.QAction(
+                _pq.translate('%d more presets')
+                % (len(names) - _pq.MENU_PAGE_SIZE), self)
+            action.setEnabled(False)
+            self.addAction(action)
+            self._items.append(action)
+
+    # (called from menu actions: errors are reported, not raised)
+
+    def apply(self, name):
+        try:
+            self.store.apply(name, self.obj)
+        except Exception as e:
+            _pq._error_message('Could not apply preset', name, str(e),
+                               error=e)
+
+    def save(self, name):
+        try:
+            self.store.save(name, self.obj)
+        except Exception as e:
+            _pq._error_message('Could not save preset', name, str(e),
+                               error=e)
+
+    def _save_dialog(self):
+        name, ok = QtWidgets.QInputDialog.getText(
+            None, _pq.translate('Save preset'), _pq.translate('Name'))
+        if ok and name:
+            self.save(name)
@@ -0,0 +1,269 @@
+import io
+import json
+import time
+import queue
+import pickle
+import struct
+import threading
+import numpy as np
+import param as pm
+from PyQt5 import QtWidgets
+from . import paramqt as _pq
+from .state import _encode, _decode, _fingerprint, _BasicUnpickler, \
+    _BASIC_TYPES
+
+# Logs of parameter changes: a header, then one record per batch of changes
+# (one call of a watcher, e.g. all the changes of a set_values on one
+# object). The header is the magic string, then the size and the JSON text of
+# {'version', 'fingerprint', 'paths', 'time'}: fingerprint of the tree (see
+# paramqt.state), dotted paths of the parameters, and time of the start of
+# the recording. Each record is its time (s, from the start of the
+# recording) and the size of its data, then the data: pickle of a list of
+# (parameter number, 'value', value encoded as in snapshots), or of
+# (parameter number, 'objects', new objects list) for changes of the objects
+# lists of selectors (recorded only if the objects are of basic types).
+# Records are only appended, so that a log is readable up to its last
+# complete record even if the recording was interrupted.
+
+LOG_MAGIC = b'PQR\x01'
+LOG_VERSION = 1
+
+_HEADER_SIZE = struct.Struct('<I')
+_RECORD = struct.Struct('<dI')
+
+# maximal delay (s) before records are written to the file
+RECORD_FLUSH_INTERVAL = 0.5
+
+
+class Recorder:
+    """Record all the changes of the parameters of obj and of its nested
+    objects in a log file. Changes are encoded in the watchers, and written
+    by a background thread. Use start() and stop(), or a with statement; if
+    writing the log failed, stop() raises the error."""
+
+    def __init__(self, obj: pm.Parameterized, filename):
+        self.obj = obj
+        self.filename = filename
+        tree = list(_pq.parameter_index(obj).objects())
+        self._tree = tree
+        self._paths = list(_pq.parameter_index(obj).paths())
+        self._numbers = {}  # type: {(int, str): int}
+        for x, names in tree:
+            for name in names:
+                self._numbers[(id(x), name)] = len(self._numbers)
+        self._watchers = []
+        self._queue = None  # type: queue.Queue
+        self._thread = None  # type: threading.Thread
+        self._start = None
+        self._error = None  # type: Exception
+        self.n_records = 0
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self):
+        if self.running:
+            return
+        f = open(self.filename, 'wb')
+        self._start = time.perf_counter()
+        header = json.dumps(dict(version=LOG_VERSION,
+                                 fingerprint=_fingerprint(self._tree),
+                                 paths=self._paths,
+                                 time=time.time())).encode()
+        f.write(LOG_MAGIC + _HEADER_SIZE.pack(len(header)) + header)
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._write, args=(f,),
+                                        daemon=True)
+        self._thread.start()
+        self.n_records = 0
+        self._watchers = []
+        for x, names in self._tree:
+            if names:
+                self._watchers.append(
+                    (x, x.param.watch(self._changed, names)))
+            selectors = [name for name in names
+                         if isinstance(x.param[name], pm.ObjectSelector)]
+            if selectors:
+                self._watchers.append(
+                    (x, x.param.watch(self._changed, selectors,
+                                      what='objects')))
+
+    def stop(self):
+        if not self.running:
+            return
+        for x, watcher in self._watchers:
+            _pq._unwatch(x.param, watcher)
+        self._watchers = []
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def _changed(self, *events):
+        t = time.perf_counter() - self._start
+        # (values are encoded at once, as they might be modified in place
+        # later)
+        changes = []
+        for event in events:
+            # (events of parameter attributes give the owner of the
+            # parameter as cls)
+            owner = event.obj if event.what == 'value' else event.cls
+            number = self._numbers[(id(owner), event.name)]
+            if event.what == 'value':
+                changes.append((number, 'value', _encode(
+                    event.obj, event.name, event.new, True)))
+            elif all(isinstance(x, _BASIC_TYPES) for x in event.new):
+                changes.append((number, 'objects', list(event.new)))
+        if changes:
+            self._queue.put((t, changes))
+            self.n_records += 1
+
+    def _write(self, f):
+        # background thread: write records until stop() is called; after an
+        # error, records are dropped and the error is raised by stop()
+        last_flush = time.perf_counter()
+        with f:
+            while True:
+                try:
+                    item = self._queue.get(timeout=RECORD_FLUSH_INTERVAL)
+                except queue.Empty:
+                    item = ()
+                if item is None:
+                    break
+                if self._error is not None:
+                    continue
+                try:
+                    if item:
+                        t, changes = item
+                        data = pickle.dumps(changes, protocol=4)
+                        f.write(_RECORD.pack(t, len(data)) + data)
+                    now = time.perf_counter()
+                    if now - last_flush > RECORD_FLUSH_INTERVAL:
+                        f.flush()
+                        last_flush = now
+                except Exception as e:
+                    self._error = e
+
+
+def read_log(filename):
+    """Header and records [(time, [(parameter number, 'value' or
+    'objects', encoded value or objects)])] of a log file. An incomplete last
+    record is ignored; records holding values which are not of basic types
+    are skipped, their number is header['skipped']."""
+    with open(filename, 'rb') as f:
+        data = f.read()
+    if not data.startswith(LOG_MAGIC):
+        raise ValueError("'%s' is not a parameter log" % filename)
+    position = len(LOG_MAGIC)
+    size, = _HEADER_SIZE.unpack_from(data, position)
+    position += _HEADER_SIZE.size
+    header = json.loads(data[position:position + size].decode())
+    if header.get('version') != LOG_VERSION:
+        raise ValueError('unsupported log version')
+    position += size
+    records = []
+    header['skipped'] = 0
+    while position + _RECORD.size <= len(data):
+        t, size = _RECORD.unpack_from(data, position)
+        position += _RECORD.size
+        if position + size > len(data):
+            break
+        try:
+            changes = _BasicUnpickler(
+                io.BytesIO(data[position:position + size])).load()
+            records.append((t, changes))
+        except pickle.UnpicklingError:
+            header['skipped'] += 1
+        position += size
+    return header, records
+
+
+class Replayer:
+    """Play back a log of parameter changes on obj (which must have the same
+    structure as the recorded tree), with the Qt events processed after each
+    record so that the controls showing obj are updated as in real use.
+    Records are played at their original times multiplied by 1 / speed, or
+    as fast as possible if speed is None. Each record is applied at once
+    (see paramqt.set_values)."""
+
+    def __init__(self, obj: pm.Parameterized, filename):
+        self.obj = obj
+        header, self.records = read_log(filename)
+        tree = list(_pq.parameter_index(obj).objects())
+        if header['fingerprint'] != _fingerprint(tree):
+            raise ValueError('log was recorded from a different parameter '
+                             'tree')
+        self._parameters = [(x, name) for x, names in tree for name in names]
+        self.durations = np.zeros(0)
+        self.lags = np.zeros(0)
+        self.total = 0.
+
+    def play(self, speed=1.):
+        """Play the whole log, and return timing statistics (see
+        statistics)"""
+        n = len(self.records)
+        self.durations = np.zeros(n)
+        self.lags = np.zeros(n if speed is not None else 0)
+        app = QtWidgets.QApplication.instance()
+        process_events = (app.processEvents if app is not None
+                          else lambda: None)
+        start = time.perf_counter()
+        for i, (t, changes) in enumerate(self.records):
+            if speed is not None:
+                # wait for the time of the record, processing events
+                due = start + t / speed
+                while True:
+                    process_events()
+                    now = time.perf_counter()
+                    if now >= due:
+                        break
+                    time.sleep(min(due - now, 0.001))
+                self.lags[i] = now - due
+            t0 = time.perf_counter()
+            values = []
+            for number, what, code in changes:
+                x, name = self._parameters[number]
+                if what == 'objects':
+                    x.param[name].objects = code
+                else:
+                    values.append((x, name, _decode(x, name, code)))
+            _pq.set_values(values)
+            process_events()
+            self.durations[i] = time.perf_counter() - t0
+        self.total = time.perf_counter() - start
+        return self.statistics()
+
+    def statistics(self):
+        """Number of records, total time of the last play (s), and median,
+        99th percentile and maximum of the durations of the records (time to
+        apply them and process the resulting events) and of their lags
+        (delay between their due time and their start), in ms"""
+        stats = dict(records=len(self.durations), total=self.total)
+        for key, values in [('duration', self.durations),
+                            ('lag', self.lags)]:
+            if len(values):
+                p50, p99 = np.percentile(values, [50, 99]) * 1e3
+                stats.update({key + ' p50': p50, key + ' p99': p99,
+                              key + ' max': values.max() * 1e3})
+        return stats
+
+    def report(self):
+        stats = self.statistics()
+        lines = ['%d records played in %.3f s'
+                 % (stats['records'], stats['total'])]
+        for key in ['duration', 'lag']:
+            if key + ' p50' in stats:
+                lines.append('%-8s p50 %8.3f ms  p99 %8.3f ms  max %8.3f ms'
+                             % (key, stats[key + ' p50'],
+                                stats[key + ' p99'], stats[key + ' max']))
+        return '\n'.join(lines)
@@ -0,0 +1,252 @@
+import io
+import pickle
+import time
+import param as pm
+from multiprocessing.connection import Connection, Listener, Client
+from PyQt5 import QtCore
+from . import paramqt as _pq
+from .state import _encode, _decode, _equal, _fingerprint, _BasicUnpickler
+
+# Mirroring of a parameter tree living in another process: both processes
+# create the same tree (instances of the same GParameterized classes) and
+# link it to a connection of the multiprocessing module (pipe or socket).
+# Parameters are numbered in the order of list_all_parameters, values are
+# encoded as in snapshots (see paramqt.state). Messages are pickled, and
+# unpickled without allowing any class, so that only basic types (and no
+# code) can be received. Messages are:
+# - ('hello', (fingerprint of the tree, master)), sent by both sides on
+#   creation
+# - ('values', ([(parameter number, encoded value)], acknowledgements)), a
+#   batch of changes containing only the parameters whose value differs
+#   from the last value sent or received.
+# One side is the master: its values win when both sides change the same
+# parameter at the same time. The master acknowledges the values it
+# receives ({parameter number: number of values received}), sending back
+# its current value. The other side ignores the values of the master for a
+# parameter until all the values it sent for this parameter have been
+# acknowledged, so that a slider being dragged does not jump back to older
+# values, and so that both sides end with the same value.
+
+# delay (ms) between two polls of the connection by start_polling
+REMOTE_INTERVAL = 10
+
+
+class RemoteLink:
+    """Keep a parameter tree in sync with the same tree in another process.
+
+    Changes of parameter values are collected and sent by flush(), in one
+    batch where each parameter appears at most once, with its latest value,
+    and only if it differs from the value the other side is known to have.
+    Received batches are applied at once (see paramqt.set_values): watchers
+    are run once per batch, and controls showing the tree (e.g. ControlPanel
+    or ControlMenu) are updated as for any change.
+
+    poll() sends pending changes and applies received ones: call it
+    regularly from the loop of the process, or use start_polling() in a Qt
+    application. Exactly one side must be created with master=True (e.g. a
+    compute engine): it sends all its values on creation, so that the other
+    side starts as a copy of it, and its values win in case of simultaneous
+    changes. Changes of the objects lists of selectors are not mirrored, and
+    only values of basic types can be received (as in snapshots)."""
+
+    def __init__(self, obj: pm.Parameterized, connection: Connection,
+                 master=False):
+        self.obj = obj
+        self.connection = connection
+        self.master = master
+        self.closed = False
+        self._timer = None  # type: QtCore.QTimer
+
+        # parameters by number, and numbers by parameter
+        tree = list(_pq.parameter_index(obj).objects())
+        self._fingerprint = _fingerprint(tree)
+        self._parameters = [(x, name) for x, names in tree for name in names]
+        self._numbers = {(id(x), name): i
+                         for i, (x, name) in enumerate(self._parameters)}
+
+        # encoded values that the other side is known to have (None if
+        # unknown), and changes to send {parameter number: encoded value}
+        self._remote = [None] * len(self._parameters)
+        self._pending = {}  # type: {int: object}
+
+        # master: values received and not acknowledged yet {parameter
+        # number: count}; other side: number of values sent and not
+        # acknowledged yet, by parameter number
+        self._received = {}  # type: {int: int}
+        self._unacknowledged = [0] * len(self._parameters)
+
+        self._watchers = [(x, x.param.watch(self._changed, names))
+                          for x, names in tree if names]
+
+        self._send(('hello', (self._fingerprint, master)))
+        if master:
+            for i, (x, name) in enumerate(self._parameters):
+                self._pending[i] = _encode(x, name, getattr(x, name), True)
+            self.flush()
+
+    def _send(self, message):
+        try:
+            self.connection.send_bytes(pickle.dumps(message, protocol=4))
+        except (OSError, EOFError):
+            self.close()
+
+    def _changed(self, *events):
+        # (values received from the other side are not sent back, as they
+        # are equal to its known values, but changes made by watchers in
+        # reaction to them are)
+        for event in events:
+            i = self._numbers[(id(event.obj), event.name)]
+            code = _encode(event.obj, event.name, event.new, True)
+            if _equal(code, self._remote[i]):
+                # the other side has this value
+                self._pending.pop(i, None)
+            else:
+                self._pending[i] = code
+
+    def flush(self):
+        """Send the pending changes, in one batch"""
+        if self.closed or not (self._pending or self._received):
+            return
+        pending, self._pending = self._pending, {}
+        received, self._received = self._received, {}
+        for i in received:
+            # send back the current value with the acknowledgement
+            x, name = self._parameters[i]
+            pending[i] = _encode(x, name, getattr(x, name), True)
+        for i, code in pending.items():
+            self._remote[i] = code
+            if not self.master:
+                self._unacknowledged[i] += 1
+        self._send(('values', (list(pending.items()), received)))
+
+    def poll(self, timeout=0.):
+        """Send the pending changes, then apply the batches received
+        (waiting at most timeout seconds for the first one). Returns the
+        number of batches received.
+        When polling from the Qt event loop (see start_polling), errors are
+        reported through the error sink (see paramqt.set_error_sink), as
+        they cannot be raised from there; otherwise they are raised."""
+        self.flush()
+        n = 0
+        try:
+            while not self.closed and self.connection.poll(timeout):
+                self._receive(_BasicUnpickler(
+                    io.BytesIO(self.connection.recv_bytes())).load())
+                n += 1
+                timeout = 0.
+        except (OSError, EOFError) as err:
+            self.close()
+            if self._timer is not None:
+                _pq._error_message(
+                    _pq.translate('Connection to remote parameters was '
+                                  'closed'),
+                    error=err, key=(id(self), type(err)))
+        except Exception as err:
+            if self._timer is None:
+                raise
+            _pq._error_message(
+                _pq.translate('Remote parameter values could not be '
+                              'applied:'),
+                str(err), error=err, key=(id(self), type(err)))
+        return n
+
+    def _receive(self, message):
+        kind, data = message
+        if kind == 'hello':
+            fingerprint, master = data
+            if fingerprint != self._fingerprint:
+                self.close()
+                raise ValueError('remote parameters have a different '
+                                 'structure')
+            if master == self.master:
+                self.close()
+                raise ValueError('exactly one side of a remote link must '
+                                 'be the master')
+        elif kind == 'values':
+            values, acknowledged = data
+            for i, count in acknowledged.items():
+                self._unacknowledged[i] -= count
+            changes = []
+            received = []
+            for i, code in values:
+                if self.master:
+                    self._received[i] = self._received.get(i, 0) + 1
+                elif self._unacknowledged[i]:
+                    # older than the values sent since
+                    self._remote[i] = code
+                    continue
+                x, name = self._parameters[i]
+                try:
+                    value = _decode(x, name, code)
+                except ValueError as e:
+                    x.param.warning('Remote value of %s not applied: %s'
+                                    % (name, e))
+                    continue
+                received.append((i, x, name, value, code))
+                if not _equal(value, getattr(x, name)):
+                    changes.append((x, name, value))
+            try:
+                _pq.set_values(changes)
+            finally:
+                # both sides have the same value only if it was applied
+                # (nothing is set if a value is invalid)
+                for i, x, name, value, code in received:
+                    if _equal(getattr(x, name), value):
+                        self._remote[i] = code
+                        # a local change of this parameter not sent yet is
+                        # superseded (and the received value, seen as a
+                        # local change while applied, is not sent back)
+                        if i in self._pending \
+                                and _equal(self._pending[i], code):
+                            del self._pending[i]
+
+    def start_polling(self, interval=REMOTE_INTERVAL):
+        """Poll the connection every interval (ms) from the Qt event loop"""
+        if self._timer is None:
+            self._timer = QtCore.QTimer()
+            self._timer.timeout.connect(self.poll)
+        self._timer.start(interval)
+
+    def close(self):
+        """Stop following the changes of the tree and close the
+        connection"""
+        if self.closed:
+            return
+        self.closed = True
+        if self._timer is not None:
+            self._timer.stop()
+        for x, watcher in self._watchers:
+            _pq._unwatch(x.param, watcher)
+        self._watchers = []
+        self.connection.close()
+
+
+def serve(obj: pm.Parameterized, address, authkey: bytes, master=True):
+    """Wait for a connection on address (see multiprocessing.connection)
+    and return the link of obj through it. The other side must give the
+    same authkey (e.g. os.urandom(32), passed to the other process), so
+    that other processes cannot connect."""
+    if not authkey:
+        raise ValueError('an authentication key is required')
+    with Listener(address, authkey=authkey) as listener:
+        connection = listener.accept()
+    return RemoteLink(obj, connection, master=master)
+
+
+def connect(obj: pm.Parameterized, address, authkey: bytes, master=False,
+            timeout=10.):
+    """Connect to address, retrying for at most timeout seconds while
+    nobody listens, and return the link of obj through the connection
+    (authkey is the key given to serve)"""
+    if not authkey:
+        raise ValueError('an authentication key is required')
+    end = time.monotonic() + timeout
+    while True:
+        try:
+            connection = Client(address, authkey=authkey)
+            break
+        except (ConnectionRefusedError, FileNotFoundError):
+            if time.monotonic() > end:
+                raise
+            time.sleep(.05)
+    return RemoteLink(obj, connection, master=master)
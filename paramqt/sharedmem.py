@@ -0,0 +1,189 @@
+import os
+import json
+import time
+import struct
+import numpy as np
+import param as pm
+from multiprocessing import shared_memory, resource_tracker
+from . import paramqt as _pq
+
+# Shared memory blocks holding the numeric and boolean parameters of a tree,
+# for reading them from other processes without messages. A block contains:
+# - a header: sequence number, number of slots, offset and size of the
+#   layout (4 x uint64)
+# - one float64 slot per parameter (NaN for None), in the order of the
+#   layout
+# - the layout: JSON list of [dotted path, type code ('f', 'i' or 'b')]
+# The sequence number is odd while values are being written (seqlock):
+# readers copy the values, and start again if the sequence number was odd
+# or has changed meanwhile. This relies on 8-byte aligned stores being
+# atomic and seen by other processes in program order, as on x86.
+
+_HEADER = struct.Struct('<4Q')
+
+_TYPE_CODES = {'f': float, 'i': int, 'b': bool}
+
+# names of the blocks created by this process
+_created = set()
+
+
+def _tracked_name(shm):
+    # name of a block for the resource tracker (with the leading slash of
+    # POSIX shared memory, which SharedMemory.name leaves out)
+    return '/' + shm.name if os.name == 'posix' else shm.name
+
+
+def _type_code(param: pm.Parameter):
+    if isinstance(param, pm.Boolean):
+        return 'b'
+    elif isinstance(param, pm.Integer):
+        return 'i'
+    elif isinstance(param, pm.Number):
+        return 'f'
+    else:
+        return None
+
+
+def _slot_value(value):
+    return np.nan if value is None else float(value)
+
+
+class SharedParameters:
+    """Copy of the numeric and boolean parameters of obj and of its nested
+    objects in a shared memory block, kept up to date by watchers (so that
+    changes made from controls, or in any other way, are written). Other
+    processes read the block with SharedParametersReader(name), name being
+    the name of the block (chosen by the system if block_name is None).
+    The parameters shared are those of the tree at creation: nested objects
+    set or replaced later are not followed."""
+
+    def __init__(self, obj: pm.Parameterized, block_name=None):
+        self.obj = obj
+
+        # shared parameters, by dotted path
+        index = _pq.parameter_index(obj)
+        layout = []
+        self._slots = {}  # type: {(int, str): int}
+        for path, x, name in index.items():
+            code = _type_code(x.param[name])
+            if code is not None:
+                self._slots[(id(x), name)] = len(layout)
+                layout.append([path, code])
+        data = json.dumps(layout).encode()
+
+        n = len(layout)
+        offset = _HEADER.size + 8 * n
+        self.shm = shared_memory.SharedMemory(name=block_name, create=True,
+                                              size=offset + len(data))
+        _created.add(self.shm.name)
+        _HEADER.pack_into(self.shm.buf, 0, 0, n, offset, len(data))
+        self.shm.buf[offset:offset + len(data)] = data
+        self._sequence = np.ndarray((1,), np.uint64, self.shm.buf)
+        self._values = np.ndarray((n,), np.float64, self.shm.buf,
+                                  offset=_HEADER.size)
+
+        # initial values, then follow changes
+        self._write([(self._slots[(id(x), name)], getattr(x, name))
+                     for path, x, name in index.items()
+                     if (id(x), name) in self._slots])
+        self._watchers = []
+        for x, names in index.objects():
+            names = [name for name in names
+                     if (id(x), name) in self._slots]
+            if names:
+                self._watchers.append(
+                    (x, x.param.watch(self._changed, names)))
+
+    @property
+    def name(self):
+        """Name of the shared memory block, to be given to readers"""
+        return self.shm.name
+
+    def _changed(self, *events):
+        self._write([(self._slots[(id(event.obj), event.name)], event.new)
+                     for event in events])
+
+    def _write(self, values):
+        self._sequence[0] += 1
+        for slot, value in values:
+            self._values[slot] = _slot_value(value)
+        self._sequence[0] += 1
+
+    def close(self):
+        """Stop updating the block and release it"""
+        for x, watcher in self._watchers:
+            _pq._unwatch(x.param, watcher)
+        self._watchers = []
+        del self._sequence, self._values
+        self.shm.close()
+        self.shm.unlink()
+        _created.discard(self.shm.name)
+
+
+class SharedParametersReader:
+    """Read access to the parameters shared by a SharedParameters object of
+    another process, given the name of its block."""
+
+    def __init__(self, name):
+        # the block belongs to the writer: it must not be released when this
+        # process ends
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # (before Python 3.13)
+            self.shm = shared_memory.SharedMemory(name=name)
+            if self.shm.name not in _created:
+                resource_tracker.unregister(_tracked_name(self.shm),
+                                            'shared_memory')
+        _, n, offset, size = _HEADER.unpack_from(self.shm.buf)
+        layout = json.loads(bytes(self.shm.buf[offset:offset + size]))
+        self.paths = [path for path, code in layout]
+        self._types = [_TYPE_CODES[code] for path, code in layout]
+        self._slots = {path: i for i, path in enumerate(self.paths)}
+        self._sequence = np.ndarray((1,), np.uint64, self.shm.buf)
+        self._values = np.ndarray((n,), np.float64, self.shm.buf,
+                                  offset=_HEADER.size)
+
+    @property
+    def version(self):
+        """Number incremented each time values are written (compare it to
+        a previous version to know whether values have changed)"""
+        return int(self._sequence[0]) // 2
+
+    @property
+    def view(self):
+        """Values of all parameters, in the order of paths, read directly
+        from the block (without consistency check: values may be changed
+        while being read)"""
+        return self._values
+
+    def _read(self, read):
+        # read values consistently (see seqlock above)
+        while True:
+            sequence = int(self._sequence[0])
+            if sequence % 2 == 0:
+                result = read()
+                if int(self._sequence[0]) == sequence:
+                    return result
+            time.sleep(0)
+
+    def values(self):
+        """Copy of the values of all parameters, in the order of paths"""
+        return self._read(self._values.copy)
+
+    def get(self, path):
+        """Value of one parameter"""
+        i = self._slots[path]
+        value = self._read(lambda: float(self._values[i]))
+        return None if value != value else self._types[i](value)
+
+    def as_dict(self):
+        """{dotted path: value} of all parameters"""
+        values = self.values().tolist()
+        return {path: None if value != value else type_(value)
+                for path, type_, value in zip(self.paths, self._types,
+                                              values)}
+
+    def close(self):
+        del self._sequence, self._values
+        self.shm.close()
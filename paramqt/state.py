@@ -0,0 +1,174 @@
+import io
+import json
+import zlib
+import pickle
+import numpy as np
+import param as pm
+from .paramqt import parameter_index, set_values, _get_param_base_class
+
+# Snapshots of parameter trees: values of all parameters, in the order of
+# list_all_parameters (as given by the cached ParameterIndex), with a
+# fingerprint of the tree structure. Values are encoded as basic types:
+# selector values as [value] if they are of a basic type, or else as their
+# index in the objects list; arrays as (dtype, shape, data). The binary
+# form is a compressed pickle of these basic types only (it is read with an
+# unpickler which refuses any class).
+
+BINARY_HEADER = b'PQS\x01'
+SNAPSHOT_VERSION = 1
+
+_BASIC_TYPES = (str, int, float, bool)
+
+
+def _tree(obj):
+    return list(parameter_index(obj).objects())
+
+
+def _fingerprint(tree):
+    structure = repr([(type(x).__name__ if not isinstance(x, type)
+                       else x.__name__, names) for x, names in tree])
+    return zlib.crc32(structure.encode())
+
+
+def _encode(x, name, value, binary):
+    param = x.param[name]
+    base_cls = _get_param_base_class(param)
+    if value is None:
+        return None
+    elif base_cls == pm.ObjectSelector:
+        return _encode_object(param.objects, value)
+    elif base_cls == pm.ListSelector:
+        return [_encode_object(param.objects, v) for v in value]
+    elif isinstance(value, np.ndarray):
+        data = value.tobytes() if binary else value.ravel().tolist()
+        return {'dtype': value.dtype.str, 'shape': list(value.shape),
+                'data': data}
+    elif isinstance(value, tuple):
+        return list(value)
+    elif isinstance(value, np.generic):
+        return value.item()
+    else:
+        return value
+
+
+def _encode_object(objects, value):
+    if isinstance(value, _BASIC_TYPES):
+        return [value]
+    # index of value in objects (compared by identity first, as objects
+    # might not be comparable)
+    for i, obj in enumerate(objects):
+        if obj is value:
+            return i
+    return objects.index(value)
+
+
+def _decode(x, name, code):
+    param = x.param[name]
+    base_cls = _get_param_base_class(param)
+    if code is None:
+        return None
+    elif base_cls == pm.ObjectSelector:
+        return _decode_object(param.objects, code, name)
+    elif base_cls == pm.ListSelector:
+        return [_decode_object(param.objects, c, name) for c in code]
+    elif isinstance(code, dict):
+        dtype = np.dtype(code['dtype'])
+        data = code['data']
+        if isinstance(data, bytes):
+            value = np.frombuffer(data, dtype=dtype).copy()
+        else:
+            value = np.array(data, dtype=dtype)
+        return value.reshape(code['shape'])
+    elif isinstance(code, list) and isinstance(param.default, tuple):
+        return tuple(code)
+    else:
+        return code
+
+
+def _decode_object(objects, code, name):
+    if isinstance(code, list):
+        if code[0] in objects:
+            return code[0]
+    elif 0 <= code < len(objects):
+        return objects[code]
+    raise ValueError("Snapshot value of '%s' is not in its objects list "
+                     "anymore" % name)
+
+
+def _equal(a, b):
+    if a is b:
+        return True
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return (isinstance(a, np.ndarray) and isinstance(b, np.ndarray)
+                and a.dtype == b.dtype and np.array_equal(a, b))
+    try:
+        return bool(a == b) and type(a) == type(b)
+    except Exception:
+        return False
+
+
+def snapshot(obj: pm.Parameterized, format='binary'):
+    """Values of all the parameters of obj and of its nested objects, in
+    binary form (bytes) or in JSON form (str, format='json')"""
+    assert format in ['binary', 'json']
+    binary = (format == 'binary')
+    tree = _tree(obj)
+    values = [_encode(x, name, getattr(x, name), binary)
+              for x, names in tree for name in names]
+    data = {'version': SNAPSHOT_VERSION, 'fingerprint': _fingerprint(tree),
+            'values': values}
+    if binary:
+        return BINARY_HEADER + zlib.compress(pickle.dumps(data, protocol=4))
+    else:
+        return json.dumps(data)
+
+
+class _BasicUnpickler(pickle.Unpickler):
+    # snapshots contain only basic types: refuse any class
+    def find_class(self, module, name):
+        raise pickle.UnpicklingError('invalid snapshot')
+
+
+def _load(snap):
+    if isinstance(snap, bytes):
+        if not snap.startswith(BINARY_HEADER):
+            raise ValueError('not a parameter snapshot')
+        data = _BasicUnpickler(io.BytesIO(
+            zlib.decompress(snap[len(BINARY_HEADER):]))).load()
+    else:
+        data = json.loads(snap)
+    if data.get('version') != SNAPSHOT_VERSION:
+        raise ValueError('unsupported snapshot version')
+    return data
+
+
+def restore(obj: pm.Parameterized, snap):
+    """Set the parameters of obj and of its nested objects to the values of
+    a snapshot. Only the parameters whose value differs are set, all at once:
+    watchers (and hence display updates and dependency checks) are run once
+    all values are set, and controls are updated at the end (see
+    set_values). Returns the number of parameters changed; nothing is
+    changed if a value of the snapshot is not valid anymore (ValueError)."""
+    data = _load(snap)
+    tree = _tree(obj)
+    if data['fingerprint'] != _fingerprint(tree):
+        raise ValueError('snapshot was taken from a different parameter '
+                         'tree')
+
+    # decode everything first, so that nothing is changed if the snapshot
+    # is not valid anymore (values out of the current bounds are detected
+    # by set_values)
+    codes = iter(data['values'])
+    changes = []
+    for x, names in tree:
+        for name in names:
+            value = _decode(x, name, next(codes))
+            param = x.param[name]
+            if param.constant or param.readonly:
+                continue
+            if not _equal(value, getattr(x, name)):
+                changes.append((x, name, value))
+
+    # set values in one batch over all objects, then run the watchers
+    set_values(changes)
+    return len(changes)
@@ -0,0 +1,33 @@
+import os
+import pytest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+# (interactive demos, not automated tests)
+collect_ignore = ['test_paramqt.py']
+
+
+@pytest.fixture(scope='session')
+def app():
+    from PyQt5 import QtWidgets
+    return (QtWidgets.QApplication.instance()
+            or QtWidgets.QApplication([]))
+
+
+class _ListSink:
+    # error sink keeping the messages
+    def __init__(self):
+        self.messages = []
+
+    def report(self, message, error=None, key=None):
+        self.messages.append(message)
+
+
+@pytest.fixture
+def error_sink():
+    import paramqt
+    sink = _ListSink()
+    previous = paramqt.get_error_sink()
+    paramqt.set_error_sink(sink)
+    yield sink
+    paramqt.set_error_sink(previous)
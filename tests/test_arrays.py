@@ -0,0 +1,58 @@
+import numpy as np
+from PyQt5 import QtCore
+from PyQt5.QtCore import Qt
+
+import paramqt.paramqt as pq
+from paramqt import *
+
+
+class ArrayPar(GParameterized):
+    a = GArray(np.zeros(3))
+
+
+def test_instances_have_their_own_array():
+    first, second = ArrayPar(), ArrayPar()
+    assert first.a is not second.a
+    model = pq._ArrayModel(first.a)
+    assert model.setData(model.index(1, 0), '2.5')
+    assert first.a[1] == 2.5
+    assert second.a[1] == 0 and ArrayPar.param.a.default[1] == 0
+
+
+def test_memory_mapped_array_is_shared_and_written_back(tmp_path):
+    filename = str(tmp_path / 'a.dat')
+    mapped = np.memmap(filename, dtype=float, mode='w+', shape=(4,))
+
+    class MappedPar(GParameterized):
+        a = GArray(mapped)
+
+    par = MappedPar()
+    assert par.a is mapped
+    model = pq._ArrayModel(par.a)
+    assert model.setData(model.index(2, 0), '7')
+    assert np.fromfile(filename, dtype=float)[2] == 7
+
+
+def test_class_default_set_to_memory_mapped_array(tmp_path):
+    mapped = np.memmap(str(tmp_path / 'b.dat'), dtype=float, mode='w+',
+                       shape=(2,))
+
+    class LaterPar(GParameterized):
+        a = GArray(np.zeros(2))
+
+    LaterPar.a = mapped
+    assert LaterPar().a is mapped
+
+
+def test_rows_are_fetched_by_pages(app):
+    model = pq._ArrayModel(np.arange(pq.ARRAY_PAGE_SIZE * 2 + 10))
+    root = QtCore.QModelIndex()
+    assert model.rowCount() == pq.ARRAY_PAGE_SIZE
+    assert model.canFetchMore(root)
+    model.fetchMore(root)
+    assert model.rowCount() == pq.ARRAY_PAGE_SIZE * 2
+    model.fetchMore(root)
+    assert model.rowCount() == pq.ARRAY_PAGE_SIZE * 2 + 10
+    assert not model.canFetchMore(root)
+    assert model.data(model.index(model.rowCount() - 1, 0), Qt.DisplayRole) \
+        == str(pq.ARRAY_PAGE_SIZE * 2 + 9)
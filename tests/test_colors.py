@@ -0,0 +1,46 @@
+from paramqt import *
+from paramqt.paramqt import COLOR_CACHE_SIZE, _color_icon, _format_color
+
+
+class ColorPar(GParameterized):
+    color = GColor('#000000')
+
+
+def test_color_caches_bounded(app):
+    for i in range(COLOR_CACHE_SIZE + 10):
+        _color_icon('#%06x' % i)
+        _format_color('#%06x' % i)
+    assert _color_icon.cache_info().currsize <= COLOR_CACHE_SIZE
+    assert _format_color.cache_info().currsize <= COLOR_CACHE_SIZE
+
+
+def test_color_texts_translated(app):
+    assert _format_color('#ff0000') == 'red (#ff0000)'
+    set_translation(str.upper)
+    try:
+        assert _format_color('#ff0000') == 'RED (#ff0000)'
+    finally:
+        set_translation(None)
+    assert _format_color('#ff0000') == 'red (#ff0000)'
+
+
+def test_color_button_follows_application_palette(app):
+    par = ColorPar()
+    control = parameter_control(par, 'color')
+    par.color = '#ffffff'
+    assert control.palette().color(QtGui.QPalette.Base) \
+        == QtGui.QColor('#ffffff')
+    assert control.palette().color(QtGui.QPalette.Text) \
+        == QtGui.QColor(Qt.black)
+    previous = app.palette()
+    palette = QtGui.QPalette(previous)
+    palette.setColor(QtGui.QPalette.Highlight, QtGui.QColor('#123456'))
+    app.setPalette(palette)
+    try:
+        par.color = '#000000'
+        assert control.palette().color(QtGui.QPalette.Highlight) \
+            == QtGui.QColor('#123456')
+        assert control.palette().color(QtGui.QPalette.Text) \
+            == QtGui.QColor(Qt.white)
+    finally:
+        app.setPalette(previous)
@@ -0,0 +1,29 @@
+from paramqt import *
+from paramqt.debug import _count_watchers, accounting
+
+
+class DebugPar(GParameterized):
+    x = GNumber(1., bounds=(0, 10))
+
+
+def test_count_watchers(app):
+    par = DebugPar()
+    n = _count_watchers(par)
+    watcher = par.param.watch(lambda event: None, 'x')
+    assert _count_watchers(par) == n + 1
+    par.param.unwatch(watcher)
+    assert _count_watchers(par) == n
+
+
+def test_count_watchers_without_private_attribute(app, monkeypatch):
+    # (param versions where _param_watchers does not exist anymore)
+    par = DebugPar()
+    monkeypatch.delattr(par, '_param_watchers')
+    assert _count_watchers(par) >= 0
+
+
+def test_accounting(app):
+    par = DebugPar()
+    panel = ControlPanel(par)
+    counts = accounting(panel)
+    assert counts['watchers'] > 0
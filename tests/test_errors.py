@@ -0,0 +1,38 @@
+from paramqt import *
+
+
+class ErrorPar(GParameterized):
+    x = GNumber(1., bounds=(0, 10), style='edit')
+
+
+def test_invalid_value_reported(app, error_sink):
+    par = ErrorPar()
+    control = parameter_control(par, 'x')
+    control.set_parameter_value(20.)
+    assert par.x == 1.
+    assert len(error_sink.messages) == 1
+    assert "Cannot set parameter 'x'" in error_sink.messages[0]
+
+
+def test_failing_watcher_reported(app, error_sink):
+    par = ErrorPar()
+    control = parameter_control(par, 'x')
+
+    def fail(event):
+        if event.new > 5:
+            raise RuntimeError('too large')
+    par.param.watch(fail, 'x')
+    changes = []
+
+    def listener(control, old, new):
+        changes.append((old, new))
+    add_change_listener(listener)
+    try:
+        control.set_parameter_value(6.)
+    finally:
+        remove_change_listener(listener)
+    # value restored, error reported, no change notified
+    assert par.x == 1.
+    assert len(error_sink.messages) == 1
+    assert 'Previous value was restored.' in error_sink.messages[0]
+    assert changes == []
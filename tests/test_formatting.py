@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+from paramqt import *
+
+
+NUMBERS = [0., 1., -1., 0.5, -0.123456, 3.14159, 999.5, 1234.5, -5678.9,
+           12345.678, 1e7, 2.5e7, -3e12, 1e-9, 6e6, np.nan, np.inf, -np.inf]
+
+
+@pytest.mark.parametrize('param, values', [
+    (GNumber(0.), np.array(NUMBERS)),
+    (GNumber(0.), np.array(NUMBERS).reshape(3, 6)),
+    (GNumber(0.), np.arange(-5, 5)),
+    (GNumber(None, allow_None=True), np.array([None, 1.5, 2.], dtype=object)),
+    (GInteger(0), np.array([0, -3, 12345678901])),
+    (GInteger(None, allow_None=True), np.array([None, 7], dtype=object)),
+    (GColor('#ff0000'), np.array(['#ff0000', '#123456', None],
+                                 dtype=object)),
+    (GString(''), np.array(['a', 'b c'])),
+])
+def test_array_matches_scalar(app, param, values):
+    texts = text_display_array(values, param)
+    assert texts.shape == values.shape
+    assert texts.ravel().tolist() \
+        == [text_display(value, param) for value in values.ravel().tolist()]
@@ -0,0 +1,88 @@
+from paramqt import *
+from paramqt.history import History
+
+
+class HistoryPar(GParameterized):
+    a = GNumber(0., bounds=(0, 10))
+    b = GNumber(0., bounds=(0, 10))
+
+
+def _history(**kwargs):
+    history = History(**kwargs)
+    history.start()
+    return history
+
+
+def test_slider_drag_is_one_step(app):
+    par = HistoryPar()
+    history = _history(merge_interval=0)
+    slider = parameter_control(par, 'a')
+    slider.setSliderDown(True)
+    for value in [1., 2., 3.]:
+        slider.set_parameter_value(value)
+    slider.setSliderDown(False)
+    history.stop()
+    assert len(history._undo) == 1
+    history.undo()
+    assert par.a == 0.
+    history.redo()
+    assert par.a == 3.
+
+
+def test_quick_changes_are_merged(app):
+    par = HistoryPar()
+    history = _history(merge_interval=60)
+    control_a = parameter_control(par, 'a', style='text')
+    control_b = parameter_control(par, 'b', style='text')
+    control_a.set_parameter_value(1.)
+    control_a.set_parameter_value(2.)
+    control_b.set_parameter_value(4.)
+    control_a.set_parameter_value(5.)
+    history.stop()
+    assert [[delta[1:] for delta in step] for step in history._undo] \
+        == [[['a', 0., 2.]], [['b', 0., 4.]], [['a', 2., 5.]]]
+    # going back to the initial value leaves nothing to undo
+    history.start()
+    control_a.set_parameter_value(2.)
+    history.stop()
+    assert len(history._undo) == 2
+
+
+def test_size_is_bounded(app):
+    par = HistoryPar()
+    history = _history(size=3, merge_interval=0)
+    control = parameter_control(par, 'a', style='text')
+    for value in range(1, 6):
+        control.set_parameter_value(float(value))
+    history.stop()
+    assert [step[0][2] for step in history._undo] == [2., 3., 4.]
+
+
+def test_new_change_clears_redo(app):
+    par = HistoryPar()
+    history = _history(merge_interval=0)
+    control = parameter_control(par, 'a', style='text')
+    control.set_parameter_value(1.)
+    control.set_parameter_value(2.)
+    history.undo()
+    assert history.can_redo
+    control.set_parameter_value(3.)
+    history.stop()
+    assert not history.can_redo
+
+
+def test_failed_undo_is_reported_and_kept(app, error_sink):
+    par = HistoryPar()
+    history = _history(merge_interval=0)
+    control = parameter_control(par, 'a', style='text')
+    control.set_parameter_value(8.)
+    control.set_parameter_value(9.)
+    history.stop()
+    par.param.a.bounds = (8.5, 10)
+    history.undo()
+    assert len(error_sink.messages) == 1
+    assert par.a == 9.
+    assert len(history._undo) == 2 and not history.can_redo
+    par.param.a.bounds = (0, 10)
+    history.undo()
+    assert par.a == 8. and history.can_redo
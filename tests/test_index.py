@@ -0,0 +1,69 @@
+from paramqt import *
+
+
+class EdgePar(GParameterized):
+    width = GNumber(1.)
+
+
+class ShapePar(GParameterized):
+    size = GNumber(1.)
+
+    def __init__(self, **kwargs):
+        super(ShapePar, self).__init__(**kwargs)
+        self.edge = EdgePar()
+
+
+class ScenePar(GParameterized):
+    visible = GBoolean(True)
+
+    def __init__(self, **kwargs):
+        super(ScenePar, self).__init__(**kwargs)
+        self.shape = ShapePar()
+
+
+def test_same_parameters_as_list_all_parameters():
+    scene = ScenePar()
+    index = parameter_index(scene)
+    assert parameter_index(scene) is index
+    assert [(id(x), names) for x, names in index.objects()] \
+        == [(id(x), names) for x, names
+            in list_all_parameters(scene, out='Parameterized')]
+    assert sorted(id(x.param[name]) for path, x, name in index.items()) \
+        == sorted(id(param) for param in list_all_parameters(scene))
+    assert sorted(index.paths()) \
+        == ['shape.edge.width', 'shape.size', 'visible']
+    assert index.get_value('shape.edge.width') == 1.
+    index.set_value('shape.edge.width', 2.)
+    assert scene.shape.edge.width == 2.
+
+
+def test_invalidated_when_nested_object_set():
+    scene = ScenePar()
+    index = parameter_index(scene)
+    edge = index['shape.edge.width'][0]
+    scene.shape.edge = EdgePar()
+    assert index['shape.edge.width'][0] is scene.shape.edge is not edge
+    # replacing a nested object by another type of value
+    scene.shape.edge = None
+    assert 'shape.edge.width' not in index
+    assert len(index) == 2
+
+
+def test_invalidated_when_nested_object_deleted():
+    scene = ScenePar()
+    index = parameter_index(scene)
+    assert 'shape.size' in index
+    del scene.shape
+    assert 'shape.size' not in index
+    assert list(index.paths()) == ['visible']
+
+
+def test_not_invalidated_by_value_changes():
+    scene = ScenePar()
+    index = parameter_index(scene)
+    index._update()
+    generation = index._generation
+    scene.visible = False
+    scene.shape.size = 3.
+    index._update()
+    assert index._generation == generation
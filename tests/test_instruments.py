@@ -0,0 +1,70 @@
+import pytest
+from paramqt import *
+
+
+class EditPar(GParameterized):
+    flag = GBoolean(False)
+    toggle = GBoolean(False, style='button')
+    choice = GObjectSelector('a', objects=['a', 'b', 'c'])
+    group = GObjectSelector('a', objects=['a', 'b', 'c'],
+                            style='button-group')
+    cycling = GObjectSelector('a', objects=['a', 'b'], style='button')
+    x = GNumber(0., bounds=(0, 1))
+    text = GString('')
+
+
+class Instrument:
+    def __init__(self):
+        self.records = []
+
+    def record(self, phase, obj, name, callback, start, end):
+        self.records.append((phase, name))
+
+
+@pytest.fixture
+def instrument():
+    instrument = Instrument()
+    add_instrument(instrument)
+    yield instrument
+    remove_instrument(instrument)
+
+
+def _edit(control):
+    if isinstance(control, QtWidgets.QComboBox):
+        control.setCurrentIndex(1)
+        control.activated.emit(1)
+    elif isinstance(control, ButtonGroup):
+        control._buttons[1].click()
+    elif isinstance(control, Slider):
+        control.setValue(control.maximum())
+    elif isinstance(control, QtWidgets.QLineEdit):
+        control.setText('hello')
+        control.editingFinished.emit()
+    else:
+        control.click()
+
+
+@pytest.mark.parametrize('name', ['flag', 'toggle', 'choice', 'group',
+                                  'cycling', 'x', 'text'])
+def test_edits_recorded(app, instrument, name):
+    par = EditPar()
+    control = parameter_control(par, name)
+    _edit(control)
+    phases = [phase for phase, name_ in instrument.records if name_ == name]
+    assert phases.count('edit') == 1
+    assert 'set' in phases
+
+
+def test_watchers_recorded(app, instrument, error_sink):
+    par = EditPar()
+    calls = []
+    par.param.watch(lambda event: calls.append(event.new), 'x')
+    par.param.watch(lambda *events: 1 / 0, ['x', 'flag'])
+    control = parameter_control(par, 'x')
+    control.set_parameter_value(0.5)
+    assert calls == [0.5, 0.]
+    # the failing watcher is recorded too (the value is then restored
+    # without instrumentation)
+    watchers = [record for record in instrument.records
+                if record[0] == 'watcher']
+    assert watchers == [('watcher', 'x'), ('watcher', 'x')]
@@ -0,0 +1,49 @@
+import param as pm
+from paramqt import *
+from paramqt.paramqt import LIST_DISPLAY_MAX
+
+
+class ListPar(GParameterized):
+    values = GList([0.] * (LIST_DISPLAY_MAX + 1))
+
+
+class PlainPar(pm.Parameterized):
+    values = pm.List([0.] * (LIST_DISPLAY_MAX + 1), class_=float)
+
+
+def test_param_comparisons_not_patched():
+    assert set(pm.parameterized.Comparator.equalities) <= {
+        type(None), bytes, str, pm.parameterized.numbers.Number}
+    par = PlainPar()
+    par.values = [0.] * (LIST_DISPLAY_MAX + 1)
+    assert '_changed' not in par.param.__dict__
+
+
+def test_long_list_changes():
+    par = ListPar()
+    events = []
+    par.param.watch(lambda event: events.append(event.new), 'values')
+    n = LIST_DISPLAY_MAX + 1
+
+    # equal values (as a different list) are not a change
+    par.values = [0.] * n
+    assert events == []
+
+    # a change of the last item is
+    values = [0.] * (n - 1) + [1.]
+    par.values = values
+    assert events == [values]
+    par.values = [0] * (n - 1) + [1]
+    assert len(events) == 1
+
+    # lists of other types are compared by param
+    par.values = ['a'] * n
+    par.values = ['a'] * n
+    assert len(events) == 2
+
+
+def test_long_list_line_edit(app):
+    par = ListPar()
+    control = parameter_control(par, 'values')
+    par.values = [float(i) for i in range(LIST_DISPLAY_MAX + 1)]
+    assert str(LIST_DISPLAY_MAX + 1) in control.text()
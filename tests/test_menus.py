@@ -0,0 +1,164 @@
+import pytest
+from paramqt import *
+
+
+def _close(window):
+    # (controls follow translation changes until their watchers are
+    # released, even after being deleted with the window)
+    for child in window.findChildren(QtCore.QObject):
+        if isinstance(child, TranslationProne):
+            child.release_watchers()
+    window.close()
+
+
+class MenuPar(GParameterized):
+    x = GNumber(1., bounds=(0, 10))
+    flag = GBoolean(False)
+
+
+@pytest.mark.parametrize('lazy', [False, True])
+def test_sections_and_actions(app, lazy):
+    window = QtWidgets.QMainWindow()
+    par = MenuPar()
+    menu = ControlMenu(window, 'Menu', par, lazy=lazy)
+    section = menu.add_section('Actions')
+    calls = []
+    action = menu.add_action('Do it', lambda: calls.append(1))
+    assert isinstance(section, QtWidgets.QAction) and section.isSeparator()
+    assert section.text() == 'Actions'
+    assert isinstance(action, QtWidgets.QAction)
+    action.setEnabled(False)
+    action.setEnabled(True)
+    action.trigger()
+    assert calls == [1]
+
+    menu.aboutToShow.emit()
+    actions = menu.actions()
+    assert actions[-1] is action and actions[-2] is section
+    assert menu.entries[-1] is action
+    assert len(menu.entries) == 3
+    _close(window)
+
+
+class ChoicePar(GParameterized):
+    letter = GObjectSelector('a', objects=list('abc'))
+    number = GObjectSelector(0, objects=list(range(100)))
+    icon = GObjectSelector('a', objects=list('abc'), style='button-menu')
+
+
+@pytest.fixture
+def translation():
+    yield set_translation
+    set_translation(None)
+
+
+def _wait_release(timer):
+    from PyQt5.QtTest import QTest
+    timer.setInterval(1)
+    QTest.qWait(50)
+
+
+def test_select_menu_created_on_show(app, translation):
+    window = QtWidgets.QMainWindow()
+    par = ChoicePar()
+    menu = menu_control(window, par, 'letter')
+    assert menu.actions() == []
+    menu.aboutToShow.emit()
+    assert [action.text() for action in menu.actions()] == ['a', 'b', 'c']
+    menu.actions()[2].trigger()
+    assert par.letter == 'c'
+    # labels are created again after a translation change
+    translation(lambda s: s.upper())
+    assert menu.actions() == []
+    menu.aboutToShow.emit()
+    assert [action.text() for action in menu.actions()] == ['A', 'B', 'C']
+    assert menu.actions()[2].isChecked()
+    _close(window)
+
+
+def test_select_menu_pages(app):
+    window = QtWidgets.QMainWindow()
+    par = ChoicePar()
+    menu = menu_control(window, par, 'number')
+    menu.aboutToShow.emit()
+    pages = [action.menu() for action in menu.actions()]
+    assert len(pages) == -(-100 // MENU_PAGE_SIZE)
+    assert all(page.actions() == [] for page in pages)
+    # the next page is filled when reached
+    pages[1].aboutToShow.emit()
+    assert pages[1].actions()[0].text() == str(MENU_PAGE_SIZE)
+    pages[1].actions()[1].trigger()
+    assert par.number == MENU_PAGE_SIZE + 1
+    assert pages[0].actions() == []
+    _close(window)
+
+
+def test_button_menu_popup_released(app):
+    container = QtWidgets.QWidget()
+    par = ChoicePar()
+    control = parameter_control(par, 'icon')
+    control.setParent(container)
+    assert control._menu is None
+    control.click()
+    assert control._menu is not None and control._menu.isVisible()
+    assert len(control._buttons) == 3 and control._menu_sizes
+    control._buttons[1].click()
+    assert par.icon == 'b' and not control._menu.isVisible()
+    _wait_release(control._release_timer)
+    assert control._menu is None and control._menu_sizes == {}
+    # created again when shown again
+    control.click()
+    assert control._menu is not None and len(control._buttons) == 3
+    control._menu.hide()
+    _close(container)
+
+
+def test_menu_item_control_released(app):
+    window = QtWidgets.QMainWindow()
+    par = MenuPar()
+    item = menu_control(window, par, 'x')
+    assert item.control is None
+    item.trigger()
+    assert item.control is not None and item.control.isVisible()
+    item.control.set_parameter_value(3.)
+    assert par.x == 3. and item.text() == 'X: 3.'
+    item.control.hide()
+    _wait_release(item._release_timer)
+    assert item.control is None
+    # the menu item itself keeps following the parameter
+    par.x = 4.
+    assert item.text() == 'X: 4.'
+    _close(window)
+
+
+class FoldedPar(GParameterized):
+    label = 'Folded'
+    start_folded = True
+    y = GNumber(1., bounds=(0, 10))
+
+
+class OuterPar(GParameterized):
+    x = GNumber(1., bounds=(0, 10))
+
+    def __init__(self, **kwargs):
+        super(OuterPar, self).__init__(**kwargs)
+        self.folded = FoldedPar()
+
+
+def test_folded_objects_in_lazy_submenus(app, translation):
+    window = QtWidgets.QMainWindow()
+    par = OuterPar()
+    menu = ControlMenu(window, 'Menu', par)
+    submenus = [entry for entry in menu.entries
+                if isinstance(entry, ControlMenu)]
+    assert len(submenus) == 1
+    submenu = submenus[0]
+    assert submenu.title() == 'Folded'
+    assert submenu.menuAction() in menu.actions()
+    # entries are created when the sub-menu is first shown
+    assert submenu.entries == []
+    submenu.aboutToShow.emit()
+    assert [entry.name for entry in submenu.entries] == ['y']
+    translation(lambda s: s.upper())
+    assert submenu.title() == 'FOLDED'
+    _close(window)
@@ -276,7 +276,7 @@ class ShapeWindow(QtWidgets.QMainWindow):
         self.centralWidget().addWidget(self.control_widget)
         tab = ControlPanel(general_par)
         self.control_widget.addTab(tab, 'General')
-        tab = ControlPanel(shape_par)
+        tab = ControlPanel(shape_par, search=True)
         self.control_widget.addTab(tab, 'Shape')
         self.control_widget.setCurrentIndex(1)
 
@@ -0,0 +1,128 @@
+import os
+import json
+import pytest
+from paramqt import *
+import paramqt.presets as presets
+from paramqt.presets import PresetStore, PresetMenu, PRESET_MAGIC
+
+
+class PresetPar(GParameterized):
+    a = GNumber(0., bounds=(0, 10))
+    b = GInteger(0, bounds=(0, 10))
+
+
+def _store(tmp_path, **values):
+    store = PresetStore(str(tmp_path / 'presets.pqp'))
+    par = PresetPar()
+    for name, (a, b) in values.items():
+        par.a, par.b = a, b
+        store.save(name, par)
+    return store, par
+
+
+def test_file_format(tmp_path):
+    store, par = _store(tmp_path, first=(1., 2), second=(3., 4))
+    store.close()
+    with open(store.filename, 'rb') as f:
+        data = f.read()
+    magic, offset, size = presets._HEADER.unpack_from(data)
+    assert magic == PRESET_MAGIC
+    index = json.loads(data[offset:offset + size].decode())
+    assert sorted(entry['name'] for entry in index['presets']) \
+        == ['first', 'second']
+    assert offset + size == len(data)
+
+
+def test_replace_and_remove(tmp_path):
+    store, par = _store(tmp_path, first=(1., 2), second=(3., 4))
+    par.a = 5.
+    store.save('first', par)
+    store.remove('second')
+    store.close()
+    store = PresetStore(store.filename)
+    assert store.names() == ['first']
+    assert store.apply('first', par) == 0
+    par.a, par.b = 0., 0
+    assert store.apply('first', par) == 2
+    assert (par.a, par.b) == (5., 4)
+    with pytest.raises(KeyError):
+        store.remove('second')
+    store.close()
+
+
+def test_compaction(tmp_path):
+    store, par = _store(tmp_path, **{'p%d' % i: (i, i) for i in range(10)})
+    size = os.path.getsize(store.filename)
+    for i in range(9):
+        store.remove('p%d' % i)
+    # the file was compacted when most of it became unused
+    assert os.path.getsize(store.filename) < size / 2
+    assert store.names() == ['p9']
+    store.apply('p9', par)
+    assert (par.a, par.b) == (9., 9)
+    store.close()
+
+
+def test_search(tmp_path):
+    store, par = _store(tmp_path, **{'Warm Light': (1., 1),
+                                     'cold light': (2., 2),
+                                     'warm dark': (3., 3)})
+    assert store.search('LIGHT') == ['Warm Light', 'cold light']
+    assert store.search('warm light') == ['Warm Light']
+    assert store.search('') == store.names()
+
+    class OtherPar(GParameterized):
+        c = GNumber(0.)
+    assert store.search('light', OtherPar()) == []
+    store.close()
+
+
+def test_interrupted_write_keeps_presets(tmp_path, monkeypatch):
+    store, par = _store(tmp_path, first=(1., 2))
+
+    def fail(fd):
+        raise OSError('disk full')
+    monkeypatch.setattr(presets.os, 'fsync', fail)
+    par.a = 7.
+    with pytest.raises(OSError):
+        store.save('second', par)
+    assert store.names() == ['first']
+    monkeypatch.undo()
+    store.close()
+    store = PresetStore(store.filename)
+    assert store.names() == ['first']
+    store.apply('first', par)
+    assert par.a == 1.
+    store.close()
+
+
+def test_corrupt_index(tmp_path):
+    store, par = _store(tmp_path, first=(1., 2))
+    store.close()
+    with open(store.filename, 'r+b') as f:
+        magic, offset, size = presets._HEADER.unpack_from(f.read())
+        f.seek(offset)
+        f.write(b'{' * size)
+    with pytest.raises(ValueError):
+        store._open()
+    assert store._map is None and store._file is None
+
+
+def test_menu_reports_errors(app, tmp_path, monkeypatch, error_sink):
+    from PyQt5 import QtWidgets
+    store, par = _store(tmp_path, first=(1., 2))
+    window = QtWidgets.QMainWindow()
+    menu = PresetMenu(ControlMenu(window, 'Window'), store, par)
+
+    def fail(fd):
+        raise OSError('disk full')
+    monkeypatch.setattr(presets.os, 'fsync', fail)
+    menu.save('second')
+    assert 'Could not save preset' in error_sink.messages[0]
+    monkeypatch.undo()
+
+    par.a = 5.
+    par.param.watch(lambda event: 1 / 0, 'a')
+    menu.apply('first')
+    assert 'Could not apply preset' in error_sink.messages[1]
+    store.close()
@@ -0,0 +1,88 @@
+import os
+import pickle
+import pytest
+import param as pm
+from paramqt import *
+from paramqt.recording import Recorder, Replayer, read_log
+
+
+class RecordedPar(GParameterized):
+    x = GNumber(0., bounds=(0, 10))
+    choice = GObjectSelector('a', objects=['a', 'b', 'c'])
+    anything = pm.Parameter(None)
+
+
+class OtherPar(GParameterized):
+    y = GNumber(0.)
+
+
+def _record(filename, par):
+    with Recorder(par, filename) as recorder:
+        par.x = 1.
+        set_values([(par, 'x', 2.), (par, 'choice', 'b')])
+        par.param.choice.objects = ['a', 'b', 'c', 'd']
+        par.choice = 'd'
+    return recorder
+
+
+def test_round_trip(app, tmp_path):
+    filename = str(tmp_path / 'log.pqr')
+    recorder = _record(filename, RecordedPar())
+    header, records = read_log(filename)
+    assert len(records) == recorder.n_records == 4
+    assert header['paths'] == ['x', 'choice', 'anything']
+    assert header['skipped'] == 0
+
+    par = RecordedPar()
+    stats = Replayer(par, filename).play(speed=None)
+    assert stats['records'] == 4
+    assert (par.x, par.choice) == (2., 'd')
+    assert par.param.choice.objects == ['a', 'b', 'c', 'd']
+
+
+def test_truncated_last_record(app, tmp_path):
+    filename = str(tmp_path / 'log.pqr')
+    _record(filename, RecordedPar())
+    with open(filename, 'r+b') as f:
+        f.truncate(os.path.getsize(filename) - 3)
+    header, records = read_log(filename)
+    assert len(records) == 3
+    par = RecordedPar()
+    Replayer(par, filename).play(speed=None)
+    assert (par.x, par.choice) == (2., 'b')
+
+
+def test_fingerprint_mismatch(app, tmp_path):
+    filename = str(tmp_path / 'log.pqr')
+    _record(filename, RecordedPar())
+    with pytest.raises(ValueError):
+        Replayer(OtherPar(), filename)
+
+
+def test_records_with_classes_are_skipped(app, tmp_path):
+    filename = str(tmp_path / 'log.pqr')
+    par = RecordedPar()
+    with Recorder(par, filename):
+        par.x = 1.
+        par.anything = OtherPar
+        par.x = 3.
+    header, records = read_log(filename)
+    assert header['skipped'] == 1
+    assert [changes for t, changes in records] \
+        == [[(0, 'value', 1.)], [(0, 'value', 3.)]]
+
+
+def test_write_error_raised_by_stop(app, tmp_path):
+    filename = str(tmp_path / 'log.pqr')
+    par = RecordedPar()
+    recorder = Recorder(par, filename)
+    recorder.start()
+    par.anything = lambda: None
+    par.x = 1.
+    with pytest.raises((pickle.PicklingError, AttributeError)):
+        recorder.stop()
+    assert not recorder.running
+    # the recorder can be started again
+    with recorder:
+        par.x = 2.
+    assert len(read_log(filename)[1]) == 1
@@ -0,0 +1,149 @@
+import time
+import multiprocessing as mp
+import pytest
+from paramqt import *
+from paramqt.remote import RemoteLink
+
+
+# Parameters of a compute engine running in another process
+class OutputPar(GParameterized):
+    level = GNumber(0., bounds=(-100, 100))
+
+
+class EnginePar(GParameterized):
+    running = GBoolean(True)
+    amplitude = GNumber(5., bounds=(0, 10))
+    shape = GObjectSelector('sine', objects=['sine', 'square'])
+
+    def __init__(self, **kwargs):
+        super(EnginePar, self).__init__(**kwargs)
+        self.output = OutputPar()
+
+
+def engine(connection):
+    # stand-in for the compute engine: the output level follows the
+    # amplitude, the engine stops when the other side closes its end
+    par = EnginePar()
+    par.param.watch(lambda event: setattr(par.output, 'level', 2 * event.new),
+                    'amplitude')
+    par.amplitude = 3.
+    link = RemoteLink(par, connection, master=True)
+    while not link.closed:
+        link.poll(timeout=0.02)
+
+
+def _wait_for(link, condition, timeout=10.):
+    end = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < end, 'remote values not received'
+        link.poll(timeout=0.02)
+
+
+def test_values_propagate_both_ways():
+    context = mp.get_context('spawn')
+    connection, engine_connection = context.Pipe()
+    process = context.Process(target=engine, args=(engine_connection,),
+                              daemon=True)
+    process.start()
+    engine_connection.close()
+    try:
+        par = EnginePar()
+        link = RemoteLink(par, connection)
+
+        # the engine values are received on connection
+        _wait_for(link, lambda: par.output.level == 6.)
+        assert par.amplitude == 3.
+
+        # local changes reach the engine, and its reactions come back
+        par.amplitude = 4.
+        par.shape = 'square'
+        _wait_for(link, lambda: par.output.level == 8.)
+        assert par.amplitude == 4. and par.shape == 'square'
+        link.close()
+    finally:
+        process.join(5)
+        if process.is_alive():
+            process.terminate()
+    assert process.exitcode == 0
+
+
+def test_poll_errors_reported(app, error_sink):
+    connection1, connection2 = mp.Pipe()
+    master = RemoteLink(EnginePar(), connection1, master=True)
+    par = EnginePar()
+    par.param.amplitude.bounds = (0, 5)
+    link = RemoteLink(par, connection2)
+    link.start_polling()
+    link.poll()
+
+    # invalid value: reported, not raised from the Qt event loop
+    master.obj.amplitude = 8.
+    master.flush()
+    link.poll()
+    assert par.amplitude == 5.
+    assert len(error_sink.messages) == 1
+    assert 'could not be applied' in error_sink.messages[0]
+
+    # closed connection: reported, polling stopped
+    master.close()
+    link.poll()
+    assert link.closed and not link._timer.isActive()
+    assert 'closed' in error_sink.messages[1]
+
+
+def test_poll_errors_raised_without_qt():
+    connection1, connection2 = mp.Pipe()
+    master = RemoteLink(EnginePar(), connection1, master=True)
+    par = EnginePar()
+    par.param.amplitude.bounds = (0, 5)
+    link = RemoteLink(par, connection2)
+    master.obj.amplitude = 8.
+    master.flush()
+    with pytest.raises(ValueError):
+        link.poll()
+    master.close()
+    link.poll()
+    assert link.closed
+
+
+def test_rejected_values_are_not_marked_as_received(app, error_sink):
+    connection1, connection2 = mp.Pipe()
+    master = RemoteLink(EnginePar(), connection1, master=True)
+    par = EnginePar()
+    par.param.amplitude.bounds = (0, 5)
+    link = RemoteLink(par, connection2)
+    link.start_polling()
+    link.poll()
+    master.obj.amplitude = 8.
+    master.obj.shape = 'square'
+    master.flush()
+    link.poll()
+    assert (par.amplitude, par.shape) == (5., 'sine')
+    # the values not applied are not known as values of the other side
+    i = link._numbers[(id(par), 'amplitude')]
+    assert link._remote[i] != master._remote[i]
+    # the local value is sent again once changed
+    par.amplitude = 4.
+    link.flush()
+    master.poll()
+    assert master.obj.amplitude == 4.
+    master.close()
+    link.close()
+
+
+def test_classes_are_not_received():
+    import pickle
+    connection1, connection2 = mp.Pipe()
+    link = RemoteLink(EnginePar(), connection2)
+    connection1.send_bytes(pickle.dumps(('values', ([(0, OutputPar)], {}))))
+    with pytest.raises(pickle.UnpicklingError):
+        link.poll()
+    link.close()
+
+
+def test_authentication_key_required():
+    from paramqt.remote import serve, connect
+    with pytest.raises(ValueError):
+        serve(EnginePar(), ('localhost', 0), authkey=b'')
+    with pytest.raises(ValueError):
+        connect(EnginePar(), ('localhost', 0), authkey=None)
@@ -0,0 +1,80 @@
+import pytest
+from paramqt import *
+import paramqt.paramqt as pq
+
+
+class LightPar(GParameterized):
+    label = 'Lighting'
+    start_folded = True
+    intensity = GNumber(1., bounds=(0, 2), doc='Brightness of the lamp')
+    warm = GBoolean(True, label='Warm color')
+
+
+class ScenePar(GParameterized):
+    width = GNumber(1., bounds=(0, 10))
+    height = GNumber(1., bounds=(0, 10), doc='Vertical size')
+
+    def __init__(self, **kwargs):
+        super(ScenePar, self).__init__(**kwargs)
+        self.light = LightPar()
+
+
+def _shown(panel):
+    return sorted(control.control.name for section in panel.sections
+                  for control in section.controls
+                  if not control.control.isHidden())
+
+
+@pytest.fixture
+def panel(app):
+    panel = ControlPanel(ScenePar(), search=True)
+    yield panel
+    panel.close()
+
+
+def test_search_index():
+    index = pq._SearchIndex(['width', 'height vertical size', 'warm color'])
+    assert index.search('height') == {1}
+    assert index.search('SIZE'.lower()) == {1}
+    assert index.search('w') == {0, 2}
+    assert index.search('warm size') == set()
+    assert index.search('col warm') == {2}
+
+
+def test_label_and_tooltip_match(panel):
+    panel.set_filter('warm COLOR')
+    assert _shown(panel) == ['warm']
+    panel.set_filter('vertical')
+    assert _shown(panel) == ['height']
+    panel.set_filter('lamp')
+    assert _shown(panel) == ['intensity']
+
+
+def test_folded_section_shown_while_filtering(panel):
+    # entries of the folded section are hidden, until they match
+    assert _shown(panel) == ['height', 'width']
+    panel.set_filter('lighting')
+    assert _shown(panel) == ['intensity', 'warm']
+    section = panel.sections[-1]
+    assert not section.title.isHidden()
+
+
+def test_view_restored_when_filter_cleared(panel):
+    panel.set_filter('lamp')
+    panel.set_filter('')
+    assert _shown(panel) == ['height', 'width']
+    section = panel.sections[-1]
+    assert not section.unfolded and not section.title.isHidden()
+
+
+def test_entries_added_while_filtering(panel):
+    panel.set_filter('width')
+    other = ScenePar()
+    panel.add_section('More')
+    panel.add_entry(other, ['width', 'height'])
+    shown = [control.control for control in panel.sections[-1].controls
+             if not control.control.isHidden()]
+    assert [control.name for control in shown] == ['width']
+    panel.set_filter('')
+    assert all(not control.control.isHidden()
+               for control in panel.sections[-1].controls)
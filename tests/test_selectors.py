@@ -0,0 +1,86 @@
+from paramqt import *
+
+
+class SelectorPar(GParameterized):
+    popup = GObjectSelector('a', objects=['a', 'b', 'c'])
+    cycling = GObjectSelector('a', objects=['a', 'b', 'c'], style='button')
+    group = GObjectSelector('a', objects=['a', 'b', 'c'],
+                            style='button-group')
+    choices = GListSelector(['a'], objects=['a', 'b', 'c'])
+
+
+def test_popup_menu_follows_objects(app):
+    par = SelectorPar()
+    control = parameter_control(par, 'popup')
+    par.param.popup.objects = ['a', 'b', 'c', 'd', 'e']
+    assert [control.itemText(i) for i in range(control.count())] \
+        == ['a', 'b', 'c', 'd', 'e']
+    par.popup = 'e'
+    assert control.currentText() == 'e'
+
+
+def test_popup_menu_follows_names(app):
+    par = SelectorPar()
+    control = parameter_control(par, 'popup')
+    par.param.popup.names = {'first': 'a', 'second': 'b', 'third': 'c'}
+    assert control.itemText(1) == 'second'
+    assert control.value_name('c') == 'third'
+
+
+def test_cycling_button_follows_objects(app):
+    par = SelectorPar()
+    control = parameter_control(par, 'cycling')
+    par.param.cycling.objects = ['a', 'x']
+    control.click()
+    assert par.cycling == 'x'
+    control.click()
+    assert par.cycling == 'a'
+
+
+def test_button_group_follows_objects(app):
+    par = SelectorPar()
+    control = parameter_control(par, 'group')
+    par.param.group.objects = ['a', 'b', 'c', 'd', 'e']
+    assert [button.text() for button in control._buttons] \
+        == ['a', 'b', 'c', 'd', 'e']
+    assert control.layout().count() == 5
+    control._buttons[4].click()
+    assert par.group == 'e'
+    assert [button.isChecked() for button in control._buttons] \
+        == [False, False, False, False, True]
+    par.param.group.objects = ['a', 'b']
+    par.group = 'b'
+    assert [button.isChecked() for button in control._buttons] \
+        == [False, True]
+
+
+def test_multi_button_group_follows_objects(app):
+    par = SelectorPar()
+    control = parameter_control(par, 'choices')
+    par.param.choices.objects = ['a', 'b', 'c', 'd']
+    control._buttons[3].click()
+    assert par.choices == ['a', 'd']
+
+
+def test_cycling_button_deleted_after_change(app):
+    from PyQt5 import sip
+    from PyQt5.QtTest import QTest
+    par = SelectorPar()
+    control = parameter_control(par, 'cycling')
+    par.cycling = 'b'
+    sip.delete(control)
+    # the delayed update of the checked state must not reach the deleted
+    # button
+    QTest.qWait(200)
+
+
+def test_button_group_lays_out_new_buttons(app):
+    par = SelectorPar()
+    control = parameter_control(par, 'group')
+    control.show()
+    par.param.group.objects = ['a', 'b', 'c', 'd', 'e']
+    app.processEvents()
+    assert all(button.isVisible() for button in control._buttons)
+    assert len({(button.x(), button.y()) for button in control._buttons}) \
+        == 5
+    control.close()
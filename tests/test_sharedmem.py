@@ -0,0 +1,82 @@
+import math
+import threading
+import time
+import pytest
+from paramqt import *
+from paramqt.sharedmem import SharedParameters, SharedParametersReader
+
+
+class SubPar(GParameterized):
+    a = GNumber(0.)
+    k = GInteger(3, bounds=(0, 10))
+
+
+class TopPar(GParameterized):
+    on = GBoolean(True)
+    z = GNumber(None, allow_None=True)
+    text = GString('not shared')
+
+    def __init__(self, **kwargs):
+        super(TopPar, self).__init__(**kwargs)
+        self.sub = SubPar()
+
+
+@pytest.fixture
+def shared():
+    shared = SharedParameters(TopPar())
+    reader = SharedParametersReader(shared.name)
+    yield shared, reader
+    reader.close()
+    if shared._watchers:
+        shared.close()
+
+
+def test_round_trip(shared):
+    shared, reader = shared
+    par = shared.obj
+    assert reader.paths == ['sub.a', 'sub.k', 'on', 'z']
+    assert reader.as_dict() == {'on': True, 'z': None, 'sub.a': 0.,
+                                'sub.k': 3}
+    par.sub.k = 7
+    assert reader.get('sub.k') == 7 and type(reader.get('sub.k')) is int
+    par.z = 2.5
+    assert reader.get('z') == 2.5
+    # None is stored as NaN
+    par.z = None
+    assert math.isnan(reader.values()[3])
+    assert reader.get('z') is None
+
+
+def test_version(shared):
+    shared, reader = shared
+    version = reader.version
+    shared.obj.on = False
+    assert reader.version == version + 1
+    set_values([(shared.obj.sub, 'a', 1.), (shared.obj.sub, 'k', 1)])
+    assert reader.version == version + 2
+
+
+def test_reader_waits_for_writer(shared):
+    shared, reader = shared
+    # writer in the middle of a write: odd sequence number
+    shared._sequence[0] += 1
+    shared._values[2] = 5.
+
+    def finish():
+        time.sleep(0.05)
+        shared._values[3] = 5.
+        shared._sequence[0] += 1
+    thread = threading.Thread(target=finish)
+    thread.start()
+    values = reader.values()
+    thread.join()
+    assert values[2] == values[3] == 5.
+
+
+def test_close_and_unlink(shared):
+    shared, reader = shared
+    name = shared.name
+    shared.close()
+    shared.obj.sub.a = 4.
+    with pytest.raises(FileNotFoundError):
+        SharedParametersReader(name)
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+from paramqt import *
+
+
+def _reachable(mapping):
+    # values of all slider positions
+    return set(mapping.from_control(np.arange(mapping.n_steps + 1)).tolist())
+
+
+@pytest.mark.parametrize('bounds, mode', [
+    ((0, 100), None),
+    ((-5, 1000), 'linear'),
+    ((1, 1000), 'log'),
+    ((1, 10000), 'log'),
+    ((0, 2000), 'middle 3'),
+    ((-10, 10), None),
+    ((-10, 10), 'middle 2'),
+    ((0, 50), 'left'),
+    ((0, 50), 'ext 1'),
+])
+def test_all_integers_reachable(bounds, mode):
+    mapping = SliderMapping(bounds, mode, integer=True,
+                            resolution='adaptive')
+    assert _reachable(mapping) == set(range(bounds[0], bounds[1] + 1))
+
+
+def test_adaptive_linear_integer_steps():
+    mapping = SliderMapping((0, 100), 'linear', integer=True,
+                            resolution='adaptive')
+    assert mapping.n_steps == 100
+    assert mapping.to_control(37) == 37
+
+
+def test_adaptive_resolution_not_lower_than_default():
+    for bounds, mode in [((1, 1000), 'log'), ((-10, 10), 'middle')]:
+        mapping = SliderMapping(bounds, mode, integer=True,
+                                resolution='adaptive')
+        assert mapping.n_steps >= SLIDER_STEPS
+
+
+MAPPINGS = [
+    ((0, 10), 'linear', False),
+    ((-3, 250), 'linear', True),
+    ((0.01, 100), 'log', False),
+    ((1, 1000), 'log', True),
+    ((0, 1), 'left 2', False),
+    ((0, 1), 'right', False),
+    ((-1, 1), 'middle', False),
+    ((0, 40), 'ext 0.5', True),
+    ((-np.inf, np.inf), 'tan', False),
+    ((0, np.inf), 'tan 2', False),
+    ((-np.inf, 5), 'tan', True),
+]
+
+
+@pytest.mark.parametrize('bounds, mode, integer', MAPPINGS)
+def test_array_conversions_match_scalar(bounds, mode, integer):
+    mapping = SliderMapping(bounds, mode, integer=integer, resolution=50)
+    positions = np.arange(mapping.n_steps + 1)
+    values = mapping.from_control(positions)
+    # (numpy and math functions may differ in the last bit)
+    assert values.tolist() \
+        == pytest.approx([mapping.from_control(int(x)) for x in positions],
+                         rel=1e-12)
+    assert mapping.to_control(values).tolist() \
+        == [mapping.to_control(x) for x in values.tolist()]
+
+
+def test_infinite_bounds_at_ends():
+    # the ends of the slider give the bounds themselves, also when
+    # infinite (the parameter then takes the infinite value)
+    mapping = SliderMapping((-np.inf, np.inf), 'tan', resolution=10)
+    assert mapping.from_control(0) == -np.inf
+    assert mapping.from_control(10) == np.inf
+    assert mapping.to_control(-np.inf) == 0
+    assert mapping.to_control(np.inf) == 10
+    mapping = SliderMapping((0, np.inf), 'tan', resolution=10)
+    assert mapping.from_control(0) == 0
+    assert mapping.from_control(10) == np.inf
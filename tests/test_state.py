@@ -0,0 +1,54 @@
+import pytest
+from paramqt import *
+from paramqt.state import snapshot, restore
+
+
+class StatePar(GParameterized):
+    a = GNumber(1., bounds=(0, 10))
+    b = GNumber(1., bounds=(0, 10))
+
+
+def test_restore(app):
+    par = StatePar()
+    par.a, par.b = 2., 3.
+    snap = snapshot(par)
+    par.a, par.b = 5., 6.
+    assert restore(par, snap) == 2
+    assert (par.a, par.b) == (2., 3.)
+    assert restore(par, snapshot(par, format='json')) == 0
+
+
+def test_restore_invalid_changes_nothing(app):
+    par = StatePar()
+    par.a, par.b = 2., 8.
+    snap = snapshot(par)
+    par.a, par.b = 5., 1.
+    par.param.b.bounds = (0, 4)
+    events = []
+    par.param.watch(lambda *e: events.extend(x.name for x in e), ['a', 'b'])
+    with pytest.raises(ValueError):
+        restore(par, snap)
+    assert (par.a, par.b) == (5., 1.)
+    assert events == []
+    # no events of the failed restore are left behind
+    par.b = 3.5
+    assert events == ['b']
+
+
+def test_set_values_invalid_part_way(app):
+    first, second = StatePar(), StatePar()
+    second.param.a.bounds = (0, 4)
+    events = []
+    for par in [first, second]:
+        par.param.watch(lambda *e: events.extend(x.name for x in e),
+                        ['a', 'b'])
+    with pytest.raises(ValueError):
+        set_values([(first, 'a', 2.), (first, 'b', 3.), (second, 'b', 2.),
+                    (second, 'a', 5.)])
+    assert (first.a, first.b, second.a, second.b) == (1., 1., 1., 1.)
+    assert events == []
+    # (relies on the queues of param 1.9)
+    for par in [first, second]:
+        assert par.param._events == [] and par.param._watchers == []
+    set_values([(first, 'a', 2.), (second, 'b', 3.)])
+    assert events == ['a', 'b']